@@ -5,8 +5,8 @@ import json
 # -----------------------------
 # API CONFIG
 # -----------------------------
-RUN_API_URL = "http://127.0.0.1:8000/run"
-INGEST_API_URL = "http://127.0.0.1:8000/ingest-and-analyze"
+RUN_API_URL = "http://127.0.0.1:8000/run/stream"
+INGEST_API_URL = "http://127.0.0.1:8000/ingest-and-analyze/stream"
 
 # -----------------------------
 # PAGE CONFIG
@@ -74,7 +74,66 @@ else:
 run_button = st.button("🚀 Run AI Analysis")
 
 # =========================================================
-# API CALL
+# RESULT RENDERING
+# =========================================================
+def render_result(r):
+    with st.expander(
+        f"👤 Customer {r['customer_id']} | Segment: {r['segment']}",
+        expanded=False,
+    ):
+        col1, col2 = st.columns(2)
+
+        # -----------------------------
+        # LEFT: SIGNALS
+        # -----------------------------
+        with col1:
+            st.subheader("📊 Behavioral Signals")
+
+            if r["signals"]:
+                st.json(r["signals"])
+            else:
+                st.info("No behavioral signals available")
+
+        # -----------------------------
+        # RIGHT: CAMPAIGN
+        # -----------------------------
+        with col2:
+            st.subheader("🎯 Recommended Campaign")
+
+            campaign = r["campaign"]
+
+            st.markdown(
+                f"""
+                **Type:** {campaign['campaign_type']}  
+                **Channel:** {campaign['channel']}  
+                **Duration:** {campaign['duration_days']} days  
+                **Estimated Participation:** {campaign['estimated_participation_rate'] * 100:.0f}%  
+                **Estimated Cost:** ₹{campaign['estimated_cost']:,}  
+                **Estimated Revenue:** ₹{campaign['estimated_revenue']:,}  
+                **Estimated ROI:** {campaign['estimated_roi']}x  
+                """
+            )
+
+            st.markdown(
+                f"**Message Preview:**\n\n> {campaign['message']}"
+            )
+
+        # -----------------------------
+        # REASONING
+        # -----------------------------
+        st.subheader("🧠 AI Reasoning")
+
+        reasoning = r["reasoning"]
+        st.markdown(reasoning["llm_explanation"])
+
+        st.caption(
+            f"Confidence: {reasoning['confidence']} | "
+            f"Business Risk: {reasoning['business_risk']}"
+        )
+
+
+# =========================================================
+# API CALL (NDJSON stream: one customer per line)
 # =========================================================
 if run_button:
     with st.spinner("Running AI pipeline..."):
@@ -87,6 +146,7 @@ if run_button:
                 transactions = json.load(transactions_file)
                 past_campaigns = json.load(campaigns_file)
 
+                url = INGEST_API_URL
                 payload = {
                     "domain": domain,
                     "customers": customers,
@@ -94,89 +154,65 @@ if run_button:
                     "past_campaigns": past_campaigns,
                 }
 
-                response = requests.post(
-                    INGEST_API_URL,
-                    json=payload,
-                    timeout=120,
-                )
-
-                results = response.json()
-
             # ----------------------------------
             # CASE 2: Default pipeline
             # ----------------------------------
             else:
-                response = requests.post(
-                    RUN_API_URL,
-                    json={"domain": domain},
-                    timeout=120,
+                url = RUN_API_URL
+                payload = {"domain": domain}
+
+            # results of the last stored-dataset run, per domain:
+            # unchanged data -> 304, nothing is recomputed or resent
+            previous = None
+            headers = {}
+            if not use_uploaded_data:
+                previous = st.session_state.get("run_cache", {}).get(domain)
+                if previous is not None:
+                    headers["If-None-Match"] = previous["etag"]
+
+            # timeout applies between chunks, not to the whole run
+            response = requests.post(
+                url,
+                json=payload,
+                headers=headers,
+                stream=True,
+                timeout=120,
+            )
+
+            if response.status_code == 304:
+                for r in previous["results"]:
+                    render_result(r)
+                st.success(
+                    f"Analysis unchanged for **{domain.upper()}** "
+                    f"({len(previous['results'])} customers)"
                 )
+                st.stop()
 
-                if response.status_code != 200:
-                    st.error(response.text)
-                    st.stop()
-
-                results = response.json()["results"]
+            if response.status_code != 200:
+                st.error(response.text)
+                st.stop()
 
             # ----------------------------------
-            # RENDER RESULTS
+            # RENDER RESULTS (as they arrive)
             # ----------------------------------
-            st.success(f"Analysis completed for **{domain.upper()}**")
-
-            for r in results:
-                with st.expander(
-                    f"👤 Customer {r['customer_id']} | Segment: {r['segment']}",
-                    expanded=False,
-                ):
-                    col1, col2 = st.columns(2)
-
-                    # -----------------------------
-                    # LEFT: SIGNALS
-                    # -----------------------------
-                    with col1:
-                        st.subheader("📊 Behavioral Signals")
-
-                        if r["signals"]:
-                            st.json(r["signals"])
-                        else:
-                            st.info("No behavioral signals available")
-
-                    # -----------------------------
-                    # RIGHT: CAMPAIGN
-                    # -----------------------------
-                    with col2:
-                        st.subheader("🎯 Recommended Campaign")
-
-                        campaign = r["campaign"]
-
-                        st.markdown(
-                            f"""
-                            **Type:** {campaign['campaign_type']}  
-                            **Channel:** {campaign['channel']}  
-                            **Duration:** {campaign['duration_days']} days  
-                            **Estimated Participation:** {campaign['estimated_participation_rate'] * 100:.0f}%  
-                            **Estimated Cost:** ₹{campaign['estimated_cost']:,}  
-                            **Estimated Revenue:** ₹{campaign['estimated_revenue']:,}  
-                            **Estimated ROI:** {campaign['estimated_roi']}x  
-                            """
-                        )
-
-                        st.markdown(
-                            f"**Message Preview:**\n\n> {campaign['message']}"
-                        )
-
-                    # -----------------------------
-                    # REASONING
-                    # -----------------------------
-                    st.subheader("🧠 AI Reasoning")
-
-                    reasoning = r["reasoning"]
-                    st.markdown(reasoning["llm_explanation"])
-
-                    st.caption(
-                        f"Confidence: {reasoning['confidence']} | "
-                        f"Business Risk: {reasoning['business_risk']}"
-                    )
+            results = []
+            for line in response.iter_lines():
+                if line:
+                    results.append(json.loads(line))
+                    render_result(results[-1])
+            count = len(results)
+
+            etag = response.headers.get("ETag")
+            if not use_uploaded_data and etag:
+                st.session_state.setdefault("run_cache", {})[domain] = {
+                    "etag": etag,
+                    "results": results,
+                }
+
+            st.success(
+                f"Analysis completed for **{domain.upper()}** "
+                f"({count} customers)"
+            )
 
         except Exception as e:
             st.error(f"API error: {str(e)}")
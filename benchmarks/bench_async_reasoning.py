@@ -0,0 +1,62 @@
+# benchmarks/bench_async_reasoning.py
+"""
+Serial vs bounded-concurrency reasoning against the local fake LLM.
+
+Usage (from project root):
+    python -m benchmarks.bench_async_reasoning --customers 200 --latency 0.05 --concurrency 1 8 32
+
+The response cache is disabled so every customer hits the server.
+Results must be identical (and in the same order) for every mode.
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.bench_transaction_index import make_transactions
+from benchmarks.fake_llm_server import start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 8, 32]
+    )
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency, jitter=args.jitter)
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "fake")
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+
+    from src.pipeline import run_pipeline_with_data
+
+    customer_ids, transactions = make_transactions(args.customers * 10)
+    customers = [{"customer_id": cid} for cid in customer_ids]
+
+    t0 = time.perf_counter()
+    reference = run_pipeline_with_data(
+        "supermarket", customers, transactions, []
+    )
+    serial_s = time.perf_counter() - t0
+    print(f"{'mode':>16} {'seconds':>9} {'speedup':>8}")
+    print(f"{'serial':>16} {serial_s:9.2f} {1.0:7.1f}x")
+
+    for n in args.concurrency:
+        t0 = time.perf_counter()
+        output = run_pipeline_with_data(
+            "supermarket", customers, transactions, [], concurrency=n
+        )
+        elapsed = time.perf_counter() - t0
+        assert output == reference, "concurrent mode changed results"
+        print(f"{'concurrency=' + str(n):>16} {elapsed:9.2f} "
+              f"{serial_s / elapsed:7.1f}x")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
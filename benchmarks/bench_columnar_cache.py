@@ -0,0 +1,80 @@
+# benchmarks/bench_columnar_cache.py
+"""
+Domain load + index time: JSON parse vs the columnar on-disk cache.
+
+Usage (from project root):
+    python -m benchmarks.bench_columnar_cache
+    python -m benchmarks.bench_columnar_cache --sizes 100000 1000000
+
+Columns:
+- json_s:  iter_json_records + TransactionIndex(compact=True)
+- cold_s:  first run (parse + write .npy cache) + ColumnarTransactionIndex
+- warm_s:  memory-mapped cache + ColumnarTransactionIndex
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_streaming_loader import write_dataset
+from src.agents.behavior_agent import BehaviorAgent
+from src.data.columnar_cache import (
+    ColumnarTransactionIndex,
+    load_transactions_columnar,
+)
+from src.data.transaction_index import TransactionIndex
+from src.domains.supermarket import SUPERMARKET_DOMAIN
+from src.utils import iter_json_records
+
+
+def timed(build):
+    t0 = time.perf_counter()
+    out = build()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+    )
+    args = parser.parse_args()
+
+    agent = BehaviorAgent()
+
+    print(f"{'transactions':>12} {'json_s':>8} {'cold_s':>8} "
+          f"{'warm_s':>8} {'speedup':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transactions.json")
+        cache_dir = os.path.join(tmp, "columnar")
+
+        for n in args.sizes:
+            customer_ids = write_dataset(path, n, ndjson=False)
+
+            def from_cache():
+                columns = load_transactions_columnar(
+                    path, SUPERMARKET_DOMAIN, cache_dir
+                )
+                return ColumnarTransactionIndex(columns, SUPERMARKET_DOMAIN)
+
+            json_index, json_s = timed(lambda: TransactionIndex(
+                iter_json_records(path), SUPERMARKET_DOMAIN, compact=True
+            ))
+            _, cold_s = timed(from_cache)
+            warm_index, warm_s = timed(from_cache)
+
+            for customer_id in customer_ids[:1000]:
+                assert agent.analyze_customer(
+                    customer_id, json_index, SUPERMARKET_DOMAIN
+                ) == agent.analyze_customer(
+                    customer_id, warm_index, SUPERMARKET_DOMAIN
+                ), "columnar cache changed behavior output"
+
+            print(f"{n:>12} {json_s:8.3f} {cold_s:8.3f} {warm_s:8.3f} "
+                  f"{json_s / warm_s:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+# benchmarks/bench_end_to_end.py
+"""
+End-to-end pipeline benchmark on synthetic data, per stage.
+
+Usage (from project root):
+    python -m benchmarks.bench_end_to_end --sizes 1000 10000 100000
+    python -m benchmarks.bench_end_to_end --sizes 1000000 --domains oil --dedupe-reasoning
+    python -m benchmarks.bench_end_to_end --compare benchmarks/results/e2e-abc1234.json
+
+Datasets come from benchmarks.synthetic_data (generated under
+--data-dir, reused when the manifest matches). The response cache
+is disabled; reasoning goes to the in-process template backend
+(--backend template, default: isolates the rest of the pipeline)
+or over HTTP to the local fake LLM (--backend openai / groq).
+--latency / --jitter apply to either.
+
+Stages (seconds, best of --repeat):
+- load: customers + past campaigns + transactions (columnar cache
+  when enabled; the first repeat builds it, so "load_cold" is kept
+  separately)
+- index / behavior / campaign: the pipeline's own report
+- reasoning: the rest of the pipeline wall time (LLM calls);
+  "reasoning_calls" in the JSON is the per-call sum instead
+- pipeline: wall time of the whole run_pipeline_with_data() call
+- serialization: json.dumps of the results
+
+Results are written as JSON (--output, default
+benchmarks/results/e2e-<git sha>.json); --compare prints the
+ratio of every stage against an earlier results file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_llm_server import start_server
+from benchmarks.synthetic_data import generate_domain, read_manifest
+
+STAGES = (
+    "load_cold",
+    "load",
+    "index",
+    "behavior",
+    "campaign",
+    "reasoning",
+    "pipeline",
+    "serialization",
+)
+
+
+def ensure_dataset(data_dir: str, domain_name: str, n: int, args) -> dict:
+    """
+    Dataset for (domain, size) under data_dir/<n>, generated once.
+    """
+    out_dir = os.path.join(data_dir, str(n))
+    manifest = read_manifest(out_dir, domain_name)
+
+    wanted = {
+        "transactions": n,
+        "txns_per_customer": args.txns_per_customer,
+        "seed": args.seed,
+    }
+    if manifest and all(manifest.get(k) == v for k, v in wanted.items()):
+        return manifest
+
+    print(f"  generating {domain_name} x {n} ...", file=sys.stderr)
+    return generate_domain(
+        domain_name,
+        out_dir,
+        n,
+        txns_per_customer=args.txns_per_customer,
+        seed=args.seed,
+    )
+
+
+def load_dataset(out_dir: str, domain_name: str, domain_config, cache_dir):
+    """
+    Same loading path as run_pipeline(), for data under out_dir.
+    """
+    from src.data.columnar_cache import load_transactions_columnar
+    from src.data.records import to_customers
+    from src.utils import iter_json_records
+
+    def data_file(name):
+        base = os.path.join(out_dir, "data", domain_name, name)
+        return base + ".json" if os.path.exists(base + ".json") else (
+            base + ".ndjson"
+        )
+
+    customers = to_customers(iter_json_records(data_file("customers")))
+    past_campaigns = list(iter_json_records(data_file("past_campaigns")))
+
+    if cache_dir is None:
+        transactions = iter_json_records(data_file("transactions"))
+    else:
+        transactions = load_transactions_columnar(
+            data_file("transactions"),
+            domain_config,
+            os.path.join(cache_dir, domain_name, "transactions"),
+        )
+    return customers, transactions, past_campaigns
+
+
+def run_once(manifest, out_dir, cache_dir, args) -> dict:
+    from src.pipeline import get_domain_config, run_pipeline_with_data
+
+    domain_name = manifest["domain"]
+    domain_config = get_domain_config(domain_name)
+
+    started = time.perf_counter()
+    customers, transactions, past_campaigns = load_dataset(
+        out_dir, domain_name, domain_config, cache_dir
+    )
+    load_s = time.perf_counter() - started
+
+    report = {}
+    started = time.perf_counter()
+    results = run_pipeline_with_data(
+        domain_name,
+        customers,
+        transactions,
+        past_campaigns,
+        concurrency=args.concurrency or None,
+        dedupe_reasoning=args.dedupe_reasoning,
+        report=report,
+        workers=args.workers or None,
+    )
+    pipeline_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    payload = json.dumps({"domain": domain_name, "results": results})
+    serialization_s = time.perf_counter() - started
+
+    stages = {"load": load_s}
+    stages.update(report["stage_seconds"])
+    # wall time outside the deterministic stages; the report's
+    # per-call sum is kept as reasoning_calls
+    stages["reasoning_calls"] = stages["reasoning"]
+    stages["reasoning"] = pipeline_s - sum(
+        stages[stage] for stage in ("index", "behavior", "campaign")
+    )
+    stages["pipeline"] = pipeline_s
+    stages["serialization"] = serialization_s
+
+    return {
+        "stages": stages,
+        "results": len(results),
+        "output_bytes": len(payload),
+        "reasoning_buckets": report.get("reasoning_buckets"),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline_path: str, current: dict):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def key(run):
+        return run["domain"], run["transactions"]
+
+    previous = {key(run): run for run in baseline["runs"]}
+
+    print(f"\nvs {baseline.get('commit')} ({baseline_path}); "
+          f"new / old, < 1 is faster")
+    print(f"{'domain':>12} {'rows':>9} " +
+          " ".join(f"{stage:>10}" for stage in STAGES))
+    for run in current["runs"]:
+        old = previous.get(key(run))
+        if old is None:
+            continue
+        ratios = []
+        for stage in STAGES:
+            new_s = run["stages"].get(stage)
+            old_s = old["stages"].get(stage)
+            ratios.append(
+                f"{new_s / old_s:10.2f}" if new_s and old_s else f"{'-':>10}"
+            )
+        print(f"{run['domain']:>12} {run['transactions']:>9} " +
+              " ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+    )
+    parser.add_argument(
+        "--domains", nargs="+", default=["supermarket", "oil", "banking"],
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--txns-per-customer", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--data-dir", default=os.path.join(".cache", "synthetic"),
+        help="Where generated datasets are kept between runs",
+    )
+    parser.add_argument(
+        "--no-columnar", action="store_true",
+        help="Stream-parse transactions instead of the columnar cache",
+    )
+    parser.add_argument(
+        "--backend", choices=["template", "openai", "groq"],
+        default="template",
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--dedupe-reasoning", action="store_true")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--output")
+    parser.add_argument("--compare", metavar="RESULTS_JSON")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"e2e-{commit}.json"
+    )
+
+    server = None
+    os.environ["LLM_BACKEND"] = args.backend
+    if args.backend == "template":
+        os.environ["LLM_TEMPLATE_LATENCY_SECONDS"] = str(args.latency)
+        os.environ["LLM_TEMPLATE_JITTER_SECONDS"] = str(args.jitter)
+    else:
+        server = start_server(latency=args.latency, jitter=args.jitter)
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        os.environ["LLM_BASE_URL"] = server.base_url + "/v1"
+        os.environ.setdefault("GROQ_API_KEY", "fake")
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+
+    current = {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {
+            k: v for k, v in vars(args).items()
+            if k not in ("output", "compare")
+        },
+        "runs": [],
+    }
+
+    print(f"{'domain':>12} {'rows':>9} " +
+          " ".join(f"{stage:>10}" for stage in STAGES))
+
+    for n in args.sizes:
+        for domain_name in args.domains:
+            manifest = ensure_dataset(args.data_dir, domain_name, n, args)
+            out_dir = os.path.join(args.data_dir, str(n))
+
+            with tempfile.TemporaryDirectory() as cache_root:
+                cache_dir = None if args.no_columnar else cache_root
+                runs = [
+                    run_once(manifest, out_dir, cache_dir, args)
+                    for _ in range(max(1, args.repeat))
+                ]
+
+            stages = {
+                stage: min(run["stages"][stage] for run in runs)
+                for stage in runs[0]["stages"]
+            }
+            stages["load_cold"] = runs[0]["stages"]["load"]
+
+            current["runs"].append({
+                "domain": domain_name,
+                "transactions": manifest["transactions"],
+                "customers": manifest["customers"],
+                "stages": stages,
+                "output_bytes": runs[0]["output_bytes"],
+                "reasoning_buckets": runs[0]["reasoning_buckets"],
+                # process high-water mark so far (monotonic across runs)
+                "max_rss_mb": round(
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                    / 1024, 1
+                ),
+            })
+
+            print(f"{domain_name:>12} {n:>9} " +
+                  " ".join(f"{stages[stage]:10.3f}" for stage in STAGES))
+
+    if server is not None:
+        server.shutdown()
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nresults: {output}")
+
+    if args.compare:
+        compare(args.compare, current)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_llm_client_pool.py
+"""
+Per-call LLM client construction vs the shared pooled client.
+
+Usage (from project root):
+    python -m benchmarks.bench_llm_client_pool --calls 200
+    python -m benchmarks.bench_llm_client_pool --base-url https://api.groq.com  # real API (TLS)
+
+"fresh" builds a new LLMClient (new connection, new TLS session) for
+every call, like the pipeline did before the shared registry; "shared"
+reuses one client and its keep-alive pool. Against the local fake
+server the gap is TCP setup only; over TLS it is much larger.
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.fake_llm_server import start_server
+from src.llm.backends import GroqBackend
+from src.llm.llm_client import LLMClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument(
+        "--base-url", default=None,
+        help="Target API (default: an in-process fake server)",
+    )
+    args = parser.parse_args()
+
+    base_url = args.base_url
+    if base_url is None:
+        base_url = start_server().base_url
+        os.environ.setdefault("GROQ_API_KEY", "fake")
+
+    prompts = [f"prompt {i}" for i in range(args.calls)]
+
+    t0 = time.perf_counter()
+    for prompt in prompts:
+        client = LLMClient(GroqBackend(base_url=base_url))
+        client.run(prompt)
+        client.close()
+    fresh_s = time.perf_counter() - t0
+
+    client = LLMClient(GroqBackend(base_url=base_url))
+    t0 = time.perf_counter()
+    for prompt in prompts:
+        client.run(prompt)
+    shared_s = time.perf_counter() - t0
+    client.close()
+
+    print(f"{'mode':>8} {'seconds':>9} {'ms/call':>8}")
+    for mode, seconds in (("fresh", fresh_s), ("shared", shared_s)):
+        print(f"{mode:>8} {seconds:9.2f} {seconds / args.calls * 1e3:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
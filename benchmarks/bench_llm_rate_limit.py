@@ -0,0 +1,114 @@
+# benchmarks/bench_llm_rate_limit.py
+"""
+Concurrent reasoning against a throttling fake LLM (HTTP 429s).
+
+Usage (from project root):
+    python -m benchmarks.bench_llm_rate_limit --customers 200 --max-inflight 8 --rpm-limit 150
+
+Scenarios (response cache disabled, --concurrency calls in flight):
+- no-retry: LLM_MAX_RETRIES=0, i.e. the old behavior; the first 429
+  aborts the run
+- inflight: the server rejects more than --max-inflight concurrent
+  calls; backoff + AIMD recover and the limit settles near it
+- rpm: the server allows --rpm-limit requests / minute; with the
+  same LLM_RPM_LIMIT on the client, calls are paced instead of
+  rejected
+
+Every completed run must match the unthrottled reference output.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.bench_transaction_index import make_transactions
+from benchmarks.fake_llm_server import start_server
+
+
+def run_scenario(name, server, env, customers, transactions, args, reference):
+    from src.llm.llm_client import close_llm_client, get_llm_client
+    from src.pipeline import run_pipeline_with_data
+
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.update(env)
+    asyncio.run(close_llm_client())  # rebuild from the new settings
+
+    throttled_before = server.throttled_count
+    t0 = time.perf_counter()
+    try:
+        output = run_pipeline_with_data(
+            "supermarket", customers, transactions, [],
+            concurrency=args.concurrency,
+        )
+        outcome = "ok"
+        assert reference is None or output == reference, (
+            f"{name}: throttling changed results"
+        )
+    except Exception as e:
+        output = None
+        outcome = f"failed ({type(e).__name__})"
+    elapsed = time.perf_counter() - t0
+
+    concurrency = get_llm_client().limiter.concurrency
+    limit = f"{concurrency.limit:.1f}" if concurrency else "-"
+    print(f"{name:>10} {outcome:>24} {elapsed:9.2f} "
+          f"{server.throttled_count - throttled_before:>6} {limit:>7}")
+
+    for key in env:
+        del os.environ[key]
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-inflight", type=int, default=8)
+    parser.add_argument("--rpm-limit", type=int, default=150)
+    args = parser.parse_args()
+
+    os.environ.setdefault("GROQ_API_KEY", "fake")
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+
+    customer_ids, transactions = make_transactions(args.customers * 10)
+    customers = [{"customer_id": cid} for cid in customer_ids]
+
+    open_server = start_server(latency=args.latency, jitter=args.jitter)
+    inflight_server = start_server(
+        latency=args.latency, jitter=args.jitter,
+        max_inflight=args.max_inflight,
+    )
+
+    print(f"{'scenario':>10} {'outcome':>24} {'seconds':>9} "
+          f"{'429s':>6} {'limit':>7}")
+    reference = run_scenario(
+        "reference", open_server, {}, customers, transactions, args, None
+    )
+    run_scenario(
+        "no-retry", inflight_server, {"LLM_MAX_RETRIES": "0"},
+        customers, transactions, args, reference,
+    )
+    run_scenario(
+        "inflight", inflight_server, {},
+        customers, transactions, args, reference,
+    )
+
+    # a fresh server: its bucket starts with one minute of burst, so
+    # only a run longer than that burst is paced
+    rpm_server = start_server(
+        latency=args.latency, jitter=args.jitter, rpm_limit=args.rpm_limit,
+    )
+    run_scenario(
+        "rpm", rpm_server, {"LLM_RPM_LIMIT": str(args.rpm_limit)},
+        customers, transactions, args, reference,
+    )
+
+    for server in (open_server, inflight_server, rpm_server):
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
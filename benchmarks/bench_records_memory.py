@@ -0,0 +1,84 @@
+# benchmarks/bench_records_memory.py
+"""
+Resident size of N transactions: row dicts vs slotted Transaction
+records (interned strings) vs the columnar table.
+
+Usage (from project root):
+    python -m benchmarks.bench_records_memory --sizes 100000 1000000
+    python -m benchmarks.bench_records_memory --sizes 1000000 10000000
+
+Rows are produced by json.loads on one line each, like the JSON
+loaders, so every dict owns its own string objects. Measured with
+tracemalloc (bytes still allocated once the table is built); the
+dict column at 10M rows needs ~10 GB of RAM, use --skip-dicts there.
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.bench_transaction_index import ITEMS, TXNS_PER_CUSTOMER
+from src.data.columnar_cache import build_columnar
+from src.data.records import to_transactions
+from src.domains.supermarket import SUPERMARKET_DOMAIN
+
+
+def iter_rows(n: int):
+    start = datetime(2025, 1, 1)
+    n_customers = max(1, n // TXNS_PER_CUSTOMER)
+    for i in range(n):
+        item_name, category = ITEMS[i % len(ITEMS)]
+        yield json.loads(json.dumps({
+            "customer_id": f"C{i % n_customers:07d}",
+            "timestamp": (start + timedelta(minutes=i)).isoformat(),
+            "item_name": item_name,
+            "category": category,
+            "amount": 50 + i % 5000,
+            "metadata": {},
+        }))
+
+
+def retained_bytes(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    table = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000],
+    )
+    parser.add_argument(
+        "--skip-dicts", action="store_true",
+        help="Do not materialize the dict baseline",
+    )
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'dicts_MB':>9} {'records_MB':>11} "
+          f"{'columnar_MB':>12} {'B/dict':>7} {'B/record':>9}")
+
+    for n in args.sizes:
+        if args.skip_dicts:
+            dicts = float("nan")
+        else:
+            dicts = retained_bytes(lambda: list(iter_rows(n)))
+        records = retained_bytes(lambda: to_transactions(iter_rows(n)))
+        columnar = retained_bytes(
+            lambda: build_columnar(iter_rows(n), SUPERMARKET_DOMAIN)
+        )
+
+        print(f"{n:>10} {dicts / 2**20:9.1f} {records / 2**20:11.1f} "
+              f"{columnar / 2**20:12.1f} {dicts / n:7.0f} "
+              f"{records / n:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_sharded_workers.py
+"""
+Scaling of the sharded behavior stage from 1 to N worker processes.
+
+Usage (from project root):
+    python -m benchmarks.bench_sharded_workers --transactions 2000000 --workers 1 2 4 8
+    python -m benchmarks.bench_sharded_workers --min-rows 0
+
+"in-process" is the batch pass used when workers is unset (row
+index, or columnar index for columns). Each sharded mode runs twice
+against the shared process pool: "cold" includes starting the
+workers, "warm" reuses them like every later run in the same
+process. Inputs under SHARDED_MIN_ROWS run in-process; --min-rows 0
+forces the pool. Every mode must produce identical behavior output.
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.bench_transaction_index import make_transactions
+from src.agents.behavior_agent import BehaviorAgent
+from src.data.columnar_cache import ColumnarTransactionIndex, build_columnar
+from src.data.transaction_index import TransactionIndex
+from src.domains.supermarket import SUPERMARKET_DOMAIN
+from src.parallel import close_process_pool, run_behavior_sharded
+
+
+def in_process(customers, transactions):
+    if isinstance(transactions, list):
+        index = TransactionIndex(transactions, SUPERMARKET_DOMAIN)
+    else:
+        index = ColumnarTransactionIndex(transactions, SUPERMARKET_DOMAIN)
+
+    return BehaviorAgent().analyze_index(
+        [customer["customer_id"] for customer in customers],
+        index,
+        SUPERMARKET_DOMAIN,
+    )
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    output = fn(*args)
+    return time.perf_counter() - t0, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+",
+        default=[1, 2, 4, os.cpu_count() or 1],
+    )
+    parser.add_argument(
+        "--min-rows", type=int, default=None,
+        help="Override SHARDED_MIN_ROWS (0 always uses the pool)",
+    )
+    args = parser.parse_args()
+
+    if args.min_rows is not None:
+        os.environ["SHARDED_MIN_ROWS"] = str(args.min_rows)
+
+    customer_ids, transactions = make_transactions(args.transactions)
+    customers = [{"customer_id": cid} for cid in customer_ids]
+    inputs = {
+        "rows": transactions,
+        "columnar": build_columnar(transactions, SUPERMARKET_DOMAIN),
+    }
+
+    # first batch pass imports numpy: keep it out of the timings
+    in_process(customers[:1], transactions[:1])
+
+    print(f"{'input':>9} {'mode':>12} {'cold_s':>8} {'warm_s':>8} "
+          f"{'speedup':>8}")
+
+    for name, data in inputs.items():
+        baseline_s, reference = timed(in_process, customers, data)
+        print(f"{name:>9} {'in-process':>12} {'-':>8} {baseline_s:8.2f} "
+              f"{1.0:7.1f}x")
+
+        for workers in args.workers:
+            close_process_pool()
+            cold_s, output = timed(
+                run_behavior_sharded,
+                SUPERMARKET_DOMAIN, customers, data, workers,
+            )
+            assert output == reference, "sharding changed results"
+            warm_s, output = timed(
+                run_behavior_sharded,
+                SUPERMARKET_DOMAIN, customers, data, workers,
+            )
+            assert output == reference, "sharding changed results"
+            print(f"{name:>9} {'workers=' + str(workers):>12} "
+                  f"{cold_s:8.2f} {warm_s:8.2f} "
+                  f"{baseline_s / warm_s:7.1f}x")
+
+    close_process_pool()
+
+
+if __name__ == "__main__":
+    main()
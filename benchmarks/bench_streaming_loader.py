@@ -0,0 +1,108 @@
+# benchmarks/bench_streaming_loader.py
+"""
+Peak memory of loading + indexing transactions.json:
+json.load (full list of dicts) vs iter_json_records + compact index.
+
+Usage (from project root):
+    python -m benchmarks.bench_streaming_loader
+    python -m benchmarks.bench_streaming_loader --sizes 10000 100000 --ndjson
+
+Peak memory is measured with tracemalloc (Python allocations only),
+which also slows both paths down; compare times relative to each other.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_transaction_index import make_transactions
+from src.agents.behavior_agent import BehaviorAgent
+from src.data.transaction_index import TransactionIndex
+from src.domains.supermarket import SUPERMARKET_DOMAIN
+from src.utils import iter_json_records, load_json
+
+
+def write_dataset(path: str, n: int, ndjson: bool):
+    customer_ids, transactions = make_transactions(n)
+    for i, t in enumerate(transactions):
+        # production-like payload the stages never read
+        t["metadata"] = {
+            "store_id": f"S{i % 250:04d}",
+            "channel": "pos" if i % 3 else "online",
+            "basket_id": f"B{i:010d}",
+            "loyalty_points": i % 97,
+        }
+
+    with open(path, "w") as f:
+        if ndjson:
+            for t in transactions:
+                f.write(json.dumps(t) + "\n")
+        else:
+            json.dump(transactions, f)
+    return customer_ids
+
+
+def measure(build):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    index = build()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000],
+    )
+    parser.add_argument(
+        "--ndjson", action="store_true",
+        help="Write the dataset as NDJSON instead of a JSON array",
+    )
+    args = parser.parse_args()
+
+    agent = BehaviorAgent()
+
+    print(f"{'transactions':>12} {'load_MB':>9} {'stream_MB':>10} "
+          f"{'load_s':>8} {'stream_s':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transactions.json")
+
+        for n in args.sizes:
+            customer_ids = write_dataset(path, n, args.ndjson)
+
+            if args.ndjson:
+                loaded = lambda: TransactionIndex(  # noqa: E731
+                    list(iter_json_records(path)), SUPERMARKET_DOMAIN
+                )
+            else:
+                loaded = lambda: TransactionIndex(  # noqa: E731
+                    load_json(path), SUPERMARKET_DOMAIN
+                )
+            streamed = lambda: TransactionIndex(  # noqa: E731
+                iter_json_records(path), SUPERMARKET_DOMAIN, compact=True
+            )
+
+            load_index, load_s, load_peak = measure(loaded)
+            stream_index, stream_s, stream_peak = measure(streamed)
+
+            for customer_id in customer_ids:
+                assert agent.analyze_customer(
+                    customer_id, load_index, SUPERMARKET_DOMAIN
+                ) == agent.analyze_customer(
+                    customer_id, stream_index, SUPERMARKET_DOMAIN
+                ), "compact index changed behavior output"
+
+            print(f"{n:>12} {load_peak / 2**20:9.1f} "
+                  f"{stream_peak / 2**20:10.1f} "
+                  f"{load_s:8.2f} {stream_s:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
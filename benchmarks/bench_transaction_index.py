@@ -0,0 +1,141 @@
+# benchmarks/bench_transaction_index.py
+"""
+Behavior-stage scaling: legacy flat-list scan vs TransactionIndex
+(per customer) vs batch mode (BehaviorAgent.analyze_index(), what
+pipeline runs use).
+
+Usage (from project root):
+    python -m benchmarks.bench_transaction_index
+    python -m benchmarks.bench_transaction_index --sizes 1000 10000 100000 --legacy-max 10000
+
+The legacy path is O(customers x transactions); the indexed path
+should grow linearly with the number of transactions. batch_s
+includes building the index, like indexed_s; columnar_s starts from
+already built columns, like a run served from the columnar cache.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from src.agents.behavior_agent import BehaviorAgent
+from src.data.columnar_cache import ColumnarTransactionIndex, build_columnar
+from src.data.transaction_index import TransactionIndex
+from src.domains.supermarket import SUPERMARKET_DOMAIN
+
+
+TXNS_PER_CUSTOMER = 10
+ITEMS = [
+    ("Organic Milk", "Dairy"),
+    ("Store Brand Bread", "Bakery"),
+    ("Wagyu Steak", "Meat"),
+    ("Frozen Peas", "Frozen"),
+    ("Basic Rice", "Grains"),
+    ("Artisan Cheese", "Dairy"),
+]
+
+
+def make_transactions(n_transactions: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    n_customers = max(1, n_transactions // TXNS_PER_CUSTOMER)
+
+    transactions = []
+    for i in range(n_transactions):
+        item_name, category = rng.choice(ITEMS)
+        ts = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 90))
+        transactions.append({
+            "customer_id": f"C{i % n_customers:07d}",
+            "timestamp": ts.isoformat(),
+            "item_name": item_name,
+            "category": category,
+            "amount": rng.randint(50, 5000),
+            "metadata": {},
+        })
+
+    customer_ids = [f"C{i:07d}" for i in range(n_customers)]
+    return customer_ids, transactions
+
+
+def time_legacy(agent, customer_ids, transactions):
+    t0 = time.perf_counter()
+    out = [
+        agent.analyze_customer(cid, transactions, SUPERMARKET_DOMAIN)
+        for cid in customer_ids
+    ]
+    return time.perf_counter() - t0, out
+
+
+def time_indexed(agent, customer_ids, transactions):
+    t0 = time.perf_counter()
+    index = TransactionIndex(transactions, SUPERMARKET_DOMAIN)
+    out = [
+        agent.analyze_customer(cid, index, SUPERMARKET_DOMAIN)
+        for cid in customer_ids
+    ]
+    return time.perf_counter() - t0, out
+
+
+def time_batch(agent, customer_ids, transactions):
+    t0 = time.perf_counter()
+    index = TransactionIndex(transactions, SUPERMARKET_DOMAIN)
+    out = agent.analyze_index(customer_ids, index, SUPERMARKET_DOMAIN)
+    return time.perf_counter() - t0, out
+
+
+def time_columnar(agent, customer_ids, columns):
+    t0 = time.perf_counter()
+    index = ColumnarTransactionIndex(columns, SUPERMARKET_DOMAIN)
+    out = agent.analyze_index(customer_ids, index, SUPERMARKET_DOMAIN)
+    return time.perf_counter() - t0, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+",
+        default=[1_000, 10_000, 100_000, 1_000_000],
+    )
+    parser.add_argument(
+        "--legacy-max", type=int, default=20_000,
+        help="Skip the quadratic legacy path above this many transactions",
+    )
+    args = parser.parse_args()
+
+    agent = BehaviorAgent()
+
+    # first batch call imports numpy: keep it out of the timings
+    agent.analyze_index([], TransactionIndex([], SUPERMARKET_DOMAIN),
+                        SUPERMARKET_DOMAIN)
+
+    print(f"{'transactions':>12} {'legacy_s':>10} {'indexed_s':>10} "
+          f"{'us/txn':>8} {'speedup':>8} {'batch_s':>9} "
+          f"{'columnar_s':>10} {'batch_x':>8}")
+
+    for n in args.sizes:
+        customer_ids, transactions = make_transactions(n)
+        indexed_s, indexed_out = time_indexed(agent, customer_ids, transactions)
+
+        batch_s, batch_out = time_batch(agent, customer_ids, transactions)
+        assert batch_out == indexed_out, "batch mode changed behavior output"
+        columns = build_columnar(transactions, SUPERMARKET_DOMAIN)
+        columnar_s, columnar_out = time_columnar(agent, customer_ids, columns)
+        assert columnar_out == indexed_out, "columnar batch changed output"
+
+        if n <= args.legacy_max:
+            legacy_s, legacy_out = time_legacy(agent, customer_ids, transactions)
+            assert legacy_out == indexed_out, "index changed behavior output"
+            legacy_col = f"{legacy_s:10.3f}"
+            speedup_col = f"{legacy_s / indexed_s:7.1f}x"
+        else:
+            legacy_col = f"{'-':>10}"
+            speedup_col = f"{'-':>8}"
+
+        print(f"{n:>12} {legacy_col} {indexed_s:10.3f} "
+              f"{indexed_s / n * 1e6:8.2f} {speedup_col} {batch_s:9.3f} "
+              f"{columnar_s:10.3f} {indexed_s / batch_s:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
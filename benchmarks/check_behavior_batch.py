@@ -0,0 +1,125 @@
+# benchmarks/check_behavior_batch.py
+"""
+Equivalence check: BehaviorAgent.analyze_all() and analyze_index()
+(vectorized; analyze_index() over row, compact and columnar
+indexes) vs analyze_customer() (reference) on random transactions.
+
+Usage (from project root):
+    python -m benchmarks.check_behavior_batch
+    python benchmarks/check_behavior_batch.py
+    python -m benchmarks.check_behavior_batch --customers 2000 --seeds 1 2 3
+
+Rows deliberately include missing categories and item names
+(None), timestamp ties and sparse customers. Exits non-zero on the
+first customer whose output differs.
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+if __package__ in (None, ""):
+    # run by path: make `src` importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)
+    )))
+
+CATEGORIES = ["Fresh", "Dairy", "Bakery", "Fuel", None]
+ITEMS = [
+    "Premium Coffee", "Regular Milk", "Basic Bread", "High Octane 98",
+    "Standard Diesel", "Value Pack Rice", "Organic Eggs", None,
+]
+
+
+def make_rows(n_customers: int, seed: int, missing_rate: float):
+    from src.data.records import Transaction
+
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for c in range(n_customers):
+        customer_id = f"C{c:05d}"
+        for _ in range(rng.choice([0, 1, 2, 3, 5, 8, 13, 21])):
+            category = rng.choice(CATEGORIES[:-1])
+            item = rng.choice(ITEMS[:-1])
+            if rng.random() < missing_rate:
+                category = None
+            if rng.random() < missing_rate:
+                item = None
+            # coarse timestamps: plenty of ties
+            when = start + timedelta(days=rng.randrange(0, 120))
+            rows.append(Transaction(
+                customer_id, when.isoformat(), item, category,
+                round(rng.uniform(1, 90), 2),
+            ))
+    rng.shuffle(rows)
+    ids = [f"C{c:05d}" for c in range(n_customers)]
+    return ids, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--missing-rate", type=float, default=0.15)
+    parser.add_argument(
+        "--domains", nargs="+", default=["supermarket", "oil", "banking"],
+    )
+    args = parser.parse_args()
+
+    from src.agents.behavior_agent import BehaviorAgent
+    from src.data.columnar_cache import (
+        ColumnarTransactionIndex,
+        build_columnar,
+    )
+    from src.data.transaction_index import TransactionIndex
+    from src.pipeline import get_domain_config
+
+    agent = BehaviorAgent()
+    checked = 0
+    for domain_name in args.domains:
+        domain_config = get_domain_config(domain_name)
+        for seed in args.seeds:
+            ids, rows = make_rows(args.customers, seed, args.missing_rate)
+            index = TransactionIndex(rows, domain_config)
+            # customers without rows, repeated ones, a subset
+            subset = ids[::2] + ["UNKNOWN"] + ids[:3]
+
+            paths = {
+                "analyze_all": agent.analyze_all(ids, rows, domain_config),
+                "index": agent.analyze_index(ids, index, domain_config),
+                "compact index": agent.analyze_index(
+                    ids,
+                    TransactionIndex(iter(rows), domain_config, compact=True),
+                    domain_config,
+                ),
+                "columnar index": agent.analyze_index(
+                    ids,
+                    ColumnarTransactionIndex(
+                        build_columnar(rows, domain_config), domain_config
+                    ),
+                    domain_config,
+                ),
+                "subset": agent.analyze_index(subset, index, domain_config),
+            }
+
+            for name, batch in paths.items():
+                requested = subset if name == "subset" else ids
+                for customer_id, got in zip(requested, batch):
+                    expected = agent.analyze_customer(
+                        customer_id, index, domain_config
+                    )
+                    if got != expected:
+                        print(f"MISMATCH {name} {domain_name} seed={seed} "
+                              f"{customer_id}\n  batch:     {got}\n"
+                              f"  reference: {expected}")
+                        sys.exit(1)
+                    checked += 1
+
+    print(f"ok: {checked} customer results identical")
+
+
+if __name__ == "__main__":
+    main()
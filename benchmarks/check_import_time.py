@@ -0,0 +1,104 @@
+# benchmarks/check_import_time.py
+"""
+Import-time budget check for CLI / API cold start.
+
+Usage (from project root):
+    python -m benchmarks.check_import_time
+    python -m benchmarks.check_import_time --budget src.pipeline=100
+
+Imports each entry module in a fresh interpreter with
+`python -X importtime` (best of --runs, after one warm-up run that
+writes bytecode caches) and exits non-zero when:
+- its cumulative import time exceeds the budget, or
+- a deferred heavy dependency (LLM stack, numpy / pandas, dotenv)
+  got imported at module load.
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Cumulative import time budgets (ms); generous vs. a warm dev box
+DEFAULT_BUDGETS_MS = {
+    "src.pipeline": 150,
+    "src.api.main": 1000,
+}
+
+# Must only be imported on first use
+DEFERRED_MODULES = ("groq", "httpx", "dotenv", "numpy", "pandas")
+
+
+def import_profile(module: str):
+    """
+    (cumulative ms for `module`, set of every imported module name)
+    """
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us = None
+    imported = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+
+    return cumulative_us / 1000, imported
+
+
+def parse_budget(value: str):
+    module, _, ms = value.partition("=")
+    return module, float(ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--budget", type=parse_budget, action="append", default=[],
+        metavar="MODULE=MS", help="Override or add a budget",
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    budgets.update(args.budget)
+
+    failures = []
+    print(f"{'module':>16} {'ms':>8} {'budget':>8}  deferred imports")
+
+    for module, budget_ms in budgets.items():
+        import_profile(module)  # warm-up (bytecode caches)
+        profiles = [import_profile(module) for _ in range(args.runs)]
+        best_ms = min(ms for ms, _ in profiles)
+
+        leaked = sorted(
+            name for name in profiles[0][1]
+            if name.split(".")[0] in DEFERRED_MODULES
+            and "." not in name
+        )
+
+        print(f"{module:>16} {best_ms:8.1f} {budget_ms:8.0f}  "
+              f"{', '.join(leaked) or '-'}")
+
+        if best_ms > budget_ms:
+            failures.append(f"{module}: {best_ms:.1f} ms > {budget_ms:.0f} ms")
+        if leaked:
+            failures.append(f"{module}: imports {', '.join(leaked)} at load")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
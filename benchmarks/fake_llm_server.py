@@ -0,0 +1,210 @@
+# benchmarks/fake_llm_server.py
+"""
+Local stand-in for the Groq / OpenAI chat-completions API.
+
+Answers POST .../chat/completions with a deterministic explanation
+after an injected latency, so reasoning can be exercised and
+benchmarked without the network.
+
+Optional throttling, answered like the real API (HTTP 429 with
+retry-after / retry-after-ms headers):
+- --rpm-limit: requests / minute (token bucket, one minute of burst)
+- --max-inflight: concurrent requests
+
+Usage (from project root):
+    python -m benchmarks.fake_llm_server --port 8765 --latency 0.2 --jitter 0.05
+    python -m benchmarks.fake_llm_server --max-inflight 8 --rpm-limit 600
+
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=fake python -m src.pipeline
+    LLM_BACKEND=openai LLM_BASE_URL=http://127.0.0.1:8765/v1 python -m src.pipeline
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes: without this, keep-alive
+    # connections pay Nagle + delayed-ACK (~40 ms) on every response
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found"}})
+            return
+
+        request = json.loads(body or b"{}")
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+
+        server = self.server
+        with server.stats_lock:
+            server.request_count += 1
+            retry_after = server.admit()
+            if retry_after is not None:
+                server.throttled_count += 1
+
+        if retry_after is not None:
+            self._send(429, {
+                "error": {
+                    "message": "Rate limit reached",
+                    "type": "requests",
+                    "code": "rate_limit_exceeded",
+                },
+            }, {
+                "retry-after": str(math.ceil(retry_after)),
+                "retry-after-ms": str(int(retry_after * 1000)),
+            })
+            return
+
+        try:
+            delay = server.latency + random.uniform(0, server.jitter)
+            if delay > 0:
+                time.sleep(delay)
+        finally:
+            with server.stats_lock:
+                server.inflight -= 1
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        content = f"[fake-llm {digest}] Explanation for the observed signals."
+
+        self._send(200, {
+            "id": f"chatcmpl-{digest}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt.split()),
+                "completion_tokens": len(content.split()),
+                "total_tokens": len(prompt.split()) + len(content.split()),
+            },
+        })
+
+    def _send(self, status: int, payload: dict, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency, jitter, rpm_limit, max_inflight):
+        super().__init__(address, FakeLLMHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.rpm_limit = rpm_limit
+        self.max_inflight = max_inflight
+
+        self.request_count = 0
+        self.throttled_count = 0
+        self.inflight = 0
+        self.stats_lock = threading.Lock()
+
+        self._allowance = float(rpm_limit)
+        self._updated = time.monotonic()
+
+    def admit(self):
+        """
+        None if the request may run (counted in flight), else the
+        seconds to ask the client to wait. Called under stats_lock.
+        """
+        if self.max_inflight and self.inflight >= self.max_inflight:
+            return 0.05 * random.uniform(1, 2)
+
+        if self.rpm_limit:
+            now = time.monotonic()
+            rate = self.rpm_limit / 60.0
+            self._allowance = min(
+                float(self.rpm_limit),
+                self._allowance + (now - self._updated) * rate,
+            )
+            self._updated = now
+            if self._allowance < 1:
+                return (1 - self._allowance) / rate
+            self._allowance -= 1
+
+        self.inflight += 1
+        return None
+
+    def handle_error(self, request, client_address):
+        # clients dropping keep-alive connections (e.g. an aborted
+        # run) are not server errors
+        import sys
+
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    rpm_limit: int = 0,
+    max_inflight: int = 0,
+) -> FakeLLMServer:
+    """
+    Start the fake server in a daemon thread.
+    port=0 picks a free port; see server.base_url.
+    rpm_limit / max_inflight: 0 = no throttling; rejected requests
+    are counted in server.throttled_count.
+    """
+
+    server = FakeLLMServer(
+        (host, port), latency, jitter, rpm_limit, max_inflight
+    )
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rpm-limit", type=int, default=0)
+    parser.add_argument("--max-inflight", type=int, default=0)
+    args = parser.parse_args()
+
+    server = start_server(
+        args.host,
+        args.port,
+        args.latency,
+        args.jitter,
+        rpm_limit=args.rpm_limit,
+        max_inflight=args.max_inflight,
+    )
+    print(f"Fake LLM listening on {server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
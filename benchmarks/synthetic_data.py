@@ -0,0 +1,452 @@
+# benchmarks/synthetic_data.py
+"""
+Synthetic customers / transactions / past_campaigns per domain,
+in the same layout and schema as data/<domain>/.
+
+Usage (from project root):
+    python -m benchmarks.synthetic_data --out /tmp/synth --transactions 100000
+    python -m benchmarks.synthetic_data --out /tmp/synth --domains oil --transactions 10000000 --ndjson
+
+Writes <out>/data/<domain>/{customers,transactions,past_campaigns}
+(.json arrays, or .ndjson) plus manifest.json. Output is fully
+determined by the arguments (seeded), and transactions are streamed
+to disk, so 1e7 rows only keep the customer list in memory.
+
+Customers follow a few behavior archetypes (stable, downtrading,
+narrowing, lapsing, sparse, no activity), giving a mixed segment
+distribution rather than one segment for everybody.
+Rows are grouped by customer, chronological within a customer, like
+the hand-written files.
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# History covered by generated transactions
+HISTORY_END = datetime(2025, 6, 30)
+HISTORY_DAYS = 180
+
+# (name, weight, transactions per customer override)
+ARCHETYPES = [
+    ("stable", 0.43, None),
+    ("downtrading", 0.15, None),
+    ("narrowing", 0.15, None),
+    ("lapsing", 0.15, None),
+    ("sparse", 0.10, 2),
+    ("no_activity", 0.02, 0),
+]
+
+# Catalogs: category -> [(item_name, tier, min amount, max amount)]
+# Tiers: P(remium) / V(alue) / N(eutral), matching each domain's
+# quality keywords.
+CATALOGS = {
+    "supermarket": {
+        "Dairy": [
+            ("Organic Milk", "P", 90, 160),
+            ("Artisan Cheese", "P", 250, 600),
+            ("Whole Milk", "N", 60, 90),
+            ("Store Brand Yogurt", "V", 30, 60),
+        ],
+        "Bakery": [
+            ("Artisan Bread", "P", 120, 200),
+            ("Croissants", "N", 80, 140),
+            ("Store Brand Bread", "V", 40, 70),
+        ],
+        "Meat": [
+            ("Wagyu Steak", "P", 1500, 4000),
+            ("Chicken Breast", "N", 300, 600),
+            ("Economy Mince", "V", 150, 300),
+        ],
+        "Produce": [
+            ("Imported Avocados", "P", 200, 400),
+            ("Organic Apples", "P", 150, 300),
+            ("Bananas", "N", 40, 90),
+        ],
+        "Frozen": [
+            ("Frozen Peas", "V", 60, 110),
+            ("Frozen Pizza", "V", 150, 260),
+        ],
+        "Pantry": [
+            ("Single Origin Coffee", "P", 400, 900),
+            ("Pasta", "N", 60, 120),
+            ("Basic Rice", "V", 80, 160),
+            ("Instant Noodles", "V", 20, 50),
+        ],
+        "Household": [
+            ("Luxury Hand Soap", "P", 200, 450),
+            ("Budget Detergent", "V", 100, 220),
+        ],
+    },
+    "oil": {
+        "Fuel": [
+            ("Premium Petrol", "P", 2000, 3200),
+            ("Power Diesel", "P", 2200, 3500),
+            ("Regular Petrol", "V", 1400, 2400),
+            ("Standard Diesel", "V", 1600, 2600),
+        ],
+        "Lubricants": [
+            ("Xtra Engine Oil", "P", 900, 1600),
+            ("Basic Engine Oil", "V", 500, 900),
+        ],
+        "Convenience": [
+            ("Coffee", "N", 80, 200),
+            ("Snacks", "N", 50, 250),
+        ],
+        "Services": [
+            ("Car Wash", "N", 300, 800),
+            ("Tyre Check", "N", 0, 100),
+        ],
+    },
+    "banking": {
+        "Creditbanking": [
+            ("Credit Card Spend", "P", 1000, 9000),
+        ],
+        "Lending": [
+            ("Loan Repayment", "P", 5000, 25000),
+        ],
+        "Investments": [
+            ("Investment Deposit", "P", 10000, 80000),
+        ],
+        "Payments": [
+            ("Debit Card Spend", "V", 200, 3000),
+            ("Bill Payment", "N", 500, 4000),
+        ],
+        "Savings": [
+            ("Savings Deposit", "V", 1000, 15000),
+        ],
+        "Transfers": [
+            ("Account Transfer", "N", 500, 20000),
+        ],
+    },
+}
+
+CUSTOMER_PREFIXES = {"supermarket": "S", "oil": "O", "banking": "B"}
+
+# Tier mix per phase (early 60% / late 40% of a customer's history)
+TIER_MIX = {
+    "stable": ({"P": 0.35, "N": 0.35, "V": 0.30},) * 2,
+    "downtrading": (
+        {"P": 0.65, "N": 0.25, "V": 0.10},
+        {"P": 0.05, "N": 0.25, "V": 0.70},
+    ),
+}
+
+# (segment, campaign_type, channel, typical participation), as
+# proposed by CampaignAgent
+PAST_CAMPAIGN_TYPES = [
+    ("Dormant / At-Risk", "Bonus Points", "SMS", 0.12),
+    ("Price-Sensitive Disengagers", "Extra Points", "Push", 0.25),
+    ("Re-Engaging Customers", "Welcome Back Reward", "Email", 0.35),
+    ("Stable Core Customers", "Access / Perk", "Email", 0.45),
+    ("Monitor", "Informational", "Email", 0.15),
+]
+
+
+class _DomainSampler:
+    """
+    Per-domain catalog lookups, prebuilt once (the row loop runs
+    up to 1e7 times).
+    """
+
+    def __init__(self, domain_name: str, rng: random.Random):
+        self.domain_name = domain_name
+        self.rng = rng
+        self.catalog = CATALOGS[domain_name]
+        self.categories = sorted(self.catalog)
+
+        # (category, tier) -> items; falls back to any item of the
+        # category when it has no item of that tier
+        self.by_tier: Dict[tuple, List[tuple]] = {}
+        for category, items in self.catalog.items():
+            for tier in "PNV":
+                self.by_tier[(category, tier)] = [
+                    item for item in items if item[1] == tier
+                ] or items
+
+        # item name -> JSON fragment for the constant fields
+        self.fragments = {
+            item[0]: (
+                f'"item_name": {json.dumps(item[0])}, '
+                f'"category": {json.dumps(category)}'
+            )
+            for category, items in self.catalog.items()
+            for item in items
+        }
+
+    def metadata(self, i: int) -> str:
+        rng = self.rng
+        if self.domain_name == "supermarket":
+            return (
+                f'{{"store_id": "ST{rng.randrange(250):04d}", '
+                f'"channel": "{"online" if rng.random() < 0.2 else "pos"}", '
+                f'"basket_id": "BK{i:010d}"}}'
+            )
+        if self.domain_name == "oil":
+            return (
+                f'{{"station_id": "ST{rng.randrange(400):04d}", '
+                f'"pump": {rng.randrange(1, 13)}}}'
+            )
+        return (
+            f'{{"channel": "{rng.choice(("card", "online", "branch"))}", '
+            f'"reference": "TX{i:012d}"}}'
+        )
+
+
+def _archetype(rng: random.Random) -> tuple:
+    r = rng.random()
+    for archetype in ARCHETYPES:
+        r -= archetype[1]
+        if r < 0:
+            return archetype
+    return ARCHETYPES[0]
+
+
+def _customer_rows(
+    sampler: _DomainSampler,
+    customer_id: str,
+    archetype: str,
+    n_rows: int,
+    first_index: int,
+) -> List[str]:
+    """
+    One customer's history as JSON lines, chronological.
+    """
+
+    rng = sampler.rng
+    span = HISTORY_DAYS * 86400
+
+    # arrival times: lapsing customers front-load their activity
+    offsets = sorted(rng.random() for _ in range(n_rows))
+    if archetype == "lapsing":
+        offsets = [u ** 2.5 for u in offsets]
+    start = HISTORY_END - timedelta(days=HISTORY_DAYS)
+
+    preferred = rng.sample(
+        sampler.categories, min(len(sampler.categories), rng.randint(2, 5))
+    )
+    favorite = preferred[0]
+    early_mix, late_mix = TIER_MIX.get(archetype, TIER_MIX["stable"])
+
+    rows = []
+    for k, u in enumerate(offsets):
+        late = k >= n_rows * 0.6
+
+        if archetype == "narrowing" and late:
+            category = favorite
+        elif archetype == "narrowing":
+            category = rng.choice(sampler.categories)
+        else:
+            category = rng.choice(preferred)
+
+        mix = late_mix if late else early_mix
+        r = rng.random()
+        tier = "P" if r < mix["P"] else "N" if r < mix["P"] + mix["N"] else "V"
+
+        name, _, low, high = rng.choice(sampler.by_tier[(category, tier)])
+        ts = start + timedelta(seconds=int(u * span))
+
+        rows.append(
+            f'{{"customer_id": "{customer_id}", '
+            f'"timestamp": "{ts.isoformat()}", '
+            f'{sampler.fragments[name]}, '
+            f'"amount": {rng.randint(low, high)}, '
+            f'"metadata": {sampler.metadata(first_index + k)}}}'
+        )
+    return rows
+
+
+class _RecordWriter:
+    """
+    Streams records as a JSON array or NDJSON.
+    """
+
+    def __init__(self, path: str, ndjson: bool):
+        self.file = open(path, "w", encoding="utf-8")
+        self.ndjson = ndjson
+        self.count = 0
+        if not ndjson:
+            self.file.write("[\n")
+
+    def write(self, line: str):
+        if self.ndjson:
+            self.file.write(line + "\n")
+        else:
+            self.file.write((",\n  " if self.count else "  ") + line)
+        self.count += 1
+
+    def close(self):
+        if not self.ndjson:
+            self.file.write("\n]\n")
+        self.file.close()
+
+
+def generate_domain(
+    domain_name: str,
+    out_dir: str,
+    n_transactions: int,
+    txns_per_customer: int = 20,
+    n_past_campaigns: int = 40,
+    seed: int = 7,
+    ndjson: bool = False,
+) -> Dict:
+    """
+    Write one domain's dataset under <out_dir>/data/<domain_name>
+    and return its manifest (parameters + row counts).
+    """
+
+    if domain_name not in CATALOGS:
+        raise ValueError(f"Unsupported domain: {domain_name}")
+
+    rng = random.Random(f"{seed}:{domain_name}")
+    sampler = _DomainSampler(domain_name, rng)
+    prefix = CUSTOMER_PREFIXES[domain_name]
+    ext = "ndjson" if ndjson else "json"
+
+    domain_dir = os.path.join(out_dir, "data", domain_name)
+    os.makedirs(domain_dir, exist_ok=True)
+    for name in ("customers", "transactions", "past_campaigns"):
+        # a stale file with the other extension would shadow / confuse
+        for stale_ext in ("json", "ndjson"):
+            stale = os.path.join(domain_dir, f"{name}.{stale_ext}")
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    started = time.perf_counter()
+
+    # ----------------------------
+    # Transactions (streamed), customers collected on the way
+    # ----------------------------
+    customers = []
+    writer = _RecordWriter(
+        os.path.join(domain_dir, f"transactions.{ext}"), ndjson
+    )
+    width = max(6, len(str(n_transactions)))
+
+    while writer.count < n_transactions:
+        customer_id = f"{prefix}{len(customers):0{width}d}"
+        archetype, _, fixed_rows = _archetype(rng)
+
+        if fixed_rows is None:
+            n_rows = max(3, int(rng.gammavariate(2.0, txns_per_customer / 2)))
+        else:
+            n_rows = fixed_rows
+        n_rows = min(n_rows, n_transactions - writer.count)
+
+        for line in _customer_rows(
+            sampler, customer_id, archetype, n_rows, writer.count
+        ):
+            writer.write(line)
+        customers.append((customer_id, archetype))
+
+    writer.close()
+
+    # ----------------------------
+    # Customers
+    # ----------------------------
+    tiers = ("Bronze", "Silver", "Gold", "Platinum")
+    writer = _RecordWriter(
+        os.path.join(domain_dir, f"customers.{ext}"), ndjson
+    )
+    for customer_id, archetype in customers:
+        joined = HISTORY_END - timedelta(days=rng.randint(HISTORY_DAYS, 2000))
+        attributes = {"tier": rng.choice(tiers)}
+        if domain_name == "oil":
+            attributes["vehicle_type"] = rng.choice(("Sedan", "SUV", "Truck"))
+        writer.write(json.dumps({
+            "customer_id": customer_id,
+            "joined_at": joined.isoformat(),
+            "status": "Inactive" if archetype == "no_activity" else "Active",
+            "attributes": attributes,
+        }))
+    writer.close()
+
+    # ----------------------------
+    # Past campaigns
+    # ----------------------------
+    writer = _RecordWriter(
+        os.path.join(domain_dir, f"past_campaigns.{ext}"), ndjson
+    )
+    for i in range(n_past_campaigns):
+        segment, campaign_type, channel, participation = (
+            PAST_CAMPAIGN_TYPES[i % len(PAST_CAMPAIGN_TYPES)]
+        )
+        start = (
+            HISTORY_END
+            - timedelta(days=HISTORY_DAYS + rng.randint(0, 365))
+        ).date()
+        cost = rng.randrange(3000, 20000, 500)
+        writer.write(json.dumps({
+            "campaign_id": f"{prefix}C{i:04d}",
+            "segment": segment,
+            "campaign_type": campaign_type,
+            "channel": channel,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=rng.choice((7, 10, 14)))).isoformat(),
+            "participation_rate": round(
+                participation * rng.uniform(0.7, 1.3), 3
+            ),
+            "cost": cost,
+            "revenue": int(cost * rng.uniform(1.5, 8.0)),
+        }))
+    writer.close()
+
+    manifest = {
+        "domain": domain_name,
+        "transactions": n_transactions,
+        "customers": len(customers),
+        "past_campaigns": n_past_campaigns,
+        "txns_per_customer": txns_per_customer,
+        "seed": seed,
+        "format": ext,
+        "generated_seconds": round(time.perf_counter() - started, 3),
+    }
+    with open(os.path.join(domain_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def read_manifest(out_dir: str, domain_name: str):
+    path = os.path.join(out_dir, "data", domain_name, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", required=True)
+    parser.add_argument(
+        "--domains", nargs="+", default=sorted(CATALOGS),
+        choices=sorted(CATALOGS),
+    )
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--txns-per-customer", type=int, default=20)
+    parser.add_argument("--past-campaigns", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--ndjson", action="store_true")
+    args = parser.parse_args()
+
+    for domain_name in args.domains:
+        manifest = generate_domain(
+            domain_name,
+            args.out,
+            args.transactions,
+            txns_per_customer=args.txns_per_customer,
+            n_past_campaigns=args.past_campaigns,
+            seed=args.seed,
+            ndjson=args.ndjson,
+        )
+        print(f"{domain_name:>12}: {manifest['transactions']} transactions, "
+              f"{manifest['customers']} customers "
+              f"({manifest['generated_seconds']:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 # src/agents/behavior_agent.py
 
-from datetime import datetime
-from typing import List, Dict
+from typing import TYPE_CHECKING, Iterable, List, Dict, Union
+
+from src.data.records import column
+from src.data.timestamps import parse_timestamps
+from src.data.transaction_index import TransactionIndex
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class BehaviorAgent:
@@ -12,16 +18,26 @@ class BehaviorAgent:
     def analyze_customer(
         self,
         customer_id: str,
-        transactions: List[Dict],
+        transactions: Union[TransactionIndex, List[Dict]],
         domain_config,
     ) -> Dict:
+        """
+        `transactions` is either a TransactionIndex (preferred, O(1)
+        lookup of pre-sorted rows) or the legacy flat list. Rows may
+        be dicts or Transaction records (src/data/records.py).
+        """
 
         cid_field = domain_config.customer_id_field  # 🔑 FIX
 
-        # Filter transactions for this customer (DOMAIN-AWARE)
-        customer_txns = [
-            t for t in transactions if t.get(cid_field) == customer_id
-        ]
+        if isinstance(transactions, TransactionIndex):
+            customer_txns = transactions.get(customer_id)
+            presorted = True
+        else:
+            # Legacy path: filter transactions for this customer
+            customer_txns = [
+                t for t in transactions if t.get(cid_field) == customer_id
+            ]
+            presorted = False
 
         # ----------------------------
         # TRUE no-activity case
@@ -37,27 +53,17 @@ class BehaviorAgent:
         # Sparse activity (monitor)
         # ----------------------------
         if len(customer_txns) < 3:
-            signals = {
-                "velocity_trend": "Stable",
-                "velocity_change_pct": 0.0,
-                "engagement_score": 1.0,
-                "category_concentration": "Stable",
-                "quality_shift": "Stable",
-                "habit_break_detected": False,
-                "velocity_unit": domain_config.velocity_unit,
-            }
-
             return {
                 "customer_id": customer_id,
                 "segment": "Monitor",
-                "signals": signals,
+                "signals": self._sparse_signals(domain_config),
             }
 
         # ----------------------------
         # Full behavior analysis
         # ----------------------------
         baseline_txns, recent_txns = self._split_time_windows(
-            customer_txns
+            customer_txns, presorted=presorted
         )
 
         signals = self._extract_signals(
@@ -72,6 +78,420 @@ class BehaviorAgent:
             "signals": signals,
         }
 
+    # --------------------------------------------------
+    # INCREMENTAL MODE
+    # --------------------------------------------------
+
+    def analyze_state(self, state, domain_config) -> Dict:
+        """
+        Same output as analyze_customer(), computed from a
+        CustomerBehaviorState's window aggregates (no rescan).
+        """
+
+        if state.count == 0:
+            return {
+                "customer_id": state.customer_id,
+                "segment": "No Activity",
+                "signals": {},
+            }
+
+        if state.count < 3:
+            return {
+                "customer_id": state.customer_id,
+                "segment": "Monitor",
+                "signals": self._sparse_signals(domain_config),
+            }
+
+        baseline, recent = state.windows
+        signals = self._signals_from_windows(
+            baseline_count=baseline.count,
+            recent_count=recent.count,
+            baseline_category_count=len(baseline.categories),
+            recent_category_count=len(recent.categories),
+            baseline_quality=self._quality_label(
+                baseline.premium_hits, baseline.value_hits
+            ),
+            recent_quality=self._quality_label(
+                recent.premium_hits, recent.value_hits
+            ),
+            domain_config=domain_config,
+        )
+
+        return {
+            "customer_id": state.customer_id,
+            "segment": self._assign_segment(signals),
+            "signals": signals,
+        }
+
+    # --------------------------------------------------
+    # BATCH MODE (VECTORIZED)
+    # --------------------------------------------------
+
+    def analyze_all(
+        self,
+        customer_ids: Iterable[str],
+        transactions: Union["pd.DataFrame", List[Dict]],
+        domain_config,
+    ) -> List[Dict]:
+        """
+        Columnar batch version of analyze_customer().
+
+        Computes signals and segments for every customer at once
+        from the whole transaction table. Output (order, values and
+        types) is identical to calling analyze_customer() per
+        customer, which remains the reference implementation.
+        """
+
+        # deferred: only batch mode needs numpy / pandas
+        import numpy as np
+        import pandas as pd
+
+        customer_ids = list(customer_ids)
+        fields = [
+            domain_config.customer_id_field,
+            "timestamp",
+            "item_name",
+            domain_config.category_field,
+        ]
+
+        if isinstance(transactions, pd.DataFrame):
+            columns = {
+                f: transactions[f].to_numpy(dtype=object) for f in fields
+            }
+        else:
+            columns = {
+                f: np.array(column(transactions, f), dtype=object)
+                for f in fields
+            }
+
+        # Dictionary-encode customers; keep only requested ones
+        cid_codes, cid_uniques = pd.factorize(
+            columns[domain_config.customer_id_field]
+        )
+        cid_uniques = cid_uniques.tolist()
+        requested = set(customer_ids)
+        wanted = np.fromiter(
+            (cid in requested for cid in cid_uniques),
+            dtype=bool,
+            count=len(cid_uniques),
+        )
+        # trailing False: code -1 (missing customer) is never wanted
+        keep = np.append(wanted, False)[cid_codes]
+
+        # missing values get a code of their own (not -1): a missing
+        # category is one distinct category, like in the set-based
+        # per-customer path, and a missing item name hits nothing
+        cat_codes, _ = pd.factorize(
+            columns[domain_config.category_field][keep],
+            use_na_sentinel=False,
+        )
+        item_codes, item_uniques = pd.factorize(
+            columns["item_name"][keep], use_na_sentinel=False
+        )
+
+        return self._batch_results(
+            customer_ids,
+            cid_uniques,
+            cid_codes[keep],
+            parse_timestamps(columns["timestamp"][keep]),
+            cat_codes,
+            item_codes,
+            item_uniques,
+            domain_config,
+        )
+
+    def analyze_index(
+        self,
+        customer_ids: Iterable[str],
+        transactions: TransactionIndex,
+        domain_config,
+    ) -> List[Dict]:
+        """
+        analyze_all() over a TransactionIndex: rows are already
+        grouped and sorted, so nothing is parsed or sorted again. A
+        ColumnarTransactionIndex is read straight from its code
+        columns, without building any record.
+        """
+
+        import numpy as np
+        from src.data.columnar_cache import ColumnarTransactionIndex
+
+        customer_ids = list(customer_ids)
+
+        if isinstance(transactions, ColumnarTransactionIndex):
+            columns = transactions.columns
+            requested = set(customer_ids)
+            wanted = np.fromiter(
+                (cid in requested for cid in columns.customer_ids),
+                dtype=bool,
+                count=len(columns.customer_ids),
+            )
+            # cached (customer, timestamp) order: no sort, no parse
+            order, _, offsets = columns.grouping()
+            cid_codes = np.repeat(
+                np.arange(len(wanted), dtype=np.int64), np.diff(offsets)
+            )
+            keep = wanted[cid_codes]
+            positions = order[keep]
+
+            return self._batch_results(
+                customer_ids,
+                columns.customer_ids,
+                cid_codes[keep],
+                None,
+                columns.category_codes[positions],
+                columns.item_codes[positions],
+                columns.items,
+                domain_config,
+            )
+
+        # rows of each requested customer, in index (timestamp) order
+        present = [
+            cid for cid in dict.fromkeys(customer_ids) if cid in transactions
+        ]
+        groups = [transactions.get(cid) for cid in present]
+        rows = [t for group in groups for t in group]
+
+        cid_codes = np.repeat(
+            np.arange(len(present)), [len(group) for group in groups]
+        )
+        cat_codes, _ = _encode(column(rows, domain_config.category_field))
+        item_codes, item_names = _encode(column(rows, "item_name"))
+
+        return self._batch_results(
+            customer_ids,
+            present,
+            cid_codes,
+            None,
+            cat_codes,
+            item_codes,
+            item_names,
+            domain_config,
+        )
+
+    def _batch_results(
+        self,
+        customer_ids: List[str],
+        cid_names,
+        cid_codes,
+        timestamps,
+        cat_codes,
+        item_codes,
+        item_names,
+        domain_config,
+    ) -> List[Dict]:
+        """
+        Shared tail of the batch entry points. One entry per row of
+        the requested customers: cid_codes index cid_names, item
+        codes index item_names, category codes only need to be
+        distinct per category. timestamps=None: rows are already
+        grouped per customer, in timestamp order.
+        """
+
+        import numpy as np
+
+        sizes = np.bincount(cid_codes, minlength=len(cid_names))
+
+        results = {}
+
+        # ----------------------------
+        # Sparse activity (monitor)
+        # ----------------------------
+        for code in np.flatnonzero((sizes > 0) & (sizes < 3)).tolist():
+            cid = cid_names[code]
+            results[cid] = {
+                "customer_id": cid,
+                "segment": "Monitor",
+                "signals": self._sparse_signals(domain_config),
+            }
+
+        # ----------------------------
+        # Full behavior analysis
+        # ----------------------------
+        full = sizes[cid_codes] >= 3
+        if full.any():
+            batch = self._batch_signals(
+                cid_codes[full],
+                None if timestamps is None else timestamps[full],
+                cat_codes[full],
+                item_codes[full],
+                item_names,
+                domain_config,
+            )
+            for code, segment, signals in batch:
+                cid = cid_names[code]
+                results[cid] = {
+                    "customer_id": cid,
+                    "segment": segment,
+                    "signals": signals,
+                }
+
+        # ----------------------------
+        # TRUE no-activity case
+        # ----------------------------
+        return [
+            results.get(cid)
+            or {"customer_id": cid, "segment": "No Activity", "signals": {}}
+            for cid in customer_ids
+        ]
+
+    def _batch_signals(
+        self, cid_codes, ts, cat_codes, item_codes, item_names, domain_config
+    ):
+        """
+        Vectorized _split_time_windows + _extract_signals +
+        _assign_segment for customers with >= 3 transactions.
+        Yields (customer_code, segment, signals).
+        """
+
+        import numpy as np
+
+        # ----------------------------
+        # 60 / 40 split via group ranks
+        # ----------------------------
+        if ts is not None:
+            # (customer, timestamp, input position) == stable
+            # per-customer sort
+            order = np.lexsort((np.arange(len(ts)), ts, cid_codes))
+            cid_codes = cid_codes[order]
+            cat_codes = cat_codes[order]
+            item_codes = item_codes[order]
+
+        # each customer is one contiguous run from here on
+        starts = np.flatnonzero(np.diff(cid_codes, prepend=-1))
+        sizes = np.diff(starts, append=len(cid_codes))
+        customers = cid_codes[starts]
+        cid_dense = np.repeat(np.arange(len(starts)), sizes)
+
+        rank = np.arange(len(cid_codes)) - starts[cid_dense]
+        n = sizes[cid_dense]
+        split = np.maximum(1, np.floor(n * 0.6).astype(np.int64))
+        recent = (rank >= split).astype(np.int64)
+
+        # Dense (customer, window) group key
+        window = cid_dense * 2 + recent
+        n_windows = len(customers) * 2
+
+        # ----------------------------
+        # Per-window aggregates
+        # ----------------------------
+        count = np.bincount(window, minlength=n_windows)
+
+        # distinct categories per window
+        stride = int(cat_codes.max()) + 1
+        pairs = np.sort(window * stride + cat_codes)
+        pairs = pairs[np.diff(pairs, prepend=-1) != 0]
+        categories = np.bincount(pairs // stride, minlength=n_windows)
+
+        # quality hits: once per distinct item name
+        hits = np.array(
+            [
+                self._quality_hits(name, domain_config)
+                for name in item_names
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        premium = np.bincount(
+            window, weights=hits[item_codes, 0], minlength=n_windows
+        )
+        value = np.bincount(
+            window, weights=hits[item_codes, 1], minlength=n_windows
+        )
+
+        b_count = count[0::2].astype(np.float64)
+        r_count = count[1::2].astype(np.float64)
+        b_cats, r_cats = categories[0::2], categories[1::2]
+
+        # ----------------------------
+        # Velocity / engagement
+        # ----------------------------
+        velocity_change_pct = ((r_count - b_count) / b_count) * 100
+        engagement_score = r_count / b_count
+
+        velocity_trend = np.select(
+            [velocity_change_pct < -15, velocity_change_pct > 15],
+            ["Decreasing", "Increasing"],
+            "Stable",
+        )
+
+        category_concentration = np.select(
+            [r_cats < b_cats, r_cats > b_cats],
+            ["Narrowing", "Expanding"],
+            "Stable",
+        )
+
+        # ----------------------------
+        # Quality shift
+        # ----------------------------
+        b_quality = self._batch_quality_label(premium[0::2], value[0::2])
+        r_quality = self._batch_quality_label(premium[1::2], value[1::2])
+        shifted = b_quality != r_quality
+        quality_shift = np.where(
+            shifted,
+            np.char.add(np.char.add(b_quality, " → "), r_quality),
+            "Stable",
+        )
+
+        habit_break = (
+            (velocity_trend == "Decreasing")
+            | (category_concentration == "Narrowing")
+            | shifted
+        )
+
+        # ----------------------------
+        # Segment rules (same order as _assign_segment)
+        # ----------------------------
+        # rounded exactly like the per-customer path
+        engagement_rounded = np.array(
+            [round(e, 2) for e in engagement_score.tolist()]
+        )
+        segment = np.select(
+            [
+                (engagement_rounded < 0.4) & habit_break,
+                (b_quality == "Premium") & (r_quality == "Value"),
+                (engagement_rounded > 0.85) & (velocity_trend == "Stable"),
+                velocity_trend == "Increasing",
+            ],
+            [
+                "Dormant / At-Risk",
+                "Price-Sensitive Disengagers",
+                "Stable Core Customers",
+                "Re-Engaging Customers",
+            ],
+            "Monitor",
+        )
+
+        rows = zip(
+            customers.tolist(),
+            segment.tolist(),
+            velocity_trend.tolist(),
+            velocity_change_pct.tolist(),
+            engagement_rounded.tolist(),
+            category_concentration.tolist(),
+            quality_shift.tolist(),
+            habit_break.tolist(),
+        )
+
+        for code, seg, trend, pct, eng, conc, shift, brk in rows:
+            yield code, seg, {
+                "velocity_trend": trend,
+                "velocity_change_pct": round(pct, 2),
+                "engagement_score": eng,
+                "category_concentration": conc,
+                "quality_shift": shift,
+                "habit_break_detected": brk,
+                "velocity_unit": domain_config.velocity_unit,
+            }
+
+    def _batch_quality_label(self, premium, value):
+        import numpy as np
+
+        return np.select(
+            [premium > value, value > premium],
+            ["Premium", "Value"],
+            "Neutral",
+        )
+
     # --------------------------------------------------
     # SIGNAL EXTRACTION (UNCHANGED)
     # --------------------------------------------------
@@ -83,8 +503,41 @@ class BehaviorAgent:
         domain_config,
     ) -> Dict:
 
-        baseline_count = len(baseline_txns)
-        recent_count = len(recent_txns)
+        baseline_categories = {
+            t[domain_config.category_field] for t in baseline_txns
+        }
+        recent_categories = {
+            t[domain_config.category_field] for t in recent_txns
+        }
+
+        return self._signals_from_windows(
+            baseline_count=len(baseline_txns),
+            recent_count=len(recent_txns),
+            baseline_category_count=len(baseline_categories),
+            recent_category_count=len(recent_categories),
+            baseline_quality=self._classify_quality(
+                baseline_txns, domain_config
+            ),
+            recent_quality=self._classify_quality(
+                recent_txns, domain_config
+            ),
+            domain_config=domain_config,
+        )
+
+    def _signals_from_windows(
+        self,
+        baseline_count: int,
+        recent_count: int,
+        baseline_category_count: int,
+        recent_category_count: int,
+        baseline_quality: str,
+        recent_quality: str,
+        domain_config,
+    ) -> Dict:
+        """
+        Signal rules on per-window aggregates. Shared by the
+        transaction-list path and incremental state (analyze_state).
+        """
 
         velocity_change_pct = (
             ((recent_count - baseline_count) / baseline_count) * 100
@@ -105,27 +558,13 @@ class BehaviorAgent:
             else 1.0
         )
 
-        baseline_categories = {
-            t[domain_config.category_field] for t in baseline_txns
-        }
-        recent_categories = {
-            t[domain_config.category_field] for t in recent_txns
-        }
-
-        if len(recent_categories) < len(baseline_categories):
+        if recent_category_count < baseline_category_count:
             category_concentration = "Narrowing"
-        elif len(recent_categories) > len(baseline_categories):
+        elif recent_category_count > baseline_category_count:
             category_concentration = "Expanding"
         else:
             category_concentration = "Stable"
 
-        baseline_quality = self._classify_quality(
-            baseline_txns, domain_config
-        )
-        recent_quality = self._classify_quality(
-            recent_txns, domain_config
-        )
-
         if baseline_quality != recent_quality:
             quality_shift = f"{baseline_quality} → {recent_quality}"
         else:
@@ -176,16 +615,37 @@ class BehaviorAgent:
     # HELPERS
     # --------------------------------------------------
 
-    def _split_time_windows(self, transactions: List[Dict]):
+    def _sparse_signals(self, domain_config) -> Dict:
+        """
+        Neutral signals for customers with fewer than 3 transactions.
+        """
+        return {
+            "velocity_trend": "Stable",
+            "velocity_change_pct": 0.0,
+            "engagement_score": 1.0,
+            "category_concentration": "Stable",
+            "quality_shift": "Stable",
+            "habit_break_detected": False,
+            "velocity_unit": domain_config.velocity_unit,
+        }
+
+    def _split_time_windows(
+        self, transactions: List[Dict], presorted: bool = False
+    ):
         """
         60% baseline, 40% recent.
         Guaranteed to work for len >= 3
         """
 
-        txns = sorted(
-            transactions,
-            key=lambda x: datetime.fromisoformat(x["timestamp"]),
-        )
+        if presorted:
+            txns = transactions
+        else:
+            # parse once, sort on int64 epochs (stable on ties)
+            epochs = parse_timestamps(
+                [t["timestamp"] for t in transactions]
+            ).tolist()
+            order = sorted(range(len(transactions)), key=epochs.__getitem__)
+            txns = [transactions[i] for i in order]
 
         split_index = max(1, int(len(txns) * 0.6))
         return txns[:split_index], txns[split_index:]
@@ -198,18 +658,35 @@ class BehaviorAgent:
         value_hits = 0
 
         for t in transactions:
-            name = t["item_name"].lower()
+            p, v = self._quality_hits(t["item_name"], domain_config)
+            premium_hits += p
+            value_hits += v
 
-            for kw in domain_config.quality_keywords.get("Premium", []):
-                if kw in name:
-                    premium_hits += 1
+        return self._quality_label(premium_hits, value_hits)
 
-            for kw in domain_config.quality_keywords.get("Value", []):
-                if kw in name:
-                    value_hits += 1
+    def _quality_hits(self, item_name: str, domain_config):
+        """
+        (premium_hits, value_hits) for a single item name.
+        Each matching keyword counts once.
+        """
+        return domain_config.quality_hits(item_name)
 
+    def _quality_label(self, premium_hits: int, value_hits: int) -> str:
         if premium_hits > value_hits:
             return "Premium"
         if value_hits > premium_hits:
             return "Value"
         return "Neutral"
+
+
+def _encode(values: List):
+    """
+    Dictionary encoding: (int64 codes, distinct values). Values
+    compare as in the set-based per-customer path, so a missing
+    value (None) is a value of its own.
+    """
+    import numpy as np
+
+    code_of: Dict = {}
+    codes = [code_of.setdefault(value, len(code_of)) for value in values]
+    return np.array(codes, dtype=np.int64), list(code_of)
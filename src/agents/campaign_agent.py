@@ -1,6 +1,8 @@
 # src/agents/campaign_agent.py
 
-from typing import Dict
+from typing import Dict, Optional
+
+from src.data.past_campaigns import PastCampaignIndex
 
 
 class CampaignAgent:
@@ -11,6 +13,7 @@ class CampaignAgent:
     - Recommend campaign type & channel
     - Generate customer-facing message
     - Estimate participation rate, cost, and ROI
+      (calibrated on past campaigns when history exists)
     """
 
     # ----------------------------
@@ -22,11 +25,16 @@ class CampaignAgent:
         signals: Dict,
         domain_config,
         segment_size: int = 1000,
+        past_campaigns: Optional[PastCampaignIndex] = None,
     ) -> Dict:
         """
         Main entry point.
 
         Returns a marketing-ready campaign proposal.
+
+        past_campaigns: historical outcomes for the same (segment,
+        campaign type, channel) replace the default participation
+        rate and revenue model; without a match the defaults apply.
         """
 
         campaign_type, channel = self._select_campaign_type(segment)
@@ -34,12 +42,30 @@ class CampaignAgent:
             segment, signals, domain_config
         )
 
-        participation_rate = self._estimate_participation(segment)
+        history = (segment, campaign_type, channel)
+        historical_participation = (
+            past_campaigns.participation_rate(*history)
+            if past_campaigns is not None else None
+        )
+        historical_ratio = (
+            past_campaigns.revenue_cost_ratio(*history)
+            if past_campaigns is not None else None
+        )
+
+        participation_rate = (
+            historical_participation
+            if historical_participation is not None
+            else self._estimate_participation(segment)
+        )
         cost = self._estimate_cost(
             campaign_type, participation_rate, segment_size
         )
-        revenue = self._estimate_revenue(
-            segment, participation_rate, segment_size
+        revenue = (
+            cost * historical_ratio
+            if historical_ratio is not None
+            else self._estimate_revenue(
+                segment, participation_rate, segment_size
+            )
         )
 
         roi = (
@@ -58,6 +84,38 @@ class CampaignAgent:
             "estimated_cost": round(cost, 2),
             "estimated_revenue": round(revenue, 2),
             "estimated_roi": round(roi, 2),
+            "estimate_basis": (
+                "past_campaigns"
+                if historical_participation is not None
+                or historical_ratio is not None
+                else "default"
+            ),
+        }
+
+    def recommend_campaigns(
+        self,
+        segment_sizes: Dict[str, int],
+        domain_config,
+        past_campaigns: Optional[PastCampaignIndex] = None,
+    ) -> Dict[str, Dict]:
+        """
+        Batch entry point: segment -> campaign proposal.
+
+        A proposal depends only on the segment and its size, so
+        each segment is computed ONCE, sized by the number of
+        customers actually in it (from the behavior stage); callers
+        share the returned proposal across the segment's customers.
+        """
+
+        return {
+            segment: self.recommend_campaign(
+                segment=segment,
+                signals={},  # messages are segment-level
+                domain_config=domain_config,
+                segment_size=segment_size,
+                past_campaigns=past_campaigns,
+            )
+            for segment, segment_size in segment_sizes.items()
         }
 
     # ----------------------------
@@ -1,7 +1,17 @@
 # src/agents/reasoning_agent.py
 
-from typing import Dict
-from src.llm.llm_client import LLMClient
+from typing import Dict, Optional
+from src.llm.backends import configured_model
+from src.llm.llm_client import LLMClient, get_llm_client
+from src.llm.response_cache import LLMResponseCache, get_default_cache
+from src.metrics import LLM_CACHE_HITS, LLM_CACHE_MISSES
+
+# Bump whenever the prompt below changes (invalidates cached answers)
+PROMPT_TEMPLATE_VERSION = "1"
+
+# Band edges used to discretize numeric signals for bucketing
+ENGAGEMENT_BANDS = [0.4, 0.85, 1.15, 1.5]
+VELOCITY_CHANGE_BANDS = [-50.0, -15.0, 15.0, 50.0]
 
 
 class ReasoningAgent:
@@ -19,8 +29,31 @@ class ReasoningAgent:
     - It only explains decisions made upstream.
     """
 
-    def __init__(self):
-        self.llm = LLMClient()
+    def __init__(
+        self,
+        cache: Optional[LLMResponseCache] = None,
+        llm: Optional[LLMClient] = None,
+    ):
+        # shared pooled client, fetched on the first real LLM call
+        self._llm = llm
+        self.cache = cache if cache is not None else get_default_cache()
+
+        # cache key -> [in-flight async call, callers awaiting it]
+        # (coalesces identical prompts)
+        self._inflight: Dict[str, list] = {}
+
+    @property
+    def llm(self) -> LLMClient:
+        if self._llm is None:
+            self._llm = get_llm_client()
+        return self._llm
+
+    async def aclose(self) -> None:
+        """
+        Release the running event loop's connections, if any.
+        """
+        if self._llm is not None:
+            await self._llm.aclose()
 
     def reason(
         self,
@@ -29,10 +62,128 @@ class ReasoningAgent:
         domain_name: str,
     ) -> Dict:
         """
-        Generate reasoning and business context using Groq.
+        Generate reasoning and business context using the LLM.
+        """
+
+        key = self._cache_key(segment, signals, domain_name)
+        llm_explanation = self._cache_get(key)
+
+        if llm_explanation is None:
+            prompt = self._build_prompt(segment, signals, domain_name)
+            llm_explanation = self.llm.run(prompt, task="reasoning")
+            self._cache_put(key, llm_explanation)
+
+        return self._result(segment, llm_explanation)
+
+    async def areason(
+        self,
+        segment: str,
+        signals: Dict,
+        domain_name: str,
+    ) -> Dict:
+        """
+        Async variant of reason(); same cache, same output.
+        """
+
+        key = self._cache_key(segment, signals, domain_name)
+        llm_explanation = self._cache_get(key)
+
+        if llm_explanation is None:
+            prompt = self._build_prompt(segment, signals, domain_name)
+            if key is None:
+                llm_explanation = await self.llm.arun(prompt, task="reasoning")
+            else:
+                llm_explanation = await self._coalesced(key, prompt)
+
+        return self._result(segment, llm_explanation)
+
+    async def _coalesced(self, key: str, prompt: str) -> str:
+        """
+        One LLM call per key in flight, shared by every caller
+        awaiting it. A cancelled caller only stops waiting; the call
+        itself is cancelled when its last waiter goes away, so it
+        does not keep spending rate-limit budget for nobody.
+        """
+
+        import asyncio
+
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(self._call(key, prompt))
+            entry = self._inflight[key] = [task, 0]
+            task.add_done_callback(
+                lambda done: self._call_done(key, entry)
+            )
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not task.done():
+                task.cancel()
+                # a caller arriving now starts a fresh call
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+
+    async def _call(self, key: str, prompt: str) -> str:
+        llm_explanation = await self.llm.arun(prompt, task="reasoning")
+        self._cache_put(key, llm_explanation)
+        return llm_explanation
+
+    def _call_done(self, key: str, entry: list) -> None:
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+        task = entry[0]
+        # retrieved here, so a failure nobody awaited is not logged
+        # as "Task exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    # --------------------------------------------------
+    # Bucketing (segment-level reasoning)
+    # --------------------------------------------------
+
+    def signal_signature(self, signals: Dict) -> Dict:
+        """
+        Discretized view of the signals: enums kept as-is,
+        numeric signals replaced by the band they fall in.
+
+        Customers with the same (segment, signature) can share one
+        explanation, since the LLM only explains the segment.
         """
 
-        prompt = f"""
+        signature = dict(signals)
+
+        if "engagement_score" in signature:
+            signature["engagement_score"] = self._band(
+                signature["engagement_score"], ENGAGEMENT_BANDS
+            )
+        if "velocity_change_pct" in signature:
+            signature["velocity_change_pct"] = self._band(
+                signature["velocity_change_pct"], VELOCITY_CHANGE_BANDS
+            )
+
+        return signature
+
+    def _band(self, value: float, edges) -> str:
+        if value < edges[0]:
+            return f"< {edges[0]}"
+        for low, high in zip(edges, edges[1:]):
+            if value < high:
+                return f"{low} to {high}"
+        return f">= {edges[-1]}"
+
+    # --------------------------------------------------
+    # Prompt & response cache
+    # --------------------------------------------------
+
+    def _build_prompt(
+        self, segment: str, signals: Dict, domain_name: str
+    ) -> str:
+
+        return f"""
 You are a senior marketing intelligence analyst working on a loyalty platform.
 
 Domain: {domain_name}
@@ -50,8 +201,45 @@ Your task:
    for a Marketing Manager dashboard.
 """
 
-        llm_explanation = self.llm.run(prompt, task="reasoning")
+    def _cache_key(
+        self, segment: str, signals: Dict, domain_name: str
+    ) -> Optional[str]:
+        """
+        Key = (model, prompt version, domain, segment, signals):
+        identical inputs render byte-identical prompts.
+        """
+
+        if self.cache is None:
+            return None
+
+        # model known without constructing the client (cache hits)
+        model = (
+            self._llm.model if self._llm is not None else configured_model()
+        )
+
+        return self.cache.make_key(
+            model=model,
+            template_version=PROMPT_TEMPLATE_VERSION,
+            domain=domain_name,
+            segment=segment,
+            signals=signals,
+        )
+
+    def _cache_get(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        llm_explanation = self.cache.get(key)
+        if llm_explanation is None:
+            LLM_CACHE_MISSES.inc()
+        else:
+            LLM_CACHE_HITS.inc()
+        return llm_explanation
+
+    def _cache_put(self, key: Optional[str], llm_explanation: str) -> None:
+        if key is not None:
+            self.cache.put(key, llm_explanation)
 
+    def _result(self, segment: str, llm_explanation: str) -> Dict:
         return {
             "llm_explanation": llm_explanation,
             "confidence": self._confidence(segment),
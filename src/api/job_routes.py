@@ -0,0 +1,88 @@
+# src/api/job_routes.py
+
+from fastapi import APIRouter, HTTPException, Query
+
+from src.api.jobs import FINISHED_STATES, QueueFullError, get_job_manager
+from src.api.routes import IngestionPayload
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+# =====================================================
+# ROUTES
+# =====================================================
+
+@router.post("", status_code=202)
+def submit_job(payload: IngestionPayload):
+    """
+    Queues an ingestion run; returns immediately with a job id
+    """
+    if payload.dedupe_reasoning:
+        raise HTTPException(
+            status_code=400,
+            detail="dedupe_reasoning is not supported for jobs",
+        )
+
+    try:
+        # shallow: keeps the validated records as-is
+        job_id = get_job_manager().submit(dict(payload))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return {"job_id": job_id, "status_url": f"/jobs/{job_id}"}
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """
+    Status and progress (customers processed, stage timings)
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/results")
+def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Paginated results; available while the job is still running
+    """
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    results = manager.results(job_id, offset, limit)
+    next_offset = offset + len(results)
+
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "results": results,
+        "next_offset": next_offset,
+        "has_more": (
+            job["status"] not in FINISHED_STATES
+            or next_offset < job["customers_processed"]
+        ),
+    }
+
+
+@router.delete("/{job_id}")
+def cancel_job(job_id: str):
+    """
+    Cancels a queued or running job
+    """
+    manager = get_job_manager()
+    if manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if not manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+
+    return {"job_id": job_id, "cancelling": True}
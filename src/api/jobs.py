@@ -0,0 +1,627 @@
+# src/api/jobs.py
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.llm.llm_client import release_loop_connections
+from src.utils import load_env
+from src.pipeline import stream_pipeline_with_ingestion
+
+# Defaults (overridable via environment / .env)
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_QUEUE_DEPTH = 16
+DEFAULT_JOB_STORE_PATH = os.path.join(".cache", "jobs.sqlite")
+
+# Finished jobs (status + results) are kept this long, and at most
+# this many of them
+DEFAULT_JOB_RETENTION_SECONDS = 24 * 3600
+DEFAULT_MAX_FINISHED_JOBS = 1000
+
+# Processes sharing a SQLite job store heartbeat this often; the
+# jobs of one silent for longer are treated as orphaned
+OWNER_HEARTBEAT_SECONDS = 10.0
+OWNER_TIMEOUT_SECONDS = 60.0
+
+# Results are flushed to the store in batches of this size,
+# or at least this often so progress stays fresh
+RESULT_FLUSH_SIZE = 100
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = {SUCCEEDED, FAILED, CANCELLED}
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the job queue is at its depth limit."""
+
+
+# =====================================================
+# JOB STORES
+# =====================================================
+
+class InMemoryJobStore:
+    """
+    Process-local job store. Lost on restart.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+        self._results: Dict[str, List[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict) -> None:
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+            self._results[job["job_id"]] = []
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def append_results(self, job_id: str, results: List[Dict]) -> None:
+        with self._lock:
+            self._results[job_id].extend(results)
+
+    def get_results(
+        self, job_id: str, offset: int, limit: int
+    ) -> List[Dict]:
+        with self._lock:
+            return self._results.get(job_id, [])[offset:offset + limit]
+
+    def prune(self, max_finished: int, retention_seconds: float) -> int:
+        """
+        Drops finished jobs (and their results) finished more than
+        retention_seconds ago or beyond the newest max_finished.
+        Returns how many were dropped.
+        """
+        cutoff = time.time() - retention_seconds
+        with self._lock:
+            finished = sorted(
+                (
+                    job for job in self._jobs.values()
+                    if job["status"] in FINISHED_STATES
+                ),
+                key=lambda job: job["finished_at"],
+                reverse=True,
+            )
+            expired = [
+                job["job_id"] for rank, job in enumerate(finished)
+                if rank >= max_finished or job["finished_at"] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+                del self._results[job_id]
+        return len(expired)
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteJobStore:
+    """
+    Single-file job store; survives restarts, no external services.
+
+    The file may be shared by several server processes (e.g.
+    uvicorn --workers). Each job records the process (owner) that
+    runs it, and every owner heartbeats while it is open; jobs still
+    queued or running whose owner has been silent for
+    OWNER_TIMEOUT_SECONDS (crashed, restarted) are marked failed by
+    whichever process notices first.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOB_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(
+            path, check_same_thread=False, timeout=30.0
+        )
+        self._lock = threading.Lock()
+        self.owner = uuid.uuid4().hex
+
+        with self._lock:
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS job_results (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (job_id, position)
+                );
+                CREATE TABLE IF NOT EXISTS job_owners (
+                    owner TEXT PRIMARY KEY,
+                    heartbeat_at REAL NOT NULL
+                );
+                """
+            )
+            self._add_job_columns()
+            self._heartbeat()
+            self._db.commit()
+
+        self._closed = threading.Event()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop,
+            name="job-store-heartbeat",
+            daemon=True,
+        )
+        self._heartbeat_thread.start()
+
+    def create(self, job: Dict) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (job_id, data, owner, status, finished_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    job["job_id"], json.dumps(job), self.owner,
+                    job["status"], job["finished_at"],
+                ),
+            )
+            self._db.commit()
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            job = json.loads(row[0])
+            job.update(fields)
+            self._save(job)
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def append_results(self, job_id: str, results: List[Dict]) -> None:
+        with self._lock:
+            start = self._db.execute(
+                "SELECT COUNT(*) FROM job_results WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()[0]
+            self._db.executemany(
+                "INSERT INTO job_results (job_id, position, result)"
+                " VALUES (?, ?, ?)",
+                [
+                    (job_id, start + i, json.dumps(result))
+                    for i, result in enumerate(results)
+                ],
+            )
+            self._db.commit()
+
+    def get_results(
+        self, job_id: str, offset: int, limit: int
+    ) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT result FROM job_results WHERE job_id = ?"
+                " AND position >= ? ORDER BY position LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def prune(self, max_finished: int, retention_seconds: float) -> int:
+        """
+        Same as InMemoryJobStore.prune(), over every process's jobs.
+        """
+        finished = sorted(FINISHED_STATES)
+        placeholders = ", ".join("?" * len(finished))
+        with self._lock:
+            expired = {
+                row[0] for row in self._db.execute(
+                    f"SELECT job_id FROM jobs WHERE status IN ({placeholders})"
+                    " ORDER BY finished_at DESC LIMIT -1 OFFSET ?",
+                    (*finished, max_finished),
+                )
+            }
+            expired.update(
+                row[0] for row in self._db.execute(
+                    f"SELECT job_id FROM jobs WHERE status IN ({placeholders})"
+                    " AND finished_at < ?",
+                    (*finished, time.time() - retention_seconds),
+                )
+            )
+            for table in ("jobs", "job_results"):
+                self._db.executemany(
+                    f"DELETE FROM {table} WHERE job_id = ?",
+                    [(job_id,) for job_id in expired],
+                )
+            self._db.commit()
+        return len(expired)
+
+    def close(self) -> None:
+        """
+        Stops heartbeating; this process's jobs must be finished.
+        """
+        self._closed.set()
+        self._heartbeat_thread.join()
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM job_owners WHERE owner = ?", (self.owner,)
+            )
+            self._db.commit()
+            self._db.close()
+
+    # ----------------------------
+    # Internals (under _lock)
+    # ----------------------------
+    def _save(self, job: Dict) -> None:
+        self._db.execute(
+            "UPDATE jobs SET data = ?, status = ?, finished_at = ?"
+            " WHERE job_id = ?",
+            (json.dumps(job), job["status"], job["finished_at"],
+             job["job_id"]),
+        )
+
+    def _add_job_columns(self) -> None:
+        """
+        owner / status / finished_at columns (queryable copies of
+        the JSON data), added to stores created before them.
+        """
+        columns = {
+            row[1] for row in self._db.execute("PRAGMA table_info(jobs)")
+        }
+        if "owner" not in columns:
+            for column in ("owner TEXT", "status TEXT", "finished_at REAL"):
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+            for (data,) in self._db.execute(
+                "SELECT data FROM jobs"
+            ).fetchall():
+                self._save(json.loads(data))
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)"
+        )
+
+    def _heartbeat_loop(self) -> None:
+        while not self._closed.wait(OWNER_HEARTBEAT_SECONDS):
+            with self._lock:
+                self._heartbeat()
+                self._db.commit()
+
+    def _heartbeat(self) -> None:
+        """
+        Refreshes this owner, then fails the unfinished jobs of
+        owners silent for too long (and forgets those owners).
+        """
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO job_owners (owner, heartbeat_at)"
+            " VALUES (?, ?)",
+            (self.owner, now),
+        )
+
+        stale_before = now - OWNER_TIMEOUT_SECONDS
+        for (data,) in self._db.execute(
+            "SELECT data FROM jobs WHERE status IN (?, ?) AND ("
+            " owner IS NULL OR owner NOT IN ("
+            "  SELECT owner FROM job_owners WHERE heartbeat_at >= ?))",
+            (QUEUED, RUNNING, stale_before),
+        ).fetchall():
+            job = json.loads(data)
+            job.update(
+                status=FAILED,
+                error="Interrupted: the process running the job stopped"
+                " before it finished",
+                finished_at=now,
+            )
+            self._save(job)
+
+        self._db.execute(
+            "DELETE FROM job_owners WHERE heartbeat_at < ?", (stale_before,)
+        )
+
+
+def make_job_store():
+    """
+    JOB_STORE = "memory" (default) | "sqlite"
+    JOB_STORE_PATH = SQLite file for the sqlite store
+    """
+
+    load_env()
+    kind = os.getenv("JOB_STORE", "memory")
+    if kind == "memory":
+        return InMemoryJobStore()
+    if kind == "sqlite":
+        return SQLiteJobStore(
+            os.getenv("JOB_STORE_PATH", DEFAULT_JOB_STORE_PATH)
+        )
+    raise ValueError(f"Unsupported JOB_STORE: {kind}")
+
+
+# =====================================================
+# JOB MANAGER
+# =====================================================
+
+class JobManager:
+    """
+    Runs ingestion jobs on a bounded worker pool.
+
+    - At most `workers` jobs run at once
+    - At most `max_queue` more wait; beyond that submit() raises
+      QueueFullError
+    - cancel() drops queued jobs and stops running ones between
+      customers
+    - finished jobs are dropped from the store after
+      `retention_seconds`, or sooner beyond the newest
+      `max_finished` (checked on submit)
+    """
+
+    def __init__(
+        self,
+        store,
+        workers: int = DEFAULT_JOB_WORKERS,
+        max_queue: int = DEFAULT_JOB_QUEUE_DEPTH,
+        retention_seconds: float = DEFAULT_JOB_RETENTION_SECONDS,
+        max_finished: int = DEFAULT_MAX_FINISHED_JOBS,
+    ):
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="job-worker"
+        )
+        self._futures: Dict[str, Future] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def submit(self, payload: Dict) -> str:
+        with self._lock:
+            # forget finished jobs (their state lives in the store)
+            for done_id in [
+                j for j, f in self._futures.items() if f.done()
+            ]:
+                del self._futures[done_id]
+                del self._cancel_events[done_id]
+            self.store.prune(self.max_finished, self.retention_seconds)
+
+            active = len(self._futures)
+            if active >= self.workers + self.max_queue:
+                raise QueueFullError(
+                    f"Job queue is full ({active} active jobs)"
+                )
+
+            job_id = uuid.uuid4().hex
+            self.store.create({
+                "job_id": job_id,
+                "domain": payload["domain"],
+                "status": QUEUED,
+                "customers_total": len(payload["customers"]),
+                "customers_processed": 0,
+                "stage_seconds": {},
+                "error": None,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+            })
+
+            cancel_event = threading.Event()
+            self._cancel_events[job_id] = cancel_event
+            self._futures[job_id] = self._executor.submit(
+                self._run, job_id, payload, cancel_event
+            )
+
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Dict]:
+        return self.store.get_results(job_id, offset, limit)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Returns False if the job is unknown or already finished.
+        """
+
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is None or future.done():
+                return False
+
+            self._cancel_events[job_id].set()
+            if future.cancel():
+                # never started
+                self.store.update(
+                    job_id, status=CANCELLED, finished_at=time.time()
+                )
+        return True
+
+    def shutdown(self) -> None:
+        for job_id in list(self._futures):
+            self.cancel(job_id)
+        self._executor.shutdown(wait=True)
+        self.store.close()
+
+    # ----------------------------
+    # Worker
+    # ----------------------------
+    def _run(
+        self, job_id: str, payload: Dict, cancel_event: threading.Event
+    ) -> None:
+
+        self.store.update(job_id, status=RUNNING, started_at=time.time())
+        report: Dict = {}
+
+        try:
+            results = stream_pipeline_with_ingestion(
+                domain=payload["domain"],
+                customers=payload["customers"],
+                transactions=payload["transactions"],
+                past_campaigns=payload["past_campaigns"],
+                concurrency=payload.get("concurrency"),
+                report=report,
+            )
+
+            if hasattr(results, "__aiter__"):
+                # own event loop per worker thread
+                cancelled = asyncio.run(
+                    self._consume_async(
+                        job_id, results, report, cancel_event
+                    )
+                )
+            else:
+                cancelled = self._consume(
+                    job_id, results, report, cancel_event
+                )
+
+            self.store.update(
+                job_id,
+                status=CANCELLED if cancelled else SUCCEEDED,
+                finished_at=time.time(),
+            )
+
+        except Exception as e:
+            self.store.update(
+                job_id,
+                status=FAILED,
+                error=f"{type(e).__name__}: {e}",
+                finished_at=time.time(),
+            )
+
+    def _consume(self, job_id, results, report, cancel_event) -> bool:
+        writer = _ResultWriter(self.store, job_id, report)
+        try:
+            for result in results:
+                writer.add(result)
+                if cancel_event.is_set():
+                    results.close()
+                    break
+        finally:
+            # keep what finished, even if the pipeline raised
+            writer.flush()
+        return cancel_event.is_set()
+
+    async def _consume_async(
+        self, job_id, results, report, cancel_event
+    ) -> bool:
+        writer = _ResultWriter(self.store, job_id, report)
+        try:
+            async for result in results:
+                writer.add(result)
+                if cancel_event.is_set():
+                    await results.aclose()
+                    break
+        finally:
+            # this loop ends with the job: release its connections
+            await release_loop_connections()
+            # keep what finished, even if the pipeline raised
+            writer.flush()
+        return cancel_event.is_set()
+
+
+class _ResultWriter:
+    """
+    Buffers results and flushes them (plus progress) to the store
+    every RESULT_FLUSH_SIZE results or PROGRESS_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, store, job_id: str, report: Dict):
+        self.store = store
+        self.job_id = job_id
+        self.report = report
+        self.buffer: List[Dict] = []
+        self.flushed_at = time.monotonic()
+
+    def add(self, result: Dict) -> None:
+        self.buffer.append(result)
+        if (
+            len(self.buffer) >= RESULT_FLUSH_SIZE
+            or time.monotonic() - self.flushed_at
+            >= PROGRESS_INTERVAL_SECONDS
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.store.append_results(self.job_id, self.buffer)
+            self.buffer = []
+
+        self.store.update(
+            self.job_id,
+            customers_processed=self.report.get("processed", 0),
+            stage_seconds={
+                stage: round(seconds, 4)
+                for stage, seconds in self.report.get(
+                    "stage_seconds", {}
+                ).items()
+            },
+        )
+        self.flushed_at = time.monotonic()
+
+
+# --------------------------------------------------
+# PROCESS-WIDE MANAGER
+# --------------------------------------------------
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """
+    Lazily created from the environment:
+    - JOB_WORKERS      (concurrent jobs)
+    - JOB_QUEUE_DEPTH  (waiting jobs before submit is refused)
+    - JOB_STORE / JOB_STORE_PATH (see make_job_store)
+    - JOB_RETENTION_SECONDS (how long finished jobs are kept)
+    - JOB_MAX_FINISHED      (finished jobs kept at most)
+    """
+    global _manager
+
+    load_env()
+
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(
+                make_job_store(),
+                workers=int(os.getenv("JOB_WORKERS", DEFAULT_JOB_WORKERS)),
+                max_queue=int(
+                    os.getenv("JOB_QUEUE_DEPTH", DEFAULT_JOB_QUEUE_DEPTH)
+                ),
+                retention_seconds=float(os.getenv(
+                    "JOB_RETENTION_SECONDS", DEFAULT_JOB_RETENTION_SECONDS
+                )),
+                max_finished=int(
+                    os.getenv("JOB_MAX_FINISHED", DEFAULT_MAX_FINISHED_JOBS)
+                ),
+            )
+        return _manager
+
+
+def shutdown_job_manager() -> None:
+    global _manager
+
+    with _manager_lock:
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
@@ -1,17 +1,48 @@
 # src/api/main.py
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import Response
 from src.api.routes import router
+from src.api.job_routes import router as job_router
+from src.api.jobs import shutdown_job_manager
+from src.llm.llm_client import close_llm_client
+from src.parallel import close_process_pool
+from src import metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # the shared LLM client is created lazily, on the first LLM call
+    yield
+    # stop job workers (cancels queued / running jobs)
+    shutdown_job_manager()
+    # close pooled LLM connections
+    await close_llm_client()
+    # stop the sharded behavior stage's worker processes
+    close_process_pool()
+
 
 app = FastAPI(
     title="AI Marketing Intelligence API",
     version="1.0.0",
     description="Agentic AI system for customer behavior analysis and campaign recommendations",
+    lifespan=lifespan,
 )
 
 app.include_router(router)
+app.include_router(job_router)
 
 
 @app.get("/")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """
+    Prometheus text exposition format
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
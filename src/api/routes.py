@@ -1,8 +1,30 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List, Dict, Any
+import json
+import time
+from contextlib import contextmanager
 
-from src.pipeline import run_pipeline, run_pipeline_with_ingestion
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from typing import List, Dict, Any, Optional
+
+from src.pipeline import (
+    DOMAIN_CONFIGS,
+    dataset_fingerprint,
+    get_domain_config,
+    run_delta_ingestion,
+    run_pipeline,
+    run_pipeline_incremental,
+    run_pipeline_with_ingestion,
+    stream_pipeline,
+    stream_pipeline_with_ingestion,
+    upload_fingerprint,
+)
+from src.data.records import to_customers, to_transactions
+from src.llm.response_cache import get_default_cache
+from src.metrics import NOT_MODIFIED_RESPONSES, STAGE_SECONDS
+from src.profiling import profile_path, profiled, profiling_enabled
+from src.result_cache import get_result_cache, get_upload_cache
 
 router = APIRouter()
 
@@ -12,6 +34,8 @@ router = APIRouter()
 
 class DomainPayload(BaseModel):
     domain: str
+    concurrency: Optional[int] = Field(default=None, ge=1, le=64)
+    dedupe_reasoning: bool = False
 
 
 class IngestionPayload(BaseModel):
@@ -19,30 +43,394 @@ class IngestionPayload(BaseModel):
     customers: List[Dict[str, Any]]
     transactions: List[Dict[str, Any]]
     past_campaigns: List[Dict[str, Any]]
+    concurrency: Optional[int] = Field(default=None, ge=1, le=64)
+    dedupe_reasoning: bool = False
+
+    # rows become slotted records right after parsing, so the
+    # request's dicts are freed before the pipeline runs
+    @field_validator("customers")
+    @classmethod
+    def _compact_customers(cls, rows):
+        return _to_records(to_customers, rows)
+
+    @field_validator("transactions")
+    @classmethod
+    def _compact_transactions(cls, rows, info: ValidationInfo):
+        # keyed by the domain's field names (an unknown domain is
+        # rejected by the pipeline)
+        domain_config = DOMAIN_CONFIGS.get(info.data.get("domain"))
+        return _to_records(to_transactions, rows, domain_config)
+
+
+def _to_records(convert, rows, *args):
+    try:
+        return convert(rows, *args)
+    except KeyError as e:
+        raise ValueError(f"missing field {e}")
+
+
+class DeltaPayload(BaseModel):
+    domain: str
+    transactions: List[Dict[str, Any]]
+
+    def check_transactions(self, domain_config) -> None:
+        """
+        ValueError naming the first row without a customer id (the
+        domain's customer_id_field) or a timestamp.
+        """
+        required = (domain_config.customer_id_field, "timestamp")
+        for position, row in enumerate(self.transactions):
+            for field in required:
+                if row.get(field) is None:
+                    raise ValueError(
+                        f"transactions[{position}]: missing field '{field}'"
+                    )
 
 
 # =====================================================
 # ROUTES
 # =====================================================
 
+PROFILE_QUERY = Query(
+    None,
+    pattern="^(cpu|memory)$",
+    description="Profile this request (needs PROFILING_ENABLED=1)",
+)
+
+
 @router.post("/run")
-def run_pipeline_api(payload: DomainPayload):
+def run_pipeline_api(
+    payload: DomainPayload,
+    profile: Optional[str] = PROFILE_QUERY,
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Runs pipeline using stored dataset
+
+    Responses are cached per dataset fingerprint and carry an ETag;
+    a matching If-None-Match gets 304 without running anything.
+    Profiled requests always run.
     """
-    results = run_pipeline(payload.domain)
-    return {"results": results}
+    etag = _dataset_etag(payload)
+    if profile is None and _etag_matches(if_none_match, etag):
+        NOT_MODIFIED_RESPONSES.labels("/run").inc()
+        return Response(status_code=304, headers={"ETag": etag})
+
+    def compute() -> bytes:
+        report = {}
+        with _maybe_profiled(profile) as profile_info:
+            results = run_pipeline(
+                payload.domain,
+                concurrency=payload.concurrency,
+                dedupe_reasoning=payload.dedupe_reasoning,
+                report=report,
+            )
+        content = {"results": results, "report": report}
+        if profile_info is not None:
+            content["profile"] = profile_info
+        return _json_body(content)
+
+    cache = get_result_cache()
+    if cache is None or profile is not None:
+        body, outcome = compute(), "bypass"
+    else:
+        body, outcome = cache.get_or_compute(etag, compute)
+
+    return Response(
+        body,
+        media_type="application/json",
+        headers={"ETag": etag, "X-Result-Cache": outcome},
+    )
 
 
 @router.post("/ingest-and-analyze")
-def ingest_and_analyze(payload: IngestionPayload):
+def ingest_and_analyze(
+    payload: IngestionPayload, profile: Optional[str] = PROFILE_QUERY
+):
     """
     Runs pipeline using live ingested data
+
+    Deduplicated by content hash: an identical payload returns the
+    stored response; otherwise only customers whose transactions
+    changed since an earlier upload are recomputed. Profiled
+    requests always run in full.
+    """
+    cache = get_upload_cache()
+    if cache is None or profile is not None:
+        report = {}
+        with _maybe_profiled(profile) as profile_info:
+            results = run_pipeline_with_ingestion(
+                domain=payload.domain,
+                customers=payload.customers,
+                transactions=payload.transactions,
+                past_campaigns=payload.past_campaigns,
+                concurrency=payload.concurrency,
+                dedupe_reasoning=payload.dedupe_reasoning,
+                report=report,
+            )
+        results["report"] = report
+        if profile_info is not None:
+            results["profile"] = profile_info
+        return _json_response(results)
+
+    try:
+        payload_key, customer_keys = upload_fingerprint(
+            payload.domain,
+            payload.customers,
+            payload.transactions,
+            payload.past_campaigns,
+            dedupe_reasoning=payload.dedupe_reasoning,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def compute() -> bytes:
+        report = {}
+        results = run_pipeline_incremental(
+            domain=payload.domain,
+            customers=payload.customers,
+            transactions=payload.transactions,
+            past_campaigns=payload.past_campaigns,
+            store=cache,
+            customer_keys=customer_keys,
+            concurrency=payload.concurrency,
+            dedupe_reasoning=payload.dedupe_reasoning,
+            report=report,
+        )
+        results["report"] = report
+        return _json_body(results)
+
+    body, outcome = cache.get_or_compute(f"payload:{payload_key}", compute)
+    return Response(
+        body,
+        media_type="application/json",
+        headers={"X-Result-Cache": outcome},
+    )
+
+
+@contextmanager
+def _maybe_profiled(profile: Optional[str]):
+    """
+    profiled() when the request asks for it, else a no-op (None).
+    The response gets the dump's id and download URL, never its
+    path on the server.
+    """
+    if profile is None:
+        yield None
+        return
+    if not profiling_enabled():
+        raise HTTPException(
+            status_code=403,
+            detail="profiling is disabled (PROFILING_ENABLED)",
+        )
+    with profiled(profile) as profile_info:
+        yield profile_info
+    del profile_info["pstats_path"]
+    profile_id = profile_info["profile_id"]
+    profile_info["profile_url"] = (
+        f"/profiles/{profile_id}" if profile_id is not None else None
+    )
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str):
+    """
+    Stored pstats dump of a profiled request
+    """
+    if not profiling_enabled():
+        raise HTTPException(
+            status_code=403,
+            detail="profiling is disabled (PROFILING_ENABLED)",
+        )
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename=f"{profile_id}.pstats",
+    )
+
+
+def _dataset_etag(payload: DomainPayload) -> str:
+    """
+    Weak ETag of the stored dataset's fingerprint: equal tags mean
+    equivalent results (the report's timings may differ).
+    """
+    try:
+        fingerprint = dataset_fingerprint(
+            payload.domain, dedupe_reasoning=payload.dedupe_reasoning
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return f'W/"{fingerprint[:32]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match check (weak comparison, "*" matches anything).
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or _opaque_tag(etag) in map(_opaque_tag, tags)
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _json_response(content: Dict) -> Response:
+    return Response(_json_body(content), media_type="application/json")
+
+
+def _json_body(content: Dict) -> bytes:
+    """
+    Serialized here (same encoding as FastAPI's JSONResponse) so
+    the serialization stage is measured.
+    """
+    started = time.perf_counter()
+    body = json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    STAGE_SECONDS.labels("serialization").observe(
+        time.perf_counter() - started
+    )
+    return body
+
+
+@router.post("/ingest-delta")
+def ingest_delta(payload: DeltaPayload):
+    """
+    Folds NEW transactions into stored behavior state;
+    returns updated segments for affected customers only
+    """
+    try:
+        payload.check_transactions(get_domain_config(payload.domain))
+        return run_delta_ingestion(
+            domain=payload.domain,
+            transactions=payload.transactions,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# =====================================================
+# STREAMING ROUTES (NDJSON / SSE)
+# =====================================================
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+@router.post("/run/stream")
+async def run_pipeline_stream(
+    payload: DomainPayload,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Streams one result per customer as soon as it is ready
+
+    Carries the same ETag as /run; a matching If-None-Match gets
+    304 (the client already holds these results).
     """
-    results = run_pipeline_with_ingestion(
-        domain=payload.domain,
-        customers=payload.customers,
-        transactions=payload.transactions,
-        past_campaigns=payload.past_campaigns,
+    _reject_dedupe(payload.dedupe_reasoning)
+    etag = _dataset_etag(payload)
+    if _etag_matches(if_none_match, etag):
+        NOT_MODIFIED_RESPONSES.labels("/run/stream").inc()
+        return Response(status_code=304, headers={"ETag": etag})
+
+    try:
+        results = await run_in_threadpool(
+            stream_pipeline,
+            payload.domain,
+            concurrency=payload.concurrency,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response = _stream_response(results, format)
+    response.headers["ETag"] = etag
+    return response
+
+
+@router.post("/ingest-and-analyze/stream")
+async def ingest_and_analyze_stream(
+    payload: IngestionPayload,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+):
+    """
+    Streaming variant of /ingest-and-analyze
+    """
+    _reject_dedupe(payload.dedupe_reasoning)
+    try:
+        results = await run_in_threadpool(
+            stream_pipeline_with_ingestion,
+            domain=payload.domain,
+            customers=payload.customers,
+            transactions=payload.transactions,
+            past_campaigns=payload.past_campaigns,
+            concurrency=payload.concurrency,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return _stream_response(results, format)
+
+
+def _reject_dedupe(dedupe_reasoning: bool):
+    # bucketing needs every customer before the first LLM call
+    if dedupe_reasoning:
+        raise HTTPException(
+            status_code=400,
+            detail="dedupe_reasoning is not supported when streaming",
+        )
+
+
+def _stream_response(results, format: str) -> StreamingResponse:
+    """
+    Encode results lazily; works for sync and async iterators.
+    """
+
+    if hasattr(results, "__aiter__"):
+        async def body():
+            async for result in results:
+                yield _encode(result, format)
+            if format == "sse":
+                yield "event: end\ndata: {}\n\n"
+    else:
+        def body():
+            for result in results:
+                yield _encode(result, format)
+            if format == "sse":
+                yield "event: end\ndata: {}\n\n"
+
+    return StreamingResponse(body(), media_type=STREAM_MEDIA_TYPES[format])
+
+
+def _encode(result: Dict, format: str) -> str:
+    started = time.perf_counter()
+    line = json.dumps(result, ensure_ascii=False)
+    STAGE_SECONDS.labels("serialization").observe(
+        time.perf_counter() - started
     )
-    return results
+    if format == "sse":
+        return f"event: result\ndata: {line}\n\n"
+    return line + "\n"
+
+
+@router.get("/llm-cache/stats")
+def llm_cache_stats():
+    """
+    Hit / miss counters of the shared LLM response cache
+    """
+    cache = get_default_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
@@ -0,0 +1,249 @@
+# src/data/behavior_state.py
+
+import json
+import os
+import sqlite3
+import threading
+from bisect import bisect_right
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.utils import load_env
+
+# Defaults (overridable via environment / .env)
+DEFAULT_STATE_PATH = os.path.join(".cache", "behavior_state.sqlite")
+
+
+class WindowAggregate:
+    """
+    Running aggregates for one time window (baseline or recent).
+    """
+
+    __slots__ = ("count", "categories", "premium_hits", "value_hits")
+
+    def __init__(self):
+        self.count = 0
+        self.categories: Dict = {}  # category -> transactions
+        self.premium_hits = 0
+        self.value_hits = 0
+
+    def add(self, entry) -> None:
+        _, _, category, premium, value = entry
+        self.count += 1
+        self.categories[category] = self.categories.get(category, 0) + 1
+        self.premium_hits += premium
+        self.value_hits += value
+
+    def remove(self, entry) -> None:
+        _, _, category, premium, value = entry
+        self.count -= 1
+        remaining = self.categories[category] - 1
+        if remaining:
+            self.categories[category] = remaining
+        else:
+            del self.categories[category]
+        self.premium_hits -= premium
+        self.value_hits -= value
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "categories": list(self.categories.items()),
+            "premium_hits": self.premium_hits,
+            "value_hits": self.value_hits,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WindowAggregate":
+        window = cls()
+        window.count = data["count"]
+        window.categories = {k: v for k, v in data["categories"]}
+        window.premium_hits = data["premium_hits"]
+        window.value_hits = data["value_hits"]
+        return window
+
+
+class CustomerBehaviorState:
+    """
+    Incremental behavior state for one customer.
+
+    - entries: (epoch_us, seq, category, premium_hits, value_hits),
+      kept sorted; seq preserves arrival order on equal timestamps,
+      exactly like the stable sort in BehaviorAgent
+    - baseline / recent: aggregates for the 60 / 40 split
+
+    Adding a transaction costs one insort plus O(1) boundary moves.
+    """
+
+    def __init__(self, customer_id):
+        self.customer_id = customer_id
+        self.entries: List[tuple] = []
+        self.next_seq = 0
+        self.baseline = WindowAggregate()
+        self.recent = WindowAggregate()
+
+    @property
+    def count(self) -> int:
+        return len(self.entries)
+
+    @property
+    def windows(self):
+        return self.baseline, self.recent
+
+    @property
+    def timestamps(self) -> List[int]:
+        return [entry[0] for entry in self.entries]
+
+    def add_transaction(
+        self,
+        epoch_us: int,
+        category,
+        premium_hits: int,
+        value_hits: int,
+    ) -> None:
+
+        entry = (epoch_us, self.next_seq, category, premium_hits, value_hits)
+        self.next_seq += 1
+
+        old_split = self.baseline.count
+        position = bisect_right(self.entries, (epoch_us, entry[1]))
+        self.entries.insert(position, entry)
+
+        # the new entry lands on its side of the old boundary ...
+        if position < old_split:
+            self.baseline.add(entry)
+            boundary = old_split + 1
+        else:
+            self.recent.add(entry)
+            boundary = old_split
+
+        # ... then the boundary moves to max(1, int(n * 0.6))
+        target = max(1, int(len(self.entries) * 0.6))
+        while boundary < target:
+            moved = self.entries[boundary]
+            self.recent.remove(moved)
+            self.baseline.add(moved)
+            boundary += 1
+        while boundary > target:
+            boundary -= 1
+            moved = self.entries[boundary]
+            self.baseline.remove(moved)
+            self.recent.add(moved)
+
+    # ----------------------------
+    # Serialization
+    # ----------------------------
+    def to_dict(self) -> Dict:
+        return {
+            "customer_id": self.customer_id,
+            "entries": [list(entry) for entry in self.entries],
+            "next_seq": self.next_seq,
+            "baseline": self.baseline.to_dict(),
+            "recent": self.recent.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CustomerBehaviorState":
+        state = cls(data["customer_id"])
+        state.entries = [tuple(entry) for entry in data["entries"]]
+        state.next_seq = data["next_seq"]
+        state.baseline = WindowAggregate.from_dict(data["baseline"])
+        state.recent = WindowAggregate.from_dict(data["recent"])
+        return state
+
+
+class BehaviorStateStore:
+    """
+    Persistent per-(domain, customer) behavior state in SQLite.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS behavior_state ("
+                " domain TEXT NOT NULL,"
+                " customer_id TEXT NOT NULL,"
+                " state TEXT NOT NULL,"
+                " PRIMARY KEY (domain, customer_id))"
+            )
+            self._db.commit()
+
+    def get(
+        self, domain: str, customer_id
+    ) -> Optional[CustomerBehaviorState]:
+        with self._lock:
+            return self._load(domain, customer_id)
+
+    def update_many(
+        self,
+        domain: str,
+        customer_ids: Iterable,
+        update: Callable[[CustomerBehaviorState], None],
+    ) -> List[CustomerBehaviorState]:
+        """
+        Load (or create) each customer's state, apply `update`,
+        and save, atomically with respect to other callers.
+        """
+
+        with self._lock:
+            states = []
+            for customer_id in customer_ids:
+                state = self._load(domain, customer_id)
+                if state is None:
+                    state = CustomerBehaviorState(customer_id)
+                update(state)
+                states.append(state)
+
+            self._db.executemany(
+                "INSERT OR REPLACE INTO behavior_state"
+                " (domain, customer_id, state) VALUES (?, ?, ?)",
+                [
+                    (domain, state.customer_id, json.dumps(state.to_dict()))
+                    for state in states
+                ],
+            )
+            self._db.commit()
+
+        return states
+
+    def _load(
+        self, domain: str, customer_id
+    ) -> Optional[CustomerBehaviorState]:
+        row = self._db.execute(
+            "SELECT state FROM behavior_state"
+            " WHERE domain = ? AND customer_id = ?",
+            (domain, customer_id),
+        ).fetchone()
+        if row is None:
+            return None
+        return CustomerBehaviorState.from_dict(json.loads(row[0]))
+
+
+# --------------------------------------------------
+# PROCESS-WIDE DEFAULT STORE
+# --------------------------------------------------
+
+_default_store: Optional[BehaviorStateStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_behavior_state_store() -> BehaviorStateStore:
+    """
+    BEHAVIOR_STATE_PATH = SQLite file (":memory:" for tests / demos)
+    """
+    global _default_store
+
+    load_env()
+
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = BehaviorStateStore(
+                os.getenv("BEHAVIOR_STATE_PATH", DEFAULT_STATE_PATH)
+            )
+        return _default_store
@@ -0,0 +1,385 @@
+# src/data/columnar_cache.py
+
+import json
+import os
+import uuid
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from src.data.records import Transaction, transaction_type
+from src.data.timestamps import from_epoch_us, parse_timestamps
+from src.data.transaction_index import TransactionIndex
+from src.utils import iter_json_records, load_env
+
+# Bump whenever the on-disk layout changes (invalidates old caches)
+COLUMNAR_FORMAT_VERSION = 2
+
+# Defaults (overridable via environment / .env)
+DEFAULT_COLUMNAR_CACHE_DIR = os.path.join(".cache", "columnar")
+
+ARRAY_NAMES = (
+    "customer_codes",
+    "timestamps",
+    "amounts",
+    "category_codes",
+    "item_codes",
+)
+
+# ColumnarTransactions.grouping(), cached next to the columns
+GROUPING_NAMES = ("order", "sorted_timestamps", "offsets")
+
+
+class UnsupportedAmountError(ValueError):
+    """
+    A transaction amount that is neither a number nor missing, so
+    the float64 column cannot hold it as-is.
+    """
+
+
+class ColumnarTransactions:
+    """
+    Transactions as parallel NumPy columns.
+
+    - timestamps: int64 epoch microseconds
+    - amounts: float64 (NaN when missing)
+    - customer_id / category / item_name: int32 codes into
+      small Python lists (dictionary encoding)
+
+    rows() builds `record_type` records (see transaction_type()),
+    keyed by the field names the columns were built from.
+    """
+
+    def __init__(
+        self,
+        customer_codes: np.ndarray,
+        customer_ids: List,
+        timestamps: np.ndarray,
+        amounts: np.ndarray,
+        category_codes: np.ndarray,
+        categories: List,
+        item_codes: np.ndarray,
+        items: List,
+        record_type: type = Transaction,
+        grouping: Optional[tuple] = None,
+    ):
+        self.customer_codes = customer_codes
+        self.customer_ids = customer_ids
+        self.timestamps = timestamps
+        self.amounts = amounts
+        self.category_codes = category_codes
+        self.categories = categories
+        self.item_codes = item_codes
+        self.items = items
+        self.record_type = record_type
+        self._grouping = grouping
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def grouping(self) -> tuple:
+        """
+        (order, sorted_timestamps, offsets): row positions sorted
+        by (customer code, timestamp), stable, i.e. input order on
+        equal timestamps like TransactionIndex; their timestamps;
+        and offsets[c]:offsets[c + 1], customer code c's span of
+        `order`. Computed once, or read from the on-disk cache.
+        """
+        if self._grouping is None:
+            order = np.lexsort((self.timestamps, self.customer_codes))
+            counts = np.bincount(
+                self.customer_codes, minlength=len(self.customer_ids)
+            )
+            offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            self._grouping = (order, self.timestamps[order], offsets)
+        return self._grouping
+
+    def rows(self, positions: Sequence[int]) -> List[Transaction]:
+        """
+        Transaction records for the given positions.
+        """
+
+        positions = np.asarray(positions, dtype=np.int64)
+        record_type = self.record_type
+        customer_ids = self.customer_ids
+        categories = self.categories
+        items = self.items
+
+        return [
+            record_type(
+                customer_ids[c],
+                from_epoch_us(ts),
+                items[i],
+                categories[k],
+                None if amount != amount else amount,
+            )
+            for c, ts, i, k, amount in zip(
+                self.customer_codes[positions].tolist(),
+                self.timestamps[positions].tolist(),
+                self.item_codes[positions].tolist(),
+                self.category_codes[positions].tolist(),
+                self.amounts[positions].tolist(),
+            )
+        ]
+
+    def iter_records(self, batch_size: int = 65536) -> Iterator[Transaction]:
+        """
+        Records in original order, materialized a batch at a time.
+        """
+        for start in range(0, len(self), batch_size):
+            positions = range(start, min(start + batch_size, len(self)))
+            yield from self.rows(positions)
+
+
+class ColumnarTransactionIndex(TransactionIndex):
+    """
+    TransactionIndex over ColumnarTransactions.
+
+    Grouping (one lexsort on customer code, timestamp) comes from
+    columns.grouping(), memory-mapped when the columns are served
+    from the cache; records are only built when a customer is
+    looked up.
+    """
+
+    def __init__(self, columns: ColumnarTransactions, domain_config):
+        self.customer_id_field = domain_config.customer_id_field
+        self._columns = columns
+
+        self._order, self._sorted_timestamps, offsets = columns.grouping()
+        self._offsets = offsets.tolist()
+        self._code_of = {
+            customer_id: code
+            for code, (customer_id, start, end) in enumerate(zip(
+                columns.customer_ids, self._offsets, self._offsets[1:]
+            ))
+            if end > start
+        }
+
+    @property
+    def columns(self) -> ColumnarTransactions:
+        """
+        The underlying columns (batch behavior reads the codes).
+        """
+        return self._columns
+
+    def _span(self, customer_id):
+        code = self._code_of.get(customer_id)
+        if code is None:
+            return None
+        return self._offsets[code], self._offsets[code + 1]
+
+    def get(self, customer_id: str) -> List[Transaction]:
+        span = self._span(customer_id)
+        if span is None:
+            return []
+        return self._columns.rows(self._order[span[0]:span[1]])
+
+    def get_timestamps(self, customer_id: str) -> Sequence[int]:
+        span = self._span(customer_id)
+        if span is None:
+            return array("q")
+        return self._sorted_timestamps[span[0]:span[1]]
+
+    def customer_ids(self) -> List[str]:
+        return list(self._code_of.keys())
+
+    def __contains__(self, customer_id: str) -> bool:
+        return customer_id in self._code_of
+
+    def __len__(self) -> int:
+        return len(self._code_of)
+
+
+# --------------------------------------------------
+# BUILD
+# --------------------------------------------------
+
+def build_columnar(
+    transactions: Iterable[Dict], domain_config
+) -> ColumnarTransactions:
+    """
+    One pass over row dicts (a list or a stream) -> columns.
+
+    Raises UnsupportedAmountError, naming the row, for an amount
+    that is not an int, a float or missing.
+    """
+
+    dictionaries = ({}, {}, {})  # customer_id, category, item_name
+    codes = (array("i"), array("i"), array("i"))
+    amounts = array("d")
+    timestamps = []
+
+    fields = (
+        domain_config.customer_id_field,
+        domain_config.category_field,
+        "item_name",
+    )
+
+    for row, t in enumerate(transactions):
+        for field, dictionary, column in zip(fields, dictionaries, codes):
+            value = t.get(field)
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary)
+            column.append(code)
+
+        amount = t.get("amount")
+        if amount is None:
+            amounts.append(float("nan"))
+        elif type(amount) is float or type(amount) is int:
+            amounts.append(amount)
+        else:
+            raise UnsupportedAmountError(
+                f"transaction {row} ({fields[0]}="
+                f"{t.get(fields[0])!r}): amount {amount!r} is not a number"
+            )
+        timestamps.append(t["timestamp"])
+
+    customer_codes, category_codes, item_codes = (
+        np.frombuffer(column, dtype=np.int32) if column
+        else np.zeros(0, dtype=np.int32)
+        for column in codes
+    )
+
+    return ColumnarTransactions(
+        customer_codes=customer_codes,
+        customer_ids=list(dictionaries[0]),
+        timestamps=parse_timestamps(timestamps),
+        amounts=np.array(amounts, dtype=np.float64),
+        category_codes=category_codes,
+        categories=list(dictionaries[1]),
+        item_codes=item_codes,
+        items=list(dictionaries[2]),
+        record_type=transaction_type(fields[0], fields[1]),
+    )
+
+
+# --------------------------------------------------
+# ON-DISK CACHE (.npy columns, memory-mapped)
+# --------------------------------------------------
+
+def load_transactions_columnar(
+    json_path: str, domain_config, cache_dir: str
+) -> ColumnarTransactions:
+    """
+    Columns for `json_path` (JSON array or NDJSON).
+
+    Served memory-mapped from `cache_dir` while the source file's
+    mtime and size are unchanged; rebuilt (one streaming parse)
+    otherwise. Raises UnsupportedAmountError (nothing cached) if an
+    amount cannot be stored as a float.
+    """
+
+    signature = _source_signature(json_path, domain_config)
+
+    columns = _read(cache_dir, signature)
+    if columns is None:
+        columns = build_columnar(iter_json_records(json_path), domain_config)
+        _write(cache_dir, columns, signature)
+
+    return columns
+
+
+def _source_signature(json_path: str, domain_config) -> Dict:
+    stat = os.stat(json_path)
+    return {
+        "version": COLUMNAR_FORMAT_VERSION,
+        "source": os.path.abspath(json_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "customer_id_field": domain_config.customer_id_field,
+        "category_field": domain_config.category_field,
+    }
+
+
+def _read(cache_dir: str, signature: Dict) -> Optional[ColumnarTransactions]:
+    try:
+        with open(os.path.join(cache_dir, "meta.json"), "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get("signature") != signature:
+        return None
+
+    arrays = {}
+    try:
+        for name in ARRAY_NAMES + GROUPING_NAMES:
+            path = os.path.join(cache_dir, f"{name}.{meta['build']}.npy")
+            # empty arrays cannot be memory-mapped
+            arrays[name] = np.load(
+                path, mmap_mode="r" if meta["rows"] else None
+            )
+    except (OSError, ValueError):
+        return None
+
+    return ColumnarTransactions(
+        customer_ids=meta["customer_ids"],
+        categories=meta["categories"],
+        items=meta["items"],
+        record_type=transaction_type(
+            signature["customer_id_field"], signature["category_field"]
+        ),
+        grouping=tuple(arrays.pop(name) for name in GROUPING_NAMES),
+        **arrays,
+    )
+
+
+def _write(cache_dir: str, columns: ColumnarTransactions, signature: Dict):
+    """
+    Arrays are written under a fresh build id and meta.json is
+    swapped in last, so readers never see a half-written cache.
+    Only the build that meta.json pointed to before is deleted: a
+    concurrent writer's arrays are never removed before its own
+    swap.
+    """
+
+    os.makedirs(cache_dir, exist_ok=True)
+    build = uuid.uuid4().hex
+
+    arrays = dict(zip(GROUPING_NAMES, columns.grouping()))
+    for name in ARRAY_NAMES:
+        arrays[name] = getattr(columns, name)
+    for name, values in arrays.items():
+        np.save(os.path.join(cache_dir, f"{name}.{build}.npy"), values)
+
+    meta = {
+        "signature": signature,
+        "build": build,
+        "rows": len(columns),
+        "customer_ids": columns.customer_ids,
+        "categories": columns.categories,
+        "items": columns.items,
+    }
+    meta_path = os.path.join(cache_dir, "meta.json")
+    tmp_path = os.path.join(cache_dir, f"meta.{build}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+
+    try:
+        with open(meta_path, "r") as f:
+            previous = json.load(f).get("build")
+    except (OSError, ValueError):
+        previous = None
+    os.replace(tmp_path, meta_path)
+
+    # the replaced build (open memory maps stay valid on POSIX)
+    if previous and previous != build:
+        for name in ARRAY_NAMES + GROUPING_NAMES:
+            try:
+                os.remove(os.path.join(cache_dir, f"{name}.{previous}.npy"))
+            except OSError:
+                pass
+
+
+def get_columnar_cache_dir() -> Optional[str]:
+    """
+    COLUMNAR_CACHE_ENABLED = "0" disables the cache (None)
+    COLUMNAR_CACHE_DIR     = root directory for cached columns
+    """
+    load_env()
+    if os.getenv("COLUMNAR_CACHE_ENABLED", "1") == "0":
+        return None
+    return os.getenv("COLUMNAR_CACHE_DIR", DEFAULT_COLUMNAR_CACHE_DIR)
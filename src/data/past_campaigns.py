@@ -0,0 +1,64 @@
+# src/data/past_campaigns.py
+
+from typing import Dict, Iterable, Optional, Tuple
+
+CampaignKey = Tuple[str, str, str]  # (segment, campaign_type, channel)
+
+
+class PastCampaignIndex:
+    """
+    Historical campaign outcomes, aggregated ONCE per run.
+
+    Keyed by (segment, campaign_type, channel):
+    - participation rate: mean over past campaigns
+    - revenue / cost ratio: total revenue over total cost
+
+    One pass to build; every estimate is a dict lookup. Records
+    missing a key field or with non-numeric outcomes are skipped.
+    """
+
+    def __init__(self, past_campaigns: Iterable[Dict] = ()):
+        # key -> [campaigns, participation sum, cost sum, revenue sum]
+        totals: Dict[CampaignKey, list] = {}
+
+        for campaign in past_campaigns:
+            try:
+                key = (
+                    campaign["segment"],
+                    campaign["campaign_type"],
+                    campaign["channel"],
+                )
+                participation = float(campaign["participation_rate"])
+                cost = float(campaign.get("cost") or 0)
+                revenue = float(campaign.get("revenue") or 0)
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            entry = totals.setdefault(key, [0, 0.0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += participation
+            entry[2] += cost
+            entry[3] += revenue
+
+        self._participation: Dict[CampaignKey, float] = {}
+        self._revenue_cost_ratio: Dict[CampaignKey, float] = {}
+
+        for key, (count, participation, cost, revenue) in totals.items():
+            self._participation[key] = participation / count
+            if cost > 0:
+                self._revenue_cost_ratio[key] = revenue / cost
+
+    def participation_rate(
+        self, segment: str, campaign_type: str, channel: str
+    ) -> Optional[float]:
+        return self._participation.get((segment, campaign_type, channel))
+
+    def revenue_cost_ratio(
+        self, segment: str, campaign_type: str, channel: str
+    ) -> Optional[float]:
+        return self._revenue_cost_ratio.get(
+            (segment, campaign_type, channel)
+        )
+
+    def __len__(self) -> int:
+        return len(self._participation)
@@ -0,0 +1,75 @@
+# src/data/timestamps.py
+
+import warnings
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_ONE_US = timedelta(microseconds=1)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_us(value: str) -> int:
+    """
+    ISO-8601 timestamp -> int64 microseconds since the Unix epoch.
+
+    Naive timestamps are read as UTC, so ordering matches
+    datetime.fromisoformat() for all-naive or all-aware data.
+    """
+
+    dt = datetime.fromisoformat(value)
+
+    seconds = (
+        (dt.toordinal() - _EPOCH_ORDINAL) * 86400
+        + dt.hour * 3600
+        + dt.minute * 60
+        + dt.second
+    )
+    us = seconds * 1_000_000 + dt.microsecond
+
+    offset = dt.utcoffset()
+    if offset:
+        us -= offset // _ONE_US
+    return us
+
+
+def from_epoch_us(us: int) -> str:
+    """
+    Inverse of to_epoch_us(): UTC ISO-8601 string with offset.
+    """
+    return (_EPOCH + timedelta(microseconds=us)).isoformat()
+
+
+def parse_timestamps(values: Sequence[str]) -> "np.ndarray":
+    """
+    Parse a whole timestamp column ONCE into an int64 epoch array.
+
+    Fast path: NumPy's native ISO-8601 parser for plain
+    "YYYY-MM-DD[THH:MM:SS[.ffffff]]" strings. Anything else
+    (UTC offsets, basic format, missing values) falls back to
+    to_epoch_us() per value, which raises on invalid input.
+    """
+
+    import numpy as np
+
+    values = list(values)
+
+    if all(isinstance(v, str) and v[4:5] == "-" for v in values):
+        try:
+            with warnings.catch_warnings():
+                # tz offsets only warn in NumPy; treat them as a miss
+                warnings.simplefilter("error")
+                parsed = np.array(values, dtype="datetime64[us]")
+            if not np.isnat(parsed).any():
+                return parsed.astype(np.int64)
+        except (ValueError, Warning):
+            pass
+
+    return np.fromiter(
+        (to_epoch_us(v) for v in values),
+        dtype=np.int64,
+        count=len(values),
+    )
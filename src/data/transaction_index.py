@@ -0,0 +1,93 @@
+# src/data/transaction_index.py
+
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence
+
+from src.data.records import transaction_type
+from src.data.timestamps import parse_timestamps
+
+
+class TransactionIndex:
+    """
+    Per-customer transaction index.
+
+    Built ONCE per pipeline run so that looking up a customer's
+    transactions is O(1) instead of a scan over the full table.
+
+    - Grouped by domain_config.customer_id_field
+    - Timestamps parsed once into int64 epoch microseconds
+    - Each group pre-sorted by timestamp (stable, input order on ties)
+
+    compact=True turns each row into a Transaction record (interned
+    strings, no metadata, keyed by the domain's field names) while
+    consuming `transactions`, so a streamed input (e.g.
+    iter_json_records) never holds the raw dicts.
+    """
+
+    def __init__(
+        self,
+        transactions: Iterable[Dict],
+        domain_config,
+        compact: bool = False,
+    ):
+        self.customer_id_field = domain_config.customer_id_field
+
+        if compact:
+            category_field = domain_config.category_field
+            record_type = transaction_type(
+                self.customer_id_field, category_field
+            )
+            rows = [
+                record_type(
+                    t.get(self.customer_id_field),
+                    t["timestamp"],
+                    t.get("item_name"),
+                    t.get(category_field),
+                    t.get("amount"),
+                )
+                for t in transactions
+            ]
+        else:
+            rows = list(transactions)
+        epochs = parse_timestamps([t["timestamp"] for t in rows]).tolist()
+
+        positions: Dict[str, List[int]] = defaultdict(list)
+        for i, t in enumerate(rows):
+            positions[t.get(self.customer_id_field)].append(i)
+
+        self._groups: Dict[str, List[Dict]] = {}
+        self._timestamps: Dict[str, array] = {}
+
+        for customer_id, idx in positions.items():
+            idx.sort(key=epochs.__getitem__)
+            self._groups[customer_id] = [rows[i] for i in idx]
+            self._timestamps[customer_id] = array(
+                "q", [epochs[i] for i in idx]
+            )
+
+    # ----------------------------
+    # Lookup API
+    # ----------------------------
+    def get(self, customer_id: str) -> List[Dict]:
+        """
+        Transactions for one customer, sorted by timestamp.
+        Returns an empty list for unknown customers.
+        """
+        return self._groups.get(customer_id, [])
+
+    def get_timestamps(self, customer_id: str) -> Sequence[int]:
+        """
+        Parsed epoch-microsecond timestamps aligned with get().
+        Reusable by any window logic without re-parsing.
+        """
+        return self._timestamps.get(customer_id, array("q"))
+
+    def customer_ids(self) -> List[str]:
+        return list(self._groups.keys())
+
+    def __contains__(self, customer_id: str) -> bool:
+        return customer_id in self._groups
+
+    def __len__(self) -> int:
+        return len(self._groups)
@@ -1,6 +1,12 @@
 # src/domains/base.py
 
-from typing import Dict, List
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# Distinct item names remembered per domain (catalogs are small)
+QUALITY_CACHE_SIZE = 8192
+
 
 class DomainConfig:
     def __init__(
@@ -10,9 +16,104 @@ class DomainConfig:
         category_field: str,
         velocity_unit: str,
         quality_keywords: dict,
+        quality_cache_size: int = QUALITY_CACHE_SIZE,
     ):
         self.name = name
         self.customer_id_field = customer_id_field
         self.category_field = category_field
         self.velocity_unit = velocity_unit
         self.quality_keywords = quality_keywords
+        self.quality_cache_size = quality_cache_size
+
+        self._compile_quality_matcher()
+
+    # ----------------------------
+    # Quality keyword matching
+    # ----------------------------
+    def quality_hits(self, item_name: str) -> Tuple[int, int]:
+        """
+        (premium_hits, value_hits) for one item name.
+
+        Same counting as a substring test per keyword: every
+        keyword found in the lowercased name counts once, so a
+        name can hit several keywords. Memoized per item name.
+        A missing name (None / NaN) hits nothing.
+        """
+        if type(item_name) is not str:
+            return 0, 0
+        return self._quality_hits_cached(item_name)
+
+    def _compile_quality_matcher(self):
+        """
+        Compile all quality keywords into ONE regex.
+
+        The zero-width lookahead reports every position where some
+        keyword starts (overlaps included); each candidate position
+        is then resolved against the keywords sharing that prefix.
+        """
+
+        premium = self.quality_keywords.get("Premium", [])
+        value = self.quality_keywords.get("Value", [])
+
+        # keyword -> (premium weight, value weight); duplicates in a
+        # list count once per occurrence, exactly like the old loops
+        weights: Dict[str, List[int]] = {}
+        for kw in premium:
+            weights.setdefault(kw, [0, 0])[0] += 1
+        for kw in value:
+            weights.setdefault(kw, [0, 0])[1] += 1
+        self._quality_weights = {k: tuple(v) for k, v in weights.items()}
+
+        # first character -> keywords starting with it
+        self._quality_by_initial: Dict[str, List[str]] = {}
+        for kw in self._quality_weights:
+            self._quality_by_initial.setdefault(kw[:1], []).append(kw)
+
+        alternation = "|".join(
+            re.escape(kw)
+            for kw in sorted(self._quality_weights, key=len, reverse=True)
+        )
+        self._quality_pattern = (
+            re.compile(f"(?=(?:{alternation}))")
+            if self._quality_weights
+            else None
+        )
+
+        self._quality_hits_cached = lru_cache(
+            maxsize=self.quality_cache_size
+        )(self._match_quality)
+
+    def _match_quality(self, item_name: str) -> Tuple[int, int]:
+        if self._quality_pattern is None:
+            return 0, 0
+
+        name = item_name.lower()
+        found = set()
+
+        for m in self._quality_pattern.finditer(name):
+            pos = m.start()
+            for kw in self._quality_by_initial.get(name[pos:pos + 1], ()):
+                if name.startswith(kw, pos):
+                    found.add(kw)
+
+        # the empty keyword matches every name
+        if "" in self._quality_weights:
+            found.add("")
+
+        premium_hits = sum(self._quality_weights[kw][0] for kw in found)
+        value_hits = sum(self._quality_weights[kw][1] for kw in found)
+        return premium_hits, value_hits
+
+    # ----------------------------
+    # Pickling (process pools, copies)
+    # ----------------------------
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in list(state):
+            if key.startswith("_quality"):
+                del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile_quality_matcher()
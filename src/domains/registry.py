@@ -0,0 +1,11 @@
+# src/domains/registry.py
+
+from src.domains.supermarket import SUPERMARKET_DOMAIN
+from src.domains.oil import OIL_DOMAIN
+from src.domains.banking import BANKING_DOMAIN
+
+DOMAIN_REGISTRY = {
+    "supermarket": SUPERMARKET_DOMAIN,
+    "oil": OIL_DOMAIN,
+    "banking": BANKING_DOMAIN,
+}
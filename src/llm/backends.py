@@ -0,0 +1,423 @@
+# src/llm/backends.py
+
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+import weakref
+from typing import Dict, Optional, Tuple
+
+from src.llm.rate_limit import parse_retry_after
+from src.utils import load_env
+
+# Fast + high-quality reasoning model
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# Reported by the template backend (part of response cache keys)
+TEMPLATE_MODEL = "local-template"
+
+# Defaults (overridable via environment / .env)
+DEFAULT_BACKEND = "groq"
+DEFAULT_POOL_SIZE = 20
+DEFAULT_TIMEOUT_SECONDS = 60.0
+
+TEMPLATE_RESPONSE = (
+    "[{model} {digest}] The {segment} classification follows from the "
+    "observed behavioral signals; without action, the associated "
+    "business risk is likely to grow."
+)
+
+_SEGMENT_LINE = re.compile(r"^Customer Segment:\s*(.+)$", re.MULTILINE)
+
+
+# =====================================================
+# BACKENDS
+# =====================================================
+#
+# A backend answers one chat-completions request (the dict built by
+# LLMClient) with the reply text and token usage, sync or async:
+#
+#   name              "groq" / "openai" / "template"
+#   complete(request) -> (text, usage)
+#   async acomplete(request) -> (text, usage)
+#   async aclose()    release the running event loop's resources
+#   close()           release everything
+#
+# usage: {"prompt_tokens": int, "completion_tokens": int} or None.
+#
+# Throttling (429), server errors and transport failures are raised
+# as RetryableLLMError; LLMClient owns retries, so SDK-level retries
+# are off. HTTP libraries are imported on construction, never at
+# module load.
+
+class RetryableLLMError(RuntimeError):
+    """
+    A call that may succeed if retried later.
+    retry_after: server-requested wait in seconds, if any.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def overloaded(self) -> bool:
+        """
+        The server is shedding load (lower the concurrency).
+        """
+        return self.status in (429, 503)
+
+
+def _is_retryable_status(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+class _PooledHTTPBackend:
+    """
+    Keep-alive connection pools (at most `pool_size` connections):
+    one for sync calls, and one per event loop for async calls (an
+    async pool cannot outlive its loop).
+    """
+
+    def __init__(self, pool_size: int, timeout: float):
+        import httpx
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+        )
+
+        # event loop -> async client (dropped with the loop)
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _async_client(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._make_async_client()
+                self._async_clients[loop] = client
+        return client
+
+    def _make_async_client(self):
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        import asyncio
+
+        with self._lock:
+            client = self._async_clients.pop(
+                asyncio.get_running_loop(), None
+            )
+        if client is not None:
+            await self._close_async_client(client)
+
+    async def _close_async_client(self, client) -> None:
+        await client.aclose()
+
+    def close(self) -> None:
+        self.client.close()
+        with self._lock:
+            self._async_clients.clear()
+
+
+class GroqBackend(_PooledHTTPBackend):
+    """
+    Groq chat completions via the groq SDK.
+    """
+
+    name = "groq"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    ):
+        import httpx
+        from groq import Groq
+
+        load_env()
+        api_key = api_key or os.getenv("GROQ_API_KEY")
+        if not api_key:
+            raise RuntimeError("GROQ_API_KEY not set")
+
+        super().__init__(pool_size, timeout)
+        self.api_key = api_key
+        self.base_url = base_url
+
+        self.client = Groq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=httpx.Client(limits=self.limits, timeout=timeout),
+        )
+
+    def complete(self, request: Dict) -> Tuple[str, Optional[Dict]]:
+        try:
+            response = self.client.chat.completions.create(**request)
+        except Exception as e:
+            retryable = self._retryable(e)
+            if retryable is None:
+                raise
+            raise retryable from e
+        return self._content(response)
+
+    async def acomplete(self, request: Dict) -> Tuple[str, Optional[Dict]]:
+        try:
+            response = await self._async_client().chat.completions.create(
+                **request
+            )
+        except Exception as e:
+            retryable = self._retryable(e)
+            if retryable is None:
+                raise
+            raise retryable from e
+        return self._content(response)
+
+    def _retryable(self, error: Exception) -> Optional[RetryableLLMError]:
+        import groq
+
+        if isinstance(error, groq.APIStatusError):
+            if not _is_retryable_status(error.status_code):
+                return None
+            return RetryableLLMError(
+                str(error),
+                status=error.status_code,
+                retry_after=parse_retry_after(error.response.headers),
+            )
+        if isinstance(error, groq.APIConnectionError):  # incl. timeouts
+            return RetryableLLMError(str(error))
+        return None
+
+    def _content(self, response) -> Tuple[str, Optional[Dict]]:
+        usage = response.usage
+        return response.choices[0].message.content, usage and {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+        }
+
+    def _make_async_client(self):
+        import httpx
+        from groq import AsyncGroq
+
+        return AsyncGroq(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=self.limits, timeout=self.timeout
+            ),
+        )
+
+    async def _close_async_client(self, client) -> None:
+        await client.close()
+
+
+class OpenAICompatibleBackend(_PooledHTTPBackend):
+    """
+    Any server speaking the OpenAI chat-completions protocol
+    (POST {base_url}/chat/completions), e.g. a local stub.
+    The API key is optional.
+    """
+
+    name = "openai"
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    ):
+        import httpx
+
+        if not base_url:
+            raise RuntimeError("LLM_BASE_URL not set")
+
+        super().__init__(pool_size, timeout)
+        self.base_url = base_url
+        self.headers = (
+            {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        )
+
+        self.client = httpx.Client(
+            base_url=base_url,
+            headers=self.headers,
+            limits=self.limits,
+            timeout=timeout,
+        )
+
+    def complete(self, request: Dict) -> Tuple[str, Optional[Dict]]:
+        import httpx
+
+        try:
+            response = self.client.post("/chat/completions", json=request)
+        except httpx.TransportError as e:  # incl. timeouts
+            raise RetryableLLMError(str(e)) from e
+        return self._content(response)
+
+    async def acomplete(self, request: Dict) -> Tuple[str, Optional[Dict]]:
+        import httpx
+
+        try:
+            response = await self._async_client().post(
+                "/chat/completions", json=request
+            )
+        except httpx.TransportError as e:
+            raise RetryableLLMError(str(e)) from e
+        return self._content(response)
+
+    def _make_async_client(self):
+        import httpx
+
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            limits=self.limits,
+            timeout=self.timeout,
+        )
+
+    def _content(self, response) -> Tuple[str, Optional[Dict]]:
+        if _is_retryable_status(response.status_code):
+            raise RetryableLLMError(
+                f"HTTP {response.status_code} from {response.url}",
+                status=response.status_code,
+                retry_after=parse_retry_after(response.headers),
+            )
+        response.raise_for_status()
+        body = response.json()
+        usage = body.get("usage")
+        return body["choices"][0]["message"]["content"], usage and {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+        }
+
+
+class TemplateBackend:
+    """
+    In-process, offline backend: a deterministic templated reply
+    (same prompt -> same text) after `latency` seconds plus up to
+    `jitter` seconds of random delay. No network, no API key,
+    no token usage.
+    """
+
+    name = "template"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+
+    def complete(self, request: Dict) -> Tuple[str, Optional[Dict]]:
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        return self._render(request), None
+
+    async def acomplete(self, request: Dict) -> Tuple[str, Optional[Dict]]:
+        import asyncio
+
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._render(request), None
+
+    async def aclose(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _delay(self) -> float:
+        if self.jitter <= 0:
+            return self.latency
+        return self.latency + self._rng.uniform(0, self.jitter)
+
+    def _render(self, request: Dict) -> str:
+        prompt = request["messages"][-1]["content"]
+        match = _SEGMENT_LINE.search(prompt)
+        return TEMPLATE_RESPONSE.format(
+            model=request.get("model", TEMPLATE_MODEL),
+            digest=hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12],
+            segment=match.group(1).strip() if match else "segment",
+        )
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+def configured_backend() -> str:
+    load_env()
+    return os.getenv("LLM_BACKEND", DEFAULT_BACKEND)
+
+
+def configured_model() -> str:
+    """
+    Model name for the configured backend, without building it
+    (response cache keys).
+    """
+    load_env()
+    default = TEMPLATE_MODEL if configured_backend() == "template" else (
+        DEFAULT_MODEL
+    )
+    return os.getenv("LLM_MODEL") or default
+
+
+def make_llm_backend():
+    """
+    LLM_BACKEND = "groq" (default) | "openai" | "template"
+    LLM_MODEL   = model name sent with every request
+
+    groq:     GROQ_API_KEY, GROQ_BASE_URL (optional)
+    openai:   LLM_BASE_URL (e.g. http://127.0.0.1:8765/v1),
+              LLM_API_KEY (optional)
+    groq / openai:
+              LLM_POOL_SIZE        = max keep-alive connections per pool
+              LLM_TIMEOUT_SECONDS  = per-request timeout
+    template: LLM_TEMPLATE_LATENCY_SECONDS, LLM_TEMPLATE_JITTER_SECONDS
+    """
+
+    kind = configured_backend()
+    pool_size = int(os.getenv("LLM_POOL_SIZE", DEFAULT_POOL_SIZE))
+    timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS))
+
+    if kind == "groq":
+        return GroqBackend(
+            base_url=os.getenv("GROQ_BASE_URL") or None,
+            pool_size=pool_size,
+            timeout=timeout,
+        )
+    if kind == "openai":
+        return OpenAICompatibleBackend(
+            base_url=os.getenv("LLM_BASE_URL", ""),
+            api_key=os.getenv("LLM_API_KEY") or None,
+            pool_size=pool_size,
+            timeout=timeout,
+        )
+    if kind == "template":
+        return TemplateBackend(
+            latency=float(os.getenv("LLM_TEMPLATE_LATENCY_SECONDS", 0)),
+            jitter=float(os.getenv("LLM_TEMPLATE_JITTER_SECONDS", 0)),
+        )
+    raise ValueError(f"Unsupported LLM_BACKEND: {kind}")
@@ -1,48 +1,244 @@
 # src/llm/llm_client.py
 
-import os
-from dotenv import load_dotenv
-from groq import Groq
+import threading
+import time
+from typing import Dict, Optional
+
+from src.llm.backends import (
+    RetryableLLMError,
+    configured_model,
+    make_llm_backend,
+)
+from src.llm.rate_limit import LLMCallLimiter, make_llm_limiter
+from src.metrics import (
+    LLM_CALLS,
+    LLM_CONCURRENCY_LIMIT,
+    LLM_ERRORS,
+    LLM_RATE_LIMITED,
+    LLM_REQUEST_SECONDS,
+    LLM_RETRIES,
+    LLM_THROTTLE_SECONDS,
+    LLM_TOKENS,
+)
+
+SYSTEM_PROMPT = (
+    "You are a senior marketing intelligence analyst. "
+    "You explain customer behavior and business risk clearly, "
+    "without inferring sensitive personal attributes."
+)
 
-load_dotenv()
 
 class LLMClient:
     """
-    Groq-powered LLM client.
+    LLM client (Groq by default, see src.llm.backends).
 
     Used ONLY for reasoning & explanation.
     Never for deterministic decisions.
-    """
 
-    def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise RuntimeError("GROQ_API_KEY not set")
+    Builds the chat request; the backend sends it and owns any
+    connection pools. Share one instance per process via
+    get_llm_client().
 
-        self.client = Groq(api_key=api_key)
+    Calls go through an LLMCallLimiter (rate limits, adaptive
+    concurrency) and are retried with backoff on throttling and
+    transient failures (see src.llm.rate_limit).
+    """
 
-        # Fast + high-quality reasoning model
-        self.model = "llama-3.3-70b-versatile"
+    def __init__(
+        self,
+        backend=None,
+        model: Optional[str] = None,
+        limiter: Optional[LLMCallLimiter] = None,
+    ):
+        self.backend = backend if backend is not None else make_llm_backend()
+        self.model = model or configured_model()
+        self.limiter = limiter if limiter is not None else make_llm_limiter(
+            getattr(self.backend, "pool_size", 0)
+        )
 
     def run(self, prompt: str, task: str = "reasoning") -> str:
         """
-        Execute a prompt against Groq LLM.
+        Execute a prompt against the LLM backend.
+        """
+
+        request = self._request(prompt)
+        tokens = _estimate_tokens(request)
+
+        attempt = 0
+        while True:
+            waited = time.perf_counter()
+            ticket = self.limiter.acquire(tokens)
+            started = time.perf_counter()
+            self._record_wait(started - waited)
+            try:
+                text, usage = self.backend.complete(request)
+            except RetryableLLMError as e:
+                self._finish(ticket, tokens, started, None, e)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            except BaseException as e:
+                self._finish(ticket, tokens, started, None, e)
+                raise
+            self._finish(ticket, tokens, started, usage)
+            return text.strip()
+
+    async def arun(self, prompt: str, task: str = "reasoning") -> str:
+        """
+        Async variant of run() for concurrent reasoning.
+        """
+        import asyncio
+
+        request = self._request(prompt)
+        tokens = _estimate_tokens(request)
+
+        attempt = 0
+        while True:
+            waited = time.perf_counter()
+            ticket = await self.limiter.aacquire(tokens)
+            started = time.perf_counter()
+            self._record_wait(started - waited)
+            try:
+                text, usage = await self.backend.acomplete(request)
+            except RetryableLLMError as e:
+                self._finish(ticket, tokens, started, None, e)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException as e:  # incl. cancellation: free the slot
+                self._finish(ticket, tokens, started, None, e)
+                raise
+            self._finish(ticket, tokens, started, usage)
+            return text.strip()
+
+    async def aclose(self) -> None:
         """
+        Release the running event loop's connections (call before
+        the loop ends, e.g. at the end of an asyncio.run()).
+        """
+        await self.backend.aclose()
+
+    def close(self) -> None:
+        self.backend.close()
 
-        system_prompt = (
-            "You are a senior marketing intelligence analyst. "
-            "You explain customer behavior and business risk clearly, "
-            "without inferring sensitive personal attributes."
+    def _finish(
+        self,
+        ticket: Optional[float],
+        tokens: int,
+        started: float,
+        usage: Optional[Dict],
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Release the limiter and record one backend call.
+        """
+        backend = self.backend.name
+        LLM_REQUEST_SECONDS.labels(backend).observe(
+            time.perf_counter() - started
         )
+        LLM_CALLS.labels(backend).inc()
+
+        used = None
+        if error is not None:
+            LLM_ERRORS.labels(backend).inc()
+        elif usage:
+            used = usage["prompt_tokens"] + usage["completion_tokens"]
+            LLM_TOKENS.labels(backend, "prompt").inc(usage["prompt_tokens"])
+            LLM_TOKENS.labels(backend, "completion").inc(
+                usage["completion_tokens"]
+            )
+        else:
+            used = tokens  # no usage reported: keep the estimate
+
+        overloaded = getattr(error, "overloaded", False)
+        self.limiter.release(ticket, tokens, used, overloaded)
+        if self.limiter.concurrency is not None:
+            LLM_CONCURRENCY_LIMIT.labels(backend).set(
+                self.limiter.concurrency.limit
+            )
+
+    def _retry_delay(
+        self, error: RetryableLLMError, attempt: int
+    ) -> Optional[float]:
+        backend = self.backend.name
+        if error.status == 429:
+            LLM_RATE_LIMITED.labels(backend).inc()
+        delay = self.limiter.retry.delay(attempt, error.retry_after)
+        if delay is not None:
+            LLM_RETRIES.labels(backend).inc()
+        return delay
+
+    def _record_wait(self, seconds: float) -> None:
+        if seconds > 0.0001:
+            LLM_THROTTLE_SECONDS.labels(self.backend.name).inc(seconds)
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
+    def _request(self, prompt: str) -> dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
-            temperature=0.3,   # stable, non-random
-            max_tokens=300,
-        )
+            "temperature": 0.3,   # stable, non-random
+            "max_tokens": 300,
+        }
+
+
+def _estimate_tokens(request: Dict) -> int:
+    """
+    Upper-bound token cost of a request for the tokens / minute
+    budget (~4 characters per token, plus the full completion).
+    """
+    chars = sum(len(message["content"]) for message in request["messages"])
+    return chars // 4 + request["max_tokens"]
+
+
+# --------------------------------------------------
+# PROCESS-WIDE CLIENT REGISTRY
+# --------------------------------------------------
+
+_shared_client: Optional[LLMClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Shared client, constructed on first use from the LLM_*
+    configuration (see make_llm_backend()).
+    """
+    global _shared_client
+
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = LLMClient()
+        return _shared_client
+
+
+async def release_loop_connections() -> None:
+    """
+    Close the shared client's pool for the running event loop.
+    Call at the end of a short-lived loop (asyncio.run()).
+    """
+    if _shared_client is not None:
+        await _shared_client.aclose()
+
+
+async def close_llm_client() -> None:
+    """
+    Close the shared client's pools (API shutdown). A later
+    get_llm_client() builds a fresh one.
+    """
+    global _shared_client
+
+    with _shared_client_lock:
+        client, _shared_client = _shared_client, None
 
-        return response.choices[0].message.content.strip()
+    if client is not None:
+        await client.aclose()
+        client.close()
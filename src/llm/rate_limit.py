@@ -0,0 +1,354 @@
+# src/llm/rate_limit.py
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Mapping, Optional
+
+from src.utils import load_env
+
+# Defaults (overridable via environment / .env)
+DEFAULT_RPM_LIMIT = 0          # requests / minute, 0 = unlimited
+DEFAULT_TPM_LIMIT = 0          # tokens / minute, 0 = unlimited
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_BACKOFF_MAX_SECONDS = 30.0
+DEFAULT_MAX_CONCURRENCY = 0    # 0 = the backend's pool size
+DEFAULT_MIN_CONCURRENCY = 1
+
+# Multiplicative decrease of the concurrency limit on overload
+AIMD_DECREASE_FACTOR = 0.5
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket, shared by threads and event
+    loops. Holds at most one minute's worth of tokens (the burst
+    a per-minute quota allows).
+
+    reserve() takes the tokens immediately, going into debt when
+    the bucket is short, and returns how long the caller must
+    wait before using them; later callers queue behind that debt,
+    so waiting is first come, first served.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        """
+        Give back over-reserved tokens (estimate > actual usage).
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, event=None, loop=None, future=None):
+        self.event = event
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+class AIMDConcurrency:
+    """
+    Concurrency gate whose limit tracks sustainable throughput
+    (additive increase, multiplicative decrease):
+
+    - every successful call adds 1 / limit (about +1 per full
+      window of successes)
+    - an overloaded call (429 / 503) halves the limit, at most once
+      per window: only calls started after the last decrease can
+      trigger the next one
+
+    Shared by threads (acquire) and event loops (aacquire);
+    waiters are served in arrival order.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        minimum: int = DEFAULT_MIN_CONCURRENCY,
+        initial: Optional[int] = None,
+    ):
+        self.maximum = maximum
+        self.minimum = max(1, minimum)
+        self.limit = float(initial or maximum)
+        self._inflight = 0
+        self._waiters = deque()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Block until a slot is free. Returns the ticket to pass to
+        release().
+        """
+        with self._lock:
+            if self._try_take():
+                return time.monotonic()
+            waiter = _Waiter(event=threading.Event())
+            self._waiters.append(waiter)
+        waiter.event.wait()
+        return time.monotonic()
+
+    async def aacquire(self) -> float:
+        import asyncio
+
+        with self._lock:
+            if self._try_take():
+                return time.monotonic()
+            loop = asyncio.get_running_loop()
+            waiter = _Waiter(loop=loop, future=loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._inflight -= 1
+                    self._wake()
+                else:
+                    self._waiters.remove(waiter)
+            raise
+        return time.monotonic()
+
+    def release(self, ticket: float, overloaded: bool = False) -> None:
+        with self._lock:
+            self._inflight -= 1
+            if not overloaded:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            elif ticket >= self._last_decrease:
+                self.limit = max(
+                    self.minimum, self.limit * AIMD_DECREASE_FACTOR
+                )
+                self._last_decrease = time.monotonic()
+            self._wake()
+
+    def _try_take(self) -> bool:
+        if self._waiters or self._inflight >= int(self.limit):
+            return False
+        self._inflight += 1
+        return True
+
+    def _wake(self) -> None:
+        while self._waiters and self._inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self._inflight += 1
+            if waiter.event is not None:
+                waiter.event.set()
+            else:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+
+def _resolve(future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter; a server-supplied
+    retry-after is honored as the minimum wait.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_seconds: float = DEFAULT_BACKOFF_BASE_SECONDS,
+        max_seconds: float = DEFAULT_BACKOFF_MAX_SECONDS,
+    ):
+        self.max_retries = max_retries
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+
+    def delay(
+        self, attempt: int, retry_after: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Seconds to wait before retry number `attempt + 1`, or None
+        when retries are exhausted.
+        """
+        if attempt >= self.max_retries:
+            return None
+        if retry_after is not None:
+            # spread the retries of calls throttled together
+            return retry_after + random.uniform(0, self.base_seconds)
+        return random.uniform(
+            0, min(self.max_seconds, self.base_seconds * 2 ** attempt)
+        )
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Seconds from retry-after-ms / retry-after (seconds or an
+    HTTP date); None when absent or unparseable.
+    """
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    # deferred: email.utils is slow to import and dates are rare
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# =====================================================
+# CLIENT-SIDE LIMITER
+# =====================================================
+
+class LLMCallLimiter:
+    """
+    Everything LLMClient waits on before a call:
+
+    - requests / minute and tokens / minute buckets (None = off)
+    - AIMD concurrency gate (None = unbounded)
+    - retry policy for RetryableLLMError
+
+    Token use is estimated up front and corrected with the
+    reported usage in release().
+    """
+
+    def __init__(
+        self,
+        rpm_limit: float = DEFAULT_RPM_LIMIT,
+        tpm_limit: float = DEFAULT_TPM_LIMIT,
+        max_concurrency: int = 0,
+        min_concurrency: int = DEFAULT_MIN_CONCURRENCY,
+        retry: Optional[RetryPolicy] = None,
+    ):
+        self.requests = TokenBucket(rpm_limit) if rpm_limit > 0 else None
+        self.tokens = TokenBucket(tpm_limit) if tpm_limit > 0 else None
+        self.concurrency = (
+            AIMDConcurrency(max_concurrency, min_concurrency)
+            if max_concurrency > 0 else None
+        )
+        self.retry = retry or RetryPolicy()
+
+    def acquire(self, tokens: int) -> Optional[float]:
+        """
+        Block until the call may start. Returns the ticket to pass
+        to release().
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        if self.concurrency is None:
+            return None
+        return self.concurrency.acquire()
+
+    async def aacquire(self, tokens: int) -> Optional[float]:
+        import asyncio
+
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if self.concurrency is None:
+            return None
+        return await self.concurrency.aacquire()
+
+    def release(
+        self,
+        ticket: Optional[float],
+        tokens: int,
+        used_tokens: Optional[int] = None,
+        overloaded: bool = False,
+    ) -> None:
+        """
+        used_tokens: reported usage; None refunds the whole estimate
+        (failed call).
+        """
+        if self.tokens is not None:
+            unused = tokens - (used_tokens or 0)
+            if unused > 0:
+                self.tokens.refund(unused)
+        if self.concurrency is not None:
+            self.concurrency.release(ticket, overloaded)
+
+    def _reserve(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.reserve(1)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+
+def make_llm_limiter(pool_size: int = 0) -> LLMCallLimiter:
+    """
+    LLM_RPM_LIMIT            = requests / minute (0 = unlimited)
+    LLM_TPM_LIMIT            = tokens / minute (0 = unlimited)
+    LLM_MAX_CONCURRENCY      = AIMD ceiling (0 = pool_size;
+                               unbounded without a pool)
+    LLM_MIN_CONCURRENCY      = AIMD floor
+    LLM_MAX_RETRIES          = retries of a retryable failure
+    LLM_BACKOFF_BASE_SECONDS / LLM_BACKOFF_MAX_SECONDS
+    """
+
+    load_env()
+    max_concurrency = int(
+        os.getenv("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+    ) or pool_size
+
+    return LLMCallLimiter(
+        rpm_limit=float(os.getenv("LLM_RPM_LIMIT", DEFAULT_RPM_LIMIT)),
+        tpm_limit=float(os.getenv("LLM_TPM_LIMIT", DEFAULT_TPM_LIMIT)),
+        max_concurrency=max_concurrency,
+        min_concurrency=int(
+            os.getenv("LLM_MIN_CONCURRENCY", DEFAULT_MIN_CONCURRENCY)
+        ),
+        retry=RetryPolicy(
+            max_retries=int(
+                os.getenv("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES)
+            ),
+            base_seconds=float(
+                os.getenv("LLM_BACKOFF_BASE_SECONDS",
+                          DEFAULT_BACKOFF_BASE_SECONDS)
+            ),
+            max_seconds=float(
+                os.getenv("LLM_BACKOFF_MAX_SECONDS",
+                          DEFAULT_BACKOFF_MAX_SECONDS)
+            ),
+        ),
+    )
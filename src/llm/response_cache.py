@@ -0,0 +1,197 @@
+# src/llm/response_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.utils import load_env
+
+# Defaults (overridable via environment / .env)
+DEFAULT_CACHE_PATH = os.path.join(".cache", "llm_responses.sqlite")
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache for LLM responses.
+
+    Two tiers:
+    - In-memory LRU (process-wide, bounded by max_entries)
+    - Optional on-disk SQLite tier (survives restarts)
+
+    Entries older than ttl_seconds are treated as misses in
+    both tiers. Keys are produced by make_key() and must include
+    everything that changes the answer (model, prompt version, ...).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    # ----------------------------
+    # Keys
+    # ----------------------------
+    @staticmethod
+    def make_key(**parts) -> str:
+        """
+        Stable SHA-256 over canonical JSON of the key parts.
+        """
+        payload = json.dumps(
+            parts, sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ----------------------------
+    # Lookup / store
+    # ----------------------------
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM llm_responses"
+                    " WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl_seconds:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        created_at = time.time()
+
+        with self._lock:
+            self._remember(key, value, created_at)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_responses"
+                    " (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, created_at),
+                )
+                self._db.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Drop expired rows from the disk tier. Returns rows removed.
+        """
+        if self._db is None:
+            return 0
+
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            self._db.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "persistent": self._db is not None,
+        }
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+# --------------------------------------------------
+# PROCESS-WIDE DEFAULT CACHE
+# --------------------------------------------------
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[LLMResponseCache]:
+    """
+    Shared cache used by ReasoningAgent.
+
+    Configured from the environment:
+    - LLM_CACHE_ENABLED      ("0" disables caching entirely)
+    - LLM_CACHE_PATH         (SQLite file; "" = memory only)
+    - LLM_CACHE_MAX_ENTRIES  (in-memory LRU size)
+    - LLM_CACHE_TTL_SECONDS
+    """
+    global _default_cache
+
+    load_env()
+
+    if os.getenv("LLM_CACHE_ENABLED", "1") == "0":
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache(
+                path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH) or None,
+                max_entries=int(
+                    os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+                ),
+                ttl_seconds=float(
+                    os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+                ),
+            )
+        return _default_cache
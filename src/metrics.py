@@ -0,0 +1,317 @@
+# src/metrics.py
+
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Seconds: from per-customer steps (~10 µs) to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# =====================================================
+# METRIC TYPES
+# =====================================================
+#
+# Recording is a dict lookup plus a locked add; all formatting
+# happens in render(), i.e. only when /metrics is scraped.
+
+class _CounterValue:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self, lock: threading.Lock):
+        self._lock = lock
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ("_lock", "_bounds", "counts", "sum")
+
+    def __init__(self, lock: threading.Lock, bounds: Sequence[float]):
+        self._lock = lock
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last: +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        # label values (as strings) -> series; _lookup also keys it
+        # by the values as passed, so the hot path is one dict get
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lookup: Dict[tuple, object] = {}
+
+    def labels(self, *values):
+        """
+        The time series for these label values (positional, in
+        labelnames order).
+        """
+        value = self._lookup.get(values)
+        if value is None:
+            value = self._add(values)
+        return value
+
+    def _add(self, values: tuple):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            value = self._values.setdefault(key, self._new_value())
+            self._lookup[values] = value
+        return value
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def _label_text(self, key, extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"'
+            for name, value in zip(self.labelnames, key)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _new_value(self):
+        return _CounterValue(self._lock)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, v.value) for k, v in self._values.items()]
+        return [
+            f"{self.name}{self._label_text(key)} {_number(value)}"
+            for key, value in sorted(items)
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def _new_value(self):
+        return _GaugeValue(self._lock)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _new_value(self):
+        return _HistogramValue(self._lock, self.buckets)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [
+                (k, list(v.counts), v.sum) for k, v in self._values.items()
+            ]
+
+        lines = []
+        for key, counts, total in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = self._label_text(key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = self._label_text(key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+# =====================================================
+# REGISTRY
+# =====================================================
+
+_registry: List[_Metric] = []
+
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    metric = Counter(name, documentation, labelnames)
+    _registry.append(metric)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelnames=()) -> Gauge:
+    metric = Gauge(name, documentation, labelnames)
+    _registry.append(metric)
+    return metric
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames=(),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    metric = Histogram(name, documentation, labelnames, buckets)
+    _registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    """
+    Every metric in the Prometheus text exposition format.
+    """
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# =====================================================
+# APPLICATION METRICS
+# =====================================================
+
+STAGE_SECONDS = histogram(
+    "pipeline_stage_duration_seconds",
+    "Time per timed pipeline step: load, index, behavior and campaign "
+    "once per run, reasoning per customer (per run when deduplicated), "
+    "serialization per response or streamed result.",
+    ("stage",),
+)
+
+CUSTOMERS_PROCESSED = counter(
+    "pipeline_customers_processed_total",
+    "Customer results produced.",
+)
+
+LLM_REQUEST_SECONDS = histogram(
+    "llm_request_duration_seconds",
+    "LLM backend call latency (cache hits excluded).",
+    ("backend",),
+)
+
+LLM_CALLS = counter(
+    "llm_calls_total",
+    "LLM backend calls.",
+    ("backend",),
+)
+
+LLM_ERRORS = counter(
+    "llm_errors_total",
+    "LLM backend calls that raised.",
+    ("backend",),
+)
+
+LLM_RETRIES = counter(
+    "llm_retries_total",
+    "LLM backend calls retried after a retryable failure.",
+    ("backend",),
+)
+
+LLM_RATE_LIMITED = counter(
+    "llm_rate_limited_total",
+    "LLM backend calls rejected with HTTP 429.",
+    ("backend",),
+)
+
+LLM_THROTTLE_SECONDS = counter(
+    "llm_throttle_wait_seconds_total",
+    "Time LLM calls waited on the client-side rate and concurrency "
+    "limits (backoff sleeps excluded).",
+    ("backend",),
+)
+
+LLM_CONCURRENCY_LIMIT = gauge(
+    "llm_concurrency_limit",
+    "Current adaptive (AIMD) limit on concurrent LLM calls.",
+    ("backend",),
+)
+
+LLM_TOKENS = counter(
+    "llm_tokens_total",
+    "Tokens reported by the LLM backend.",
+    ("backend", "type"),
+)
+
+LLM_CACHE_HITS = counter(
+    "llm_cache_hits_total",
+    "Reasoning answers served from the response cache.",
+)
+
+LLM_CACHE_MISSES = counter(
+    "llm_cache_misses_total",
+    "Reasoning cache lookups that missed.",
+)
+
+RESULT_CACHE_LOOKUPS = counter(
+    "result_cache_lookups_total",
+    "Pipeline result cache lookups by outcome (hit, miss, coalesced).",
+    ("outcome",),
+)
+
+NOT_MODIFIED_RESPONSES = counter(
+    "http_not_modified_total",
+    "Requests answered 304 Not Modified from If-None-Match.",
+    ("route",),
+)
@@ -0,0 +1,307 @@
+# src/parallel.py
+
+import os
+import threading
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.agents.behavior_agent import BehaviorAgent
+from src.utils import load_env
+
+# Defaults (overridable via environment / .env)
+# Below this many transactions the in-process batch pass is faster
+# than shipping shards to worker processes
+DEFAULT_SHARDED_MIN_ROWS = 250_000
+
+
+def shard_of(customer_id, shards: int) -> int:
+    """
+    Stable hash partition (unlike hash(), identical in every process).
+    """
+    return zlib.crc32(str(customer_id).encode("utf-8")) % shards
+
+
+def get_sharded_min_rows() -> int:
+    """
+    SHARDED_MIN_ROWS = smallest input sent to the process pool
+    """
+    load_env()
+    return int(os.getenv("SHARDED_MIN_ROWS", DEFAULT_SHARDED_MIN_ROWS))
+
+
+def use_process_pool(transactions, workers: Optional[int]) -> bool:
+    """
+    Whether a run with `workers` should shard the behavior stage:
+    more than one worker and at least SHARDED_MIN_ROWS rows. A
+    stream's length is unknown up front; run_behavior_sharded()
+    checks it once the stream is read.
+    """
+    if not workers or workers <= 1:
+        return False
+    try:
+        return len(transactions) >= get_sharded_min_rows()
+    except TypeError:
+        return True
+
+
+def run_behavior_sharded(
+    domain_config,
+    customers: List[Dict],
+    transactions: Iterable[Dict],
+    workers: int,
+) -> List[Dict]:
+    """
+    Behavior stage on the shared process pool.
+
+    Customers are hash-partitioned into `workers` shards together
+    with their transactions, one task per shard: ColumnarTransactions
+    as slices of their code columns, any other input (rows, a
+    stream) as columns of only the fields the stages read.
+    `transactions` is consumed in a single pass. Fewer than
+    SHARDED_MIN_ROWS rows, or a single worker, stay in-process
+    (columns: one batch pass; rows: the same shards, since a
+    stream is only sized once read). Returns behavior results in
+    the original customer order.
+    """
+    from src.data.columnar_cache import (
+        ColumnarTransactionIndex,
+        ColumnarTransactions,
+    )
+
+    columnar = isinstance(transactions, ColumnarTransactions)
+    if columnar and (
+        workers <= 1 or len(transactions) < get_sharded_min_rows()
+    ):
+        # one batch pass over the (cached) grouping
+        return BehaviorAgent().analyze_index(
+            [customer["customer_id"] for customer in customers],
+            ColumnarTransactionIndex(transactions, domain_config),
+            domain_config,
+        )
+
+    shard_positions: List[List[int]] = [[] for _ in range(workers)]
+    shard_customers: List[List[str]] = [[] for _ in range(workers)]
+
+    shard_by_customer: Dict[str, int] = {}
+
+    for position, customer in enumerate(customers):
+        customer_id = customer["customer_id"]
+        shard = shard_by_customer.setdefault(
+            customer_id, shard_of(customer_id, workers)
+        )
+        shard_positions[shard].append(position)
+        shard_customers[shard].append(customer_id)
+
+    if columnar:
+        run_shard = _run_columnar_shard
+        shard_transactions = _shard_columns(
+            transactions, shard_by_customer, workers
+        )
+        rows = len(transactions)
+    else:
+        run_shard = _run_shard
+        shard_transactions = _shard_rows(
+            domain_config, transactions, shard_by_customer, workers
+        )
+        rows = sum(len(columns[0]) for columns in shard_transactions)
+
+    tasks = [
+        (
+            shard_positions[shard],
+            (domain_config, customer_ids, shard_transactions[shard]),
+        )
+        for shard, customer_ids in enumerate(shard_customers)
+        if customer_ids
+    ]
+
+    if workers <= 1 or rows < get_sharded_min_rows():
+        # worker round trips would cost more than they save
+        outputs = [run_shard(*args) for _, args in tasks]
+    else:
+        futures = _submit(workers, run_shard, [args for _, args in tasks])
+        try:
+            outputs = [future.result() for future in futures]
+        except BrokenProcessPool:
+            # a worker died: the next run starts a fresh pool
+            close_process_pool()
+            raise
+
+    merged: List[Dict] = [None] * len(customers)
+    for (positions, _), output in zip(tasks, outputs):
+        for position, result in zip(positions, output):
+            merged[position] = result
+
+    return merged
+
+
+def _shard_rows(
+    domain_config,
+    transactions: Iterable[Dict],
+    shard_by_customer: Dict[str, int],
+    workers: int,
+) -> List[Tuple[List, List, List, List]]:
+
+    cid_field = domain_config.customer_id_field
+    cat_field = domain_config.category_field
+
+    shard_transactions = [([], [], [], []) for _ in range(workers)]
+
+    for t in transactions:
+        customer_id = t.get(cid_field)
+        shard = shard_by_customer.get(customer_id)
+        if shard is None:
+            # not requested: no shard needs it
+            continue
+        ids, timestamps, items, categories = shard_transactions[shard]
+        ids.append(customer_id)
+        timestamps.append(t["timestamp"])
+        items.append(t.get("item_name"))
+        categories.append(t.get(cat_field))
+
+    return shard_transactions
+
+
+def _shard_columns(
+    columns,
+    shard_by_customer: Dict[str, int],
+    workers: int,
+) -> List[Tuple]:
+    """
+    Per shard: its rows of the code columns (original order) plus
+    the shared dictionaries. Amounts stay behind: the behavior
+    stage never reads them.
+    """
+    import numpy as np
+
+    # shard of each customer code, -1 when not requested
+    shard_of_code = np.fromiter(
+        (shard_by_customer.get(cid, -1) for cid in columns.customer_ids),
+        dtype=np.int64,
+        count=len(columns.customer_ids),
+    )
+    row_shards = shard_of_code[columns.customer_codes]
+
+    order = np.argsort(row_shards, kind="stable")
+    bounds = np.searchsorted(row_shards[order], np.arange(-1, workers + 1))
+
+    return [
+        (
+            columns.customer_codes[positions],
+            columns.customer_ids,
+            columns.timestamps[positions],
+            columns.category_codes[positions],
+            columns.categories,
+            columns.item_codes[positions],
+            columns.items,
+        )
+        for positions in (
+            order[bounds[shard + 1]:bounds[shard + 2]]
+            for shard in range(workers)
+        )
+    ]
+
+
+# --------------------------------------------------
+# PROCESS-WIDE POOL
+# --------------------------------------------------
+
+_shared_pool: Optional[ProcessPoolExecutor] = None
+_shared_pool_size = 0
+_shared_pool_lock = threading.Lock()
+
+
+def _submit(workers: int, fn, calls: List[Tuple]) -> List[Future]:
+    """
+    Submit fn(*args) per call to the shared pool, started on first
+    use and kept across runs, so worker start-up is paid once per
+    process. A run asking for more workers than the pool has
+    replaces it; submitting under the lock means a replaced pool
+    only finishes what it already has.
+    """
+    global _shared_pool, _shared_pool_size
+
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool_size < workers:
+            if _shared_pool is not None:
+                _shared_pool.shutdown(wait=False)
+            _shared_pool = ProcessPoolExecutor(max_workers=workers)
+            _shared_pool_size = workers
+        return [_shared_pool.submit(fn, *args) for args in calls]
+
+
+def close_process_pool() -> None:
+    """
+    Stop the shared pool's workers (API shutdown). A later sharded
+    run starts a fresh one.
+    """
+    global _shared_pool, _shared_pool_size
+
+    with _shared_pool_lock:
+        pool, _shared_pool, _shared_pool_size = _shared_pool, None, 0
+
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+# --------------------------------------------------
+# WORKER SIDE
+# --------------------------------------------------
+
+def _run_shard(
+    domain_config,
+    customer_ids: List[str],
+    columns: Tuple[List, List, List, List],
+) -> List[Dict]:
+
+    cid_field = domain_config.customer_id_field
+    cat_field = domain_config.category_field
+
+    # deferred: only sharded runs need pandas
+    import pandas as pd
+
+    transactions = pd.DataFrame(
+        dict(zip((cid_field, "timestamp", "item_name", cat_field), columns)),
+        dtype=object,
+    )
+
+    return BehaviorAgent().analyze_all(
+        customer_ids, transactions, domain_config
+    )
+
+
+def _run_columnar_shard(
+    domain_config,
+    customer_ids: List[str],
+    arrays: Tuple,
+) -> List[Dict]:
+
+    import numpy as np
+    from src.data.columnar_cache import (
+        ColumnarTransactionIndex,
+        ColumnarTransactions,
+    )
+
+    (
+        customer_codes, customer_dictionary, timestamps,
+        category_codes, categories, item_codes, items,
+    ) = arrays
+
+    columns = ColumnarTransactions(
+        customer_codes,
+        customer_dictionary,
+        timestamps,
+        # not shipped: the behavior stage never reads amounts
+        np.full(len(timestamps), np.nan),
+        category_codes,
+        categories,
+        item_codes,
+        items,
+    )
+
+    return BehaviorAgent().analyze_index(
+        customer_ids,
+        ColumnarTransactionIndex(columns, domain_config),
+        domain_config,
+    )
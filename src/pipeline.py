@@ -1,16 +1,28 @@
 # src/pipeline.py
 
+import hashlib
+import json
 import os
+import time
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Optional
 
 from src.agents.behavior_agent import BehaviorAgent
-from src.agents.reasoning_agent import ReasoningAgent
+from src.agents.reasoning_agent import PROMPT_TEMPLATE_VERSION, ReasoningAgent
 from src.agents.campaign_agent import CampaignAgent
 
-from src.domains.supermarket import SUPERMARKET_DOMAIN
-from src.domains.oil import OIL_DOMAIN
-from src.domains.banking import BANKING_DOMAIN
+from src.domains.registry import DOMAIN_REGISTRY
 
-from src.utils import load_json, pretty_print
+from src.data.behavior_state import get_behavior_state_store
+from src.data.past_campaigns import PastCampaignIndex
+from src.data.records import Transaction, to_customers
+from src.data.timestamps import parse_timestamps
+from src.data.transaction_index import TransactionIndex
+
+from src.llm.backends import configured_backend, configured_model
+
+from src.metrics import CUSTOMERS_PROCESSED, STAGE_SECONDS
+from src.utils import iter_json_records, pretty_print
 
 
 # --------------------------------------------------
@@ -19,89 +31,260 @@ from src.utils import load_json, pretty_print
 # Use current working directory (project root)
 BASE_DIR = os.getcwd()
 
+# Bump whenever the deterministic stages change their output
+# (invalidates cached results, see dataset_fingerprint())
+PIPELINE_OUTPUT_VERSION = "1"
+
 
 # --------------------------------------------------
 # DOMAIN CONFIGURATION
 # --------------------------------------------------
 
-DOMAIN_CONFIGS = {
-    "supermarket": SUPERMARKET_DOMAIN,
-    "oil": OIL_DOMAIN,
-    "banking": BANKING_DOMAIN,
-}
-
-
-# --------------------------------------------------
-# PIPELINE
-# --------------------------------------------------
+DOMAIN_CONFIGS = DOMAIN_REGISTRY
 
-def run_pipeline(domain_name: str):
 
+def get_domain_config(domain_name: str):
     if domain_name not in DOMAIN_CONFIGS:
         raise ValueError(f"Unsupported domain: {domain_name}")
+    return DOMAIN_CONFIGS[domain_name]
 
-    domain = DOMAIN_CONFIGS[domain_name]
 
-    # ----------------------------
-    # Load DOMAIN-SCOPED data
-    # ----------------------------
-    customers = load_json(
-        os.path.join(BASE_DIR, "data", domain_name, "customers.json")
+def _data_file(domain_name: str, name: str) -> str:
+    """
+    data/<domain>/<name>.json, or <name>.ndjson if only that exists.
+    """
+    path = os.path.join(BASE_DIR, "data", domain_name, f"{name}.json")
+    ndjson_path = os.path.join(BASE_DIR, "data", domain_name, f"{name}.ndjson")
+    if not os.path.exists(path) and os.path.exists(ndjson_path):
+        return ndjson_path
+    return path
+
+
+def _load_past_campaigns(domain_name: str) -> List[Dict]:
+    path = _data_file(domain_name, "past_campaigns")
+    if not os.path.exists(path):
+        return []
+    return list(iter_json_records(path))
+
+
+def _load_transactions(domain_name: str, domain_config):
+    """
+    Stored transactions for a domain: memory-mapped columns from the
+    on-disk cache (rebuilt when the source file changes), or a
+    streaming parse when the cache is disabled or the file has
+    amounts the columns cannot hold.
+    """
+    # deferred: numpy-backed, loaded on the first run
+    from src.data.columnar_cache import (
+        UnsupportedAmountError,
+        get_columnar_cache_dir,
+        load_transactions_columnar,
     )
 
-    transactions = load_json(
-        os.path.join(BASE_DIR, "data", domain_name, "transactions.json")
+    path = _data_file(domain_name, "transactions")
+
+    cache_dir = get_columnar_cache_dir()
+    if cache_dir is None:
+        # streamed: grouped into the compact index as it is parsed
+        return iter_json_records(path)
+
+    try:
+        return load_transactions_columnar(
+            path,
+            domain_config,
+            os.path.join(cache_dir, domain_name, "transactions"),
+        )
+    except UnsupportedAmountError:
+        # the row-based index keeps such amounts as they are
+        return iter_json_records(path)
+
+
+def _load_domain_data(domain_name: str, domain_config):
+    """
+    (customers, transactions, past_campaigns) stored for a domain.
+    """
+    started = time.perf_counter()
+
+    customers = to_customers(
+        iter_json_records(_data_file(domain_name, "customers"))
     )
+    transactions = _load_transactions(domain_name, domain_config)
+    past_campaigns = _load_past_campaigns(domain_name)
 
-    # ----------------------------
-    # Initialize agents
-    # ----------------------------
-    behavior_agent = BehaviorAgent()
-    reasoning_agent = ReasoningAgent()
-    campaign_agent = CampaignAgent()
+    STAGE_SECONDS.labels("load").observe(time.perf_counter() - started)
+    return customers, transactions, past_campaigns
 
-    results = []
 
-    # ----------------------------
-    # CUSTOMER LOOP (DOMAIN SAFE)
-    # ----------------------------
+def dataset_fingerprint(domain_name: str, **options) -> str:
+    """
+    SHA-256 over everything run_pipeline() output depends on: the
+    stored files (path, mtime, size), the domain config, the
+    pipeline / prompt versions, the LLM backend and model, and any
+    result-changing options (e.g. dedupe_reasoning).
+    """
+
+    domain = get_domain_config(domain_name)
+
+    files = {}
+    for name in ("customers", "transactions", "past_campaigns"):
+        path = _data_file(domain_name, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            files[name] = None
+            continue
+        files[name] = [path, stat.st_mtime_ns, stat.st_size]
+
+    return _digest({
+        "context": _result_context(domain, options),
+        "files": files,
+    })
+
+
+def upload_fingerprint(
+    domain: str,
+    customers: List[Dict],
+    transactions: List[Dict],
+    past_campaigns: List[Dict],
+    **options,
+):
+    """
+    (payload key, customer_id -> customer key) for an ingestion
+    payload.
+
+    Transactions are canonicalized per customer (input order kept
+    within a customer, since ties on timestamp keep it), so the
+    customer key changes only with that customer's own rows; the
+    payload key covers the customers list, every transaction
+    subset, past campaigns and the same context as
+    dataset_fingerprint().
+    """
+
+    domain_config = get_domain_config(domain)
+    context = _digest(_result_context(domain_config, options))
+
+    cid_field = domain_config.customer_id_field
+    rows_by_customer: Dict = {}
+    for t in transactions:
+        rows_by_customer.setdefault(t[cid_field], []).append(t)
+
+    # canonical rows built per customer and dropped right after
+    # hashing (cheaper than holding one tuple per transaction)
+    customer_keys = {
+        customer_id: _digest(
+            [context, customer_id, [_canonical(t) for t in rows]]
+        )
+        for customer_id, rows in rows_by_customer.items()
+    }
     for customer in customers:
         customer_id = customer["customer_id"]
+        if customer_id not in customer_keys:
+            customer_keys[customer_id] = _digest([context, customer_id, []])
 
-        # 1. Behavior analysis (deterministic)
-        behavior = behavior_agent.analyze_customer(
-            customer_id=customer_id,
-            transactions=transactions,
-            domain_config=domain,
-        )
+    payload_key = _digest({
+        "context": context,
+        "customers": [_canonical(c) for c in customers],
+        "transactions": sorted(
+            customer_keys[customer_id] for customer_id in rows_by_customer
+        ),
+        "past_campaigns": past_campaigns,
+    })
+    return payload_key, customer_keys
 
-        segment = behavior["segment"]
-        signals = behavior["signals"]
 
-        # 2. LLM reasoning (Groq)
-        reasoning = reasoning_agent.reason(
-            segment=segment,
-            signals=signals,
-            domain_name=domain.name,
-        )
+def _result_context(domain_config, options: Dict) -> Dict:
+    """
+    Everything besides the input data that results depend on.
+    """
+    return {
+        "pipeline_version": PIPELINE_OUTPUT_VERSION,
+        "prompt_version": PROMPT_TEMPLATE_VERSION,
+        "llm": [configured_backend(), configured_model()],
+        "domain": {
+            "name": domain_config.name,
+            "customer_id_field": domain_config.customer_id_field,
+            "category_field": domain_config.category_field,
+            "velocity_unit": domain_config.velocity_unit,
+            "quality_keywords": domain_config.quality_keywords,
+        },
+        "options": options,
+    }
 
-        # 3. Campaign recommendation + ROI
-        campaign = campaign_agent.recommend_campaign(
-            segment=segment,
-            signals=signals,
-            domain_config=domain,
-            segment_size=1000,  # POC assumption
+
+def _canonical(row):
+    """
+    A record or row dict in JSON-hashable form. Transactions (the
+    bulk of a payload) become plain tuples, customer_id left out:
+    rows are hashed grouped by customer.
+    """
+    if isinstance(row, Transaction):
+        return (
+            row.timestamp,
+            row.item_name,
+            row.category,
+            row.amount,
+            row.metadata or None,
         )
+    return row.to_dict() if hasattr(row, "to_dict") else row
 
-        results.append({
-            "customer_id": customer_id,
-            "segment": segment,
-            "signals": signals,
-            "reasoning": reasoning,
-            "campaign": campaign,
-        })
 
-    return results
+def _digest(parts) -> str:
+    """
+    SHA-256 of canonical JSON (sorted keys).
+    """
+    payload = json.dumps(
+        parts, sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --------------------------------------------------
+# PIPELINE
+# --------------------------------------------------
+
+def run_pipeline(
+    domain_name: str,
+    concurrency: Optional[int] = None,
+    dedupe_reasoning: bool = False,
+    report: Optional[Dict] = None,
+    workers: Optional[int] = None,
+):
+    """
+    Run the pipeline on the stored dataset under data/<domain_name>.
+
+    concurrency: if set, LLM reasoning calls are fanned out with at
+    most this many in flight (results keep customer order).
+
+    dedupe_reasoning: one LLM call per (segment, signal signature)
+    bucket, shared by every customer in the bucket.
+
+    report: optional dict, filled with run statistics.
+
+    workers: if > 1, the behavior stage runs on the shared process
+    pool, customers hash-partitioned across workers (inputs under
+    SHARDED_MIN_ROWS transactions stay in-process, see
+    src/parallel.py).
+    """
+
+    domain = get_domain_config(domain_name)
+
+    # ----------------------------
+    # Load DOMAIN-SCOPED data
+    # ----------------------------
+    customers, transactions, past_campaigns = _load_domain_data(
+        domain_name, domain
+    )
+
+    return _run_customers(
+        domain,
+        customers,
+        transactions,
+        past_campaigns,
+        concurrency=concurrency,
+        dedupe_reasoning=dedupe_reasoning,
+        report=report,
+        workers=workers,
+    )
 
 
 def run_pipeline_with_data(
@@ -109,123 +292,718 @@ def run_pipeline_with_data(
     customers: list,
     transactions: list,
     past_campaigns: list,
+    concurrency: Optional[int] = None,
+    dedupe_reasoning: bool = False,
+    report: Optional[Dict] = None,
+    workers: Optional[int] = None,
 ):
     """
     Same logic as run_pipeline(), but uses in-memory data.
     """
 
-    from src.agents.behavior_agent import BehaviorAgent
-    from src.agents.reasoning_agent import ReasoningAgent
-    from src.agents.campaign_agent import CampaignAgent
-    from src.domains.registry import DOMAIN_REGISTRY
+    domain_config = get_domain_config(domain)
+
+    return _run_customers(
+        domain_config,
+        customers,
+        transactions,
+        past_campaigns,
+        concurrency=concurrency,
+        dedupe_reasoning=dedupe_reasoning,
+        report=report,
+        workers=workers,
+    )
 
-    domain_config = DOMAIN_REGISTRY[domain]
 
-    behavior_agent = BehaviorAgent()
-    reasoning_agent = ReasoningAgent()
-    campaign_agent = CampaignAgent(past_campaigns)
+def run_pipeline_with_ingestion(
+    domain: str,
+    customers: list,
+    transactions: list,
+    past_campaigns: list,
+    concurrency: Optional[int] = None,
+    dedupe_reasoning: bool = False,
+    report: Optional[Dict] = None,
+    workers: Optional[int] = None,
+):
+    """
+    Run pipeline using live-ingested data (API / Streamlit)
+    """
 
-    output = []
+    domain_config = get_domain_config(domain)
+
+    results = _run_customers(
+        domain_config,
+        customers,
+        transactions,
+        past_campaigns,
+        concurrency=concurrency,
+        dedupe_reasoning=dedupe_reasoning,
+        report=report,
+        workers=workers,
+    )
 
+    return {
+        "domain": domain,
+        "results": results,
+    }
+
+
+def run_pipeline_incremental(
+    domain: str,
+    customers: list,
+    transactions: list,
+    past_campaigns: list,
+    store,
+    customer_keys: Dict[str, str],
+    concurrency: Optional[int] = None,
+    dedupe_reasoning: bool = False,
+    report: Optional[Dict] = None,
+):
+    """
+    run_pipeline_with_ingestion() that reuses per-customer results.
+
+    store: a ResultCache; customer_keys: from upload_fingerprint().
+    Behavior and reasoning depend only on a customer's own
+    transactions, so they are taken from the store when that
+    customer's key is found, and only the other customers are
+    analyzed (and stored). Campaigns are re-proposed from the
+    segment sizes of ALL customers. Output equals a full run.
+
+    report["reused"]: customers taken from the store.
+    """
+
+    domain_config = get_domain_config(domain)
+
+    reused: Dict[str, Dict] = {}
     for customer in customers:
         customer_id = customer["customer_id"]
-
-        behavior = behavior_agent.analyze_customer(
-            customer_id=customer_id,
-            transactions=transactions,
-            domain_config=domain_config,
+        body = store.get(customer_keys[customer_id])
+        if body is not None:
+            reused[customer_id] = json.loads(body)
+
+    changed = [c for c in customers if c["customer_id"] not in reused]
+    cid_field = domain_config.customer_id_field
+    changed_transactions = [
+        t for t in transactions if t[cid_field] not in reused
+    ]
+
+    report = report if report is not None else {}
+    ctx = _RunContext(
+        domain_config,
+        changed,
+        changed_transactions,
+        past_campaigns,
+        report=report,
+    )
+    ctx.extra_segments = Counter(
+        reused[c["customer_id"]]["segment"]
+        for c in customers if c["customer_id"] in reused
+    )
+    computed = _run_context(ctx, changed, concurrency, dedupe_reasoning)
+
+    for result in computed:
+        store.put(
+            customer_keys[result["customer_id"]],
+            json.dumps({
+                "segment": result["segment"],
+                "signals": result["signals"],
+                "reasoning": result["reasoning"],
+            }).encode("utf-8"),
         )
 
-        reasoning = reasoning_agent.reason(
-            customer_id=customer_id,
-            segment=behavior["segment"],
-            signals=behavior["signals"],
-            domain=domain,
-        )
+    # customer order, campaigns sized over everyone
+    computed_iter = iter(computed)
+    results = []
+    for customer in customers:
+        partial = reused.get(customer["customer_id"])
+        if partial is None:
+            results.append(next(computed_iter))
+        else:
+            results.append(_customer_result(
+                {"customer_id": customer["customer_id"], **partial},
+                partial["reasoning"],
+                ctx.campaigns[partial["segment"]],
+            ))
+
+    report["customers"] = len(customers)
+    report["reused"] = len(customers) - len(changed)
 
-        campaign = campaign_agent.recommend_campaign(
-            segment=behavior["segment"]
-        )
+    return {
+        "domain": domain,
+        "results": results,
+    }
 
-        output.append({
-            "customer_id": customer_id,
-            "segment": behavior["segment"],
-            "signals": behavior["signals"],
-            "reasoning": reasoning,
-            "campaign": campaign,
-        })
 
-    return output
+# --------------------------------------------------
+# STREAMING (one result per customer, as soon as ready)
+# --------------------------------------------------
 
-def run_pipeline_with_ingestion(
+def stream_pipeline(
+    domain_name: str,
+    concurrency: Optional[int] = None,
+    report: Optional[Dict] = None,
+):
+    """
+    Streaming variant of run_pipeline().
+
+    Loading, indexing, the behavior and campaign stages (campaign
+    proposals are sized by segment counts) and agent setup happen
+    eagerly, in the caller's thread (errors raise here); the
+    returned iterator then only runs LLM reasoning, yielding one
+    customer result at a time. Without concurrency it is a plain
+    generator; with it, an async generator with at most
+    `concurrency` LLM calls in flight, still in customer order.
+    Either way the first result arrives after one LLM call.
+
+    report: optional dict, updated live (customers processed,
+    stage timings) while the iterator is consumed.
+    """
+
+    domain = get_domain_config(domain_name)
+
+    customers, transactions, past_campaigns = _load_domain_data(
+        domain_name, domain
+    )
+
+    ctx = _RunContext(
+        domain,
+        customers,
+        transactions,
+        past_campaigns,
+        report=report,
+    )
+    return _stream(ctx, customers, concurrency)
+
+
+def stream_pipeline_with_ingestion(
     domain: str,
     customers: list,
     transactions: list,
     past_campaigns: list,
+    concurrency: Optional[int] = None,
+    report: Optional[Dict] = None,
 ):
     """
-    Run pipeline using live-ingested data (API / Streamlit)
+    Streaming variant of run_pipeline_with_ingestion().
     """
 
-    from src.agents.behavior_agent import BehaviorAgent
-    from src.agents.reasoning_agent import ReasoningAgent
-    from src.agents.campaign_agent import CampaignAgent
-    from src.domains.registry import DOMAIN_REGISTRY
+    ctx = _RunContext(
+        get_domain_config(domain),
+        customers,
+        transactions,
+        past_campaigns,
+        report=report,
+    )
+    return _stream(ctx, customers, concurrency)
+
 
-    domain_config = DOMAIN_REGISTRY[domain]
+def _stream(ctx: "_RunContext", customers: List[Dict], concurrency):
+    # deterministic stages now, not on the first step of the
+    # iterator: an async one is consumed on the server's event loop
+    deterministic = ctx.deterministic(customers)
+    if concurrency:
+        return _aiter_customers(ctx, deterministic, concurrency)
+    return _iter_customers(ctx, deterministic)
+
+
+# --------------------------------------------------
+# DELTA INGESTION (incremental behavior state)
+# --------------------------------------------------
+
+def run_delta_ingestion(
+    domain: str,
+    transactions: list,
+    store=None,
+):
+    """
+    Fold only NEW transactions into the persisted per-customer
+    behavior state and recompute signals + segment for the
+    customers they touch. No LLM calls.
+
+    A customer's state is seeded on first touch with their stored
+    transactions (data/<domain>), so results equal
+    BehaviorAgent.analyze_customer() on the full history: stored
+    transactions, then earlier deltas and this one, in arrival
+    order.
+    """
+
+    domain_config = get_domain_config(domain)
+    store = store if store is not None else get_behavior_state_store()
+
+    epochs = parse_timestamps(
+        [t["timestamp"] for t in transactions]
+    )
+
+    # customer -> rows, first-seen order (arrival order within)
+    rows_by_customer: Dict = {}
+    for t, epoch in zip(transactions, epochs.tolist()):
+        rows_by_customer.setdefault(
+            t[domain_config.customer_id_field], []
+        ).append((epoch, t))
+
+    # stored history, indexed only if some customer is new (and
+    # before taking the store's lock)
+    history = None
+    if any(store.get(domain, cid) is None for cid in rows_by_customer):
+        history = _stored_history(domain, domain_config)
+
+    def add(state, epoch, t):
+        state.add_transaction(
+            epoch,
+            t.get(domain_config.category_field),
+            *domain_config.quality_hits(t.get("item_name")),
+        )
+
+    def apply(state):
+        nonlocal history
+        if state.next_seq == 0:
+            # first touch: the stored history comes first
+            if history is None:
+                history = _stored_history(domain, domain_config)
+            customer_id = state.customer_id
+            for epoch, t in zip(
+                history.get_timestamps(customer_id), history.get(customer_id)
+            ):
+                add(state, int(epoch), t)
+        for epoch, t in rows_by_customer[state.customer_id]:
+            add(state, epoch, t)
+
+    states = store.update_many(domain, rows_by_customer, apply)
 
     behavior_agent = BehaviorAgent()
-    reasoning_agent = ReasoningAgent()
-    campaign_agent = CampaignAgent()
+    return {
+        "domain": domain,
+        "results": [
+            behavior_agent.analyze_state(state, domain_config)
+            for state in states
+        ],
+    }
 
-    results = []
 
-    for customer in customers:
-        customer_id = customer["customer_id"]
+def _stored_history(domain_name: str, domain_config) -> TransactionIndex:
+    """
+    Index of the domain's stored transactions (empty without a
+    stored transactions file).
+    """
+    if not os.path.exists(_data_file(domain_name, "transactions")):
+        return TransactionIndex([], domain_config)
+    return _index_transactions(
+        _load_transactions(domain_name, domain_config), domain_config
+    )
+
+
+# --------------------------------------------------
+# CUSTOMER LOOP (shared by all entry points)
+# --------------------------------------------------
 
-        behavior_output = behavior_agent.analyze_customer(
-            customer_id=customer_id,
-            transactions=transactions,
-            domain_config=domain_config,
+class _RunContext:
+    """
+    Everything a run needs besides the customer list:
+    the domain config, the transaction and past-campaign
+    indexes (built ONCE per run), the agents and the run report.
+
+    report (live):
+    - customers / processed
+    - stage_seconds: index, behavior, campaign, reasoning
+      (reasoning is summed per call, so it can exceed wall
+      time when calls run concurrently; "behavior" is the
+      wall time of one batch pass, or of the sharded stage)
+    """
+
+    def __init__(
+        self,
+        domain_config,
+        customers: List[Dict],
+        transactions: Iterable[Dict],
+        past_campaigns: Iterable[Dict] = (),
+        report: Optional[Dict] = None,
+        workers: Optional[int] = None,
+    ):
+        from src.parallel import run_behavior_sharded, use_process_pool
+
+        self.domain_config = domain_config
+        self.past_campaigns = PastCampaignIndex(past_campaigns)
+        self.transaction_index = None
+        self.sharded = None
+
+        # segment sizes of customers outside this run (results
+        # reused from an earlier one), counted when sizing campaigns
+        self.extra_segments = Counter()
+        self.campaigns: Dict[str, Dict] = {}
+
+        self.report = report if report is not None else {}
+        self.report["customers"] = len(customers)
+        self.report["processed"] = 0
+        self.report["stage_seconds"] = {
+            "index": 0.0,
+            "behavior": 0.0,
+            "campaign": 0.0,
+            "reasoning": 0.0,
+        }
+        # histogram series per stage, resolved once (hot per customer)
+        self._stage_metrics = {
+            stage: STAGE_SECONDS.labels(stage)
+            for stage in self.report["stage_seconds"]
+        }
+
+        if use_process_pool(transactions, workers):
+            # ----------------------------
+            # Behavior stage on a process pool
+            # ----------------------------
+            started = time.perf_counter()
+            self.sharded = run_behavior_sharded(
+                domain_config, customers, transactions, workers
+            )
+            self.add_time("behavior", started)
+        else:
+            # ----------------------------
+            # Index transactions ONCE per run
+            # ----------------------------
+            started = time.perf_counter()
+            self.transaction_index = _index_transactions(
+                transactions, domain_config
+            )
+            self.add_time("index", started)
+
+        # ----------------------------
+        # Initialize agents
+        # ----------------------------
+        self.behavior_agent = BehaviorAgent()
+        self.reasoning_agent = ReasoningAgent()
+        self.campaign_agent = CampaignAgent()
+
+    def deterministic(self, customers: List[Dict]):
+        """
+        (behavior, campaign) per customer, in customer order.
+
+        Behavior runs for every customer first, so campaigns are
+        proposed ONCE per segment from the real segment sizes; each
+        proposal object is shared by the segment's customers. Both
+        stages run in this call; only pairing them up is lazy.
+        """
+        if self.sharded is not None:
+            behaviors = self.sharded
+        else:
+            # one vectorized pass over the index (BehaviorAgent batch mode)
+            started = time.perf_counter()
+            behaviors = self.behavior_agent.analyze_index(
+                [customer["customer_id"] for customer in customers],
+                self.transaction_index,
+                self.domain_config,
+            )
+            self.add_time("behavior", started)
+
+        started = time.perf_counter()
+        campaigns = self.campaigns = self.campaign_agent.recommend_campaigns(
+            Counter(behavior["segment"] for behavior in behaviors)
+            + self.extra_segments,
+            self.domain_config,
+            past_campaigns=self.past_campaigns,
         )
+        self.add_time("campaign", started)
 
-        reasoning = reasoning_agent.reason(
-            customer_id=customer_id,
-            segment=behavior_output["segment"],
-            signals=behavior_output["signals"],
-            domain=domain,
+        return (
+            (behavior, campaigns[behavior["segment"]])
+            for behavior in behaviors
         )
 
-        campaign = campaign_agent.recommend_campaign(
-            segment=behavior_output["segment"],
-            past_campaigns=past_campaigns,
+    def add_time(self, stage: str, started: float) -> float:
+        now = time.perf_counter()
+        self.report["stage_seconds"][stage] += now - started
+        self._stage_metrics[stage].observe(now - started)
+        return now
+
+    def done(self, result: Dict) -> Dict:
+        self.report["processed"] += 1
+        CUSTOMERS_PROCESSED.inc()
+        return result
+
+
+def _index_transactions(transactions, domain_config) -> TransactionIndex:
+    """
+    Per-customer index over columns, a list of rows or a stream.
+    """
+    from src.data.columnar_cache import (
+        ColumnarTransactionIndex,
+        ColumnarTransactions,
+    )
+
+    if isinstance(transactions, ColumnarTransactions):
+        return ColumnarTransactionIndex(transactions, domain_config)
+
+    # streamed input (not a list): keep only compact rows
+    return TransactionIndex(
+        transactions,
+        domain_config,
+        compact=not isinstance(transactions, list),
+    )
+
+
+def _run_customers(
+    domain_config,
+    customers: List[Dict],
+    transactions: List[Dict],
+    past_campaigns: Iterable[Dict],
+    concurrency: Optional[int] = None,
+    dedupe_reasoning: bool = False,
+    report: Optional[Dict] = None,
+    workers: Optional[int] = None,
+) -> List[Dict]:
+
+    ctx = _RunContext(
+        domain_config,
+        customers,
+        transactions,
+        past_campaigns,
+        report=report,
+        workers=workers,
+    )
+    return _run_context(ctx, customers, concurrency, dedupe_reasoning)
+
+
+def _run_context(
+    ctx: _RunContext,
+    customers: List[Dict],
+    concurrency: Optional[int],
+    dedupe_reasoning: bool,
+) -> List[Dict]:
+
+    if dedupe_reasoning:
+        return _run_customers_deduped(ctx, customers, concurrency)
+
+    if concurrency:
+        import asyncio
+
+        deterministic = ctx.deterministic(customers)
+        return asyncio.run(
+            _collect(ctx, _aiter_customers(ctx, deterministic, concurrency))
+        )
+
+    return list(_iter_customers(ctx, ctx.deterministic(customers)))
+
+
+def _iter_customers(ctx: _RunContext, deterministic: Iterable[tuple]):
+    """
+    Serial loop over (behavior, campaign) pairs from
+    ctx.deterministic(): one LLM call per customer, each result
+    yielded when done.
+    """
+
+    for behavior, campaign in deterministic:
+        # 2. LLM reasoning (Groq)
+        started = time.perf_counter()
+        reasoning = ctx.reasoning_agent.reason(
+            segment=behavior["segment"],
+            signals=behavior["signals"],
+            domain_name=ctx.domain_config.name,
+        )
+        ctx.add_time("reasoning", started)
+
+        yield ctx.done(_customer_result(behavior, reasoning, campaign))
+
+
+async def _aiter_customers(
+    ctx: _RunContext,
+    deterministic: Iterable[tuple],
+    concurrency: int,
+):
+    """
+    Bounded fan-out of LLM reasoning.
+
+    Takes the (behavior, campaign) pairs from ctx.deterministic(),
+    computed beforehand (so nothing CPU-bound runs on the event
+    loop), and keeps up to `concurrency` reasoning calls in flight.
+    Results are yielded in the original customer order as soon as
+    the head of the window completes, so the window bounds memory
+    and the first result arrives after one LLM call.
+    """
+
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+    window = deque()
+
+    async def reason(behavior: Dict) -> Dict:
+        started = time.perf_counter()
+        try:
+            return await ctx.reasoning_agent.areason(
+                segment=behavior["segment"],
+                signals=behavior["signals"],
+                domain_name=ctx.domain_config.name,
+            )
+        finally:
+            ctx.add_time("reasoning", started)
+            semaphore.release()
+
+    try:
+        for behavior, campaign in deterministic:
+            # flush finished results before blocking on the window
+            while window and window[0][2].done():
+                behavior_done, campaign_done, task = window.popleft()
+                yield ctx.done(
+                    _customer_result(
+                        behavior_done, task.result(), campaign_done
+                    )
+                )
+
+            await semaphore.acquire()
+            task = asyncio.create_task(reason(behavior))
+            window.append((behavior, campaign, task))
+
+        while window:
+            behavior_done, campaign_done, task = window.popleft()
+            yield ctx.done(
+                _customer_result(behavior_done, await task, campaign_done)
+            )
+
+    finally:
+        for _, _, task in window:
+            task.cancel()
+
+
+async def _collect(ctx: _RunContext, aiterator) -> List[Dict]:
+    try:
+        return [item async for item in aiterator]
+    finally:
+        # the loop ends with asyncio.run(): release its connections
+        await ctx.reasoning_agent.aclose()
+
+
+def _run_customers_deduped(
+    ctx: _RunContext,
+    customers: List[Dict],
+    concurrency: Optional[int],
+) -> List[Dict]:
+    """
+    Segment-level reasoning.
+
+    Customers are bucketed by (segment, discretized signals) and
+    the ReasoningAgent is called once per bucket; the explanation
+    is shared across the bucket. Confidence and business risk are
+    per-segment, so they are unchanged.
+    """
+
+    deterministic = []
+    buckets: Dict[tuple, tuple] = {}
+
+    for behavior, campaign in ctx.deterministic(customers):
+        signature = ctx.reasoning_agent.signal_signature(
+            behavior["signals"]
         )
+        key = (behavior["segment"], tuple(sorted(signature.items())))
+        buckets.setdefault(key, (behavior["segment"], signature))
+
+        deterministic.append((behavior, campaign, key))
 
-        results.append(
-            {
-                "customer_id": customer_id,
-                "segment": behavior_output["segment"],
-                "signals": behavior_output["signals"],
-                "reasoning": reasoning,
-                "campaign": campaign,
-            }
+    # ----------------------------
+    # ONE reasoning call per bucket
+    # ----------------------------
+    started = time.perf_counter()
+    if concurrency:
+        import asyncio
+
+        explanations = asyncio.run(
+            _reason_buckets_async(ctx, buckets, concurrency)
+        )
+    else:
+        explanations = {
+            key: ctx.reasoning_agent.reason(
+                segment=segment,
+                signals=signature,
+                domain_name=ctx.domain_config.name,
+            )
+            for key, (segment, signature) in buckets.items()
+        }
+
+    ctx.add_time("reasoning", started)
+
+    ctx.report["reasoning_buckets"] = len(buckets)
+    ctx.report["llm_calls_saved"] = len(customers) - len(buckets)
+
+    return [
+        ctx.done(
+            _customer_result(behavior, dict(explanations[key]), campaign)
         )
+        for behavior, campaign, key in deterministic
+    ]
+
+
+async def _reason_buckets_async(
+    ctx: _RunContext,
+    buckets: Dict[tuple, tuple],
+    concurrency: int,
+) -> Dict[tuple, Dict]:
+
+    import asyncio
 
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def reason(segment: str, signature: Dict) -> Dict:
+        async with semaphore:
+            return await ctx.reasoning_agent.areason(
+                segment=segment,
+                signals=signature,
+                domain_name=ctx.domain_config.name,
+            )
+
+    keys = list(buckets)
+    try:
+        explanations = await asyncio.gather(
+            *(reason(*buckets[key]) for key in keys)
+        )
+    finally:
+        await ctx.reasoning_agent.aclose()
+    return dict(zip(keys, explanations))
+
+
+def _customer_result(behavior: Dict, reasoning: Dict, campaign: Dict) -> Dict:
     return {
-        "domain": domain,
-        "results": results,
+        "customer_id": behavior["customer_id"],
+        "segment": behavior["segment"],
+        "signals": behavior["signals"],
+        "reasoning": reasoning,
+        "campaign": campaign,
     }
 
+
 # --------------------------------------------------
 # CLI ENTRY POINT
 # --------------------------------------------------
 
 if __name__ == "__main__":
+    import argparse
+    from contextlib import nullcontext
+
+    parser = argparse.ArgumentParser(description="Run the pipeline")
+    parser.add_argument(
+        "--domains", nargs="+", default=["supermarket", "oil", "banking"],
+    )
+    parser.add_argument(
+        "--profile", choices=["cpu", "memory"],
+        help="Profile each run (cProfile, plus tracemalloc for memory)",
+    )
+    parser.add_argument("--profile-top", type=int, default=None)
+    args = parser.parse_args()
 
-    for domain_name in ["supermarket", "oil", "banking"]:
+    for domain_name in args.domains:
         print("\n" + "#" * 80)
         print(f"RUNNING PIPELINE FOR DOMAIN: {domain_name.upper()}")
         print("#" * 80)
 
-        output = run_pipeline(domain_name)
+        if args.profile:
+            from src.profiling import format_top_functions, profiled
+
+            context = profiled(args.profile, top_n=args.profile_top)
+        else:
+            context = nullcontext()
+
+        with context as profile:
+            output = run_pipeline(domain_name)
         pretty_print("FINAL OUTPUT", output)
+
+        if profile is not None:
+            print(f"\nPROFILE ({profile['wall_seconds']:.3f}s wall, "
+                  f"pstats: {profile['pstats_path']})")
+            print(format_top_functions(profile))
+            if "memory" in profile:
+                pretty_print("MEMORY", profile["memory"])
@@ -0,0 +1,224 @@
+# src/profiling.py
+
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from src.utils import load_env
+
+if TYPE_CHECKING:
+    import cProfile
+
+# Defaults (overridable via environment / .env)
+DEFAULT_PROFILE_DIR = os.path.join(".cache", "profiles")
+DEFAULT_PROFILE_TOP_N = 25
+DEFAULT_PROFILE_KEEP = 20
+
+PROFILE_MODES = ("cpu", "memory")
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{12}$")
+
+# Project root: source paths under it are shown relative to it
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# tracemalloc is process-wide: one memory profile at a time
+_tracemalloc_lock = threading.Lock()
+
+
+def profiling_enabled() -> bool:
+    """
+    PROFILING_ENABLED = "1" allows on-demand profiles of API
+    requests (off by default).
+    """
+    load_env()
+    return os.getenv("PROFILING_ENABLED", "0") == "1"
+
+
+def get_profile_dir() -> Optional[str]:
+    """
+    PROFILE_DIR = where pstats dumps are stored ("" = not stored)
+    """
+    load_env()
+    return os.getenv("PROFILE_DIR", DEFAULT_PROFILE_DIR) or None
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """
+    Stored pstats dump for an id returned by profiled(), if any.
+    """
+    profile_dir = get_profile_dir()
+    if profile_dir is None or not _PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(profile_dir, f"{profile_id}.pstats")
+    return path if os.path.exists(path) else None
+
+
+@contextmanager
+def profiled(mode: str = "cpu", top_n: Optional[int] = None):
+    """
+    Run the body under cProfile ("cpu"), plus tracemalloc
+    ("memory"). Yields a dict that is filled when the body
+    completes:
+
+    - profile_id / pstats_path: stored dump (see PROFILE_DIR);
+      the path is for local use, not for API responses
+    - wall_seconds
+    - top_functions: top_n by own time (tottime)
+    - memory (mode "memory"): peak / retained bytes and the
+      top_n allocation sites still alive at the end
+
+    Source locations in the summary are relative (see
+    _display_path); only the stored dump has absolute paths.
+
+    cProfile only sees the calling thread (and event loops run
+    in it), not process pools. Memory profiles run one at a time.
+    """
+
+    # deferred: only profiled requests pay for these imports
+    import cProfile
+    import tracemalloc
+
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unsupported profile mode: {mode}")
+
+    load_env()
+    if top_n is None:
+        top_n = int(os.getenv("PROFILE_TOP_N", DEFAULT_PROFILE_TOP_N))
+
+    profile: Dict = {"mode": mode}
+    profiler = cProfile.Profile()
+    memory = mode == "memory"
+
+    if memory:
+        _tracemalloc_lock.acquire()
+        tracemalloc.start()
+
+    snapshot = None
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield profile
+    finally:
+        profiler.disable()
+        wall_seconds = time.perf_counter() - started
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _tracemalloc_lock.release()
+
+    profile["wall_seconds"] = round(wall_seconds, 6)
+    profile.update(_store(profiler))
+    profile["top_functions"] = _top_functions(profiler, top_n)
+    if snapshot is not None:
+        profile["memory"] = {
+            "peak_bytes": peak,
+            "retained_bytes": current,
+            "top_allocations": _top_allocations(snapshot, top_n),
+        }
+
+
+def _store(profiler: "cProfile.Profile") -> Dict:
+    profile_dir = get_profile_dir()
+    if profile_dir is None:
+        return {"profile_id": None, "pstats_path": None}
+
+    os.makedirs(profile_dir, exist_ok=True)
+    profile_id = uuid.uuid4().hex[:12]
+    path = os.path.join(profile_dir, f"{profile_id}.pstats")
+    profiler.dump_stats(path)
+
+    _prune(profile_dir)
+    return {"profile_id": profile_id, "pstats_path": path}
+
+
+def _prune(profile_dir: str) -> None:
+    """
+    Keep the newest PROFILE_KEEP dumps.
+    """
+    keep = int(os.getenv("PROFILE_KEEP", DEFAULT_PROFILE_KEEP))
+    dumps = sorted(
+        (entry for entry in os.scandir(profile_dir)
+         if entry.name.endswith(".pstats")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in dumps[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _top_functions(profiler: "cProfile.Profile", top_n: int) -> List[Dict]:
+    import pstats
+
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+
+    return [
+        {
+            "function": f"{_display_path(filename)}:{line}({name})",
+            "ncalls": ncalls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _)
+        in rows[:top_n]
+    ]
+
+
+def _top_allocations(snapshot, top_n: int) -> List[Dict]:
+    import tracemalloc
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    return [
+        {
+            "location": f"{_display_path(stat.traceback[0].filename)}:"
+                        f"{stat.traceback[0].lineno}",
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top_n]
+    ]
+
+
+def _display_path(filename: str) -> str:
+    """
+    A source path without the server's directory layout: relative
+    to the project root, else to the import root it was loaded from
+    (stdlib, site-packages), else its basename. Pseudo-files such as
+    "~" (builtins) or "<frozen ...>" are kept.
+    """
+    if not os.path.isabs(filename):
+        return filename
+
+    roots = [_ROOT] + [
+        os.path.abspath(entry) for entry in sys.path if entry
+    ]
+    for root in sorted(roots, key=len, reverse=True):
+        if filename.startswith(root.rstrip(os.sep) + os.sep):
+            return os.path.relpath(filename, root)
+    return os.path.basename(filename)
+
+
+def format_top_functions(profile: Dict) -> str:
+    """
+    Text table of profile["top_functions"] (CLI output).
+    """
+    lines = [f"{'ncalls':>10} {'tottime':>10} {'cumtime':>10}  function"]
+    for row in profile["top_functions"]:
+        lines.append(
+            f"{row['ncalls']:>10} {row['tottime']:10.4f} "
+            f"{row['cumtime']:10.4f}  {row['function']}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,214 @@
+# src/result_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+from src.metrics import RESULT_CACHE_LOOKUPS
+from src.utils import load_env
+
+# Defaults (overridable via environment / .env)
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_UPLOAD_MAX_ENTRIES = 200_000  # mostly per-customer entries
+DEFAULT_UPLOAD_MAX_BYTES = 256 * 1024 * 1024
+
+# get_or_compute() outcomes
+HIT = "hit"
+MISS = "miss"
+COALESCED = "coalesced"
+
+
+class ResultCache:
+    """
+    In-memory LRU of serialized pipeline results (bytes), bounded
+    by entry count and by total size; entries older than
+    ttl_seconds are misses. Bodies larger than max_bytes are
+    returned but not kept.
+
+    get_or_compute() is single-flight: concurrent callers with the
+    same key wait for one computation instead of starting their own.
+    Keys must cover everything that changes the result.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (body, created_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._get(key)
+
+    def put(self, key: str, body: bytes) -> None:
+        with self._lock:
+            self._discard(key)
+            if len(body) > self.max_bytes:
+                return
+            self._entries[key] = (body, time.time())
+            self._bytes += len(body)
+            while (
+                len(self._entries) > self.max_entries
+                or self._bytes > self.max_bytes
+            ):
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], bytes]
+    ) -> Tuple[bytes, str]:
+        """
+        (body, outcome): HIT, MISS (computed here) or COALESCED
+        (computed by a concurrent caller). A failed computation
+        raises in every waiting caller and is not cached.
+        """
+        with self._lock:
+            body = self._get(key)
+            if body is not None:
+                self.hits += 1
+                outcome = HIT
+            else:
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    self.misses += 1
+                    outcome = MISS
+                else:
+                    self.coalesced += 1
+                    outcome = COALESCED
+        RESULT_CACHE_LOOKUPS.labels(outcome).inc()
+
+        if outcome == HIT:
+            return body, outcome
+        if outcome == COALESCED:
+            return future.result(), outcome
+
+        try:
+            body = compute()
+            self.put(key, body)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(body)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return body, outcome
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round(
+                (self.hits + self.coalesced) / lookups, 4
+            ) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    # ----------------------------
+    # Internals (under _lock)
+    # ----------------------------
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        body, created_at = entry
+        if time.time() - created_at > self.ttl_seconds:
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return body
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+
+# --------------------------------------------------
+# PROCESS-WIDE CACHES
+# --------------------------------------------------
+
+_caches: Dict[str, ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Shared cache of /run responses.
+
+    Configured from the environment:
+    - RESULT_CACHE_ENABLED      ("0" disables it)
+    - RESULT_CACHE_MAX_ENTRIES
+    - RESULT_CACHE_MAX_BYTES    (total serialized size)
+    - RESULT_CACHE_TTL_SECONDS
+    """
+    return _configured_cache(
+        "RESULT_CACHE", DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
+    )
+
+
+def get_upload_cache() -> Optional[ResultCache]:
+    """
+    Shared store of /ingest-and-analyze results: whole responses
+    per payload hash, and per-customer partial results for
+    incremental reruns. Same settings as get_result_cache(),
+    prefixed UPLOAD_CACHE_ (e.g. UPLOAD_CACHE_MAX_BYTES).
+    """
+    return _configured_cache(
+        "UPLOAD_CACHE", DEFAULT_UPLOAD_MAX_ENTRIES, DEFAULT_UPLOAD_MAX_BYTES
+    )
+
+
+def _configured_cache(
+    prefix: str, max_entries: int, max_bytes: int
+) -> Optional[ResultCache]:
+    load_env()
+
+    if os.getenv(f"{prefix}_ENABLED", "1") == "0":
+        return None
+
+    with _caches_lock:
+        cache = _caches.get(prefix)
+        if cache is None:
+            cache = _caches[prefix] = ResultCache(
+                max_entries=int(
+                    os.getenv(f"{prefix}_MAX_ENTRIES", max_entries)
+                ),
+                max_bytes=int(os.getenv(f"{prefix}_MAX_BYTES", max_bytes)),
+                ttl_seconds=float(
+                    os.getenv(f"{prefix}_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+                ),
+            )
+        return cache
@@ -2,7 +2,30 @@
 
 import json
 from pprint import pprint
-from typing import Any
+from typing import Any, Dict, Iterator
+
+# Read size for streaming JSON parsing
+JSON_CHUNK_SIZE = 1 << 16
+
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """
+    Load .env into os.environ once per process.
+
+    Called by every env-configured factory (LLM client, caches,
+    stores) right before reading settings, instead of at import
+    time, so python-dotenv is only imported when config is needed.
+    """
+    global _env_loaded
+
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
 
 
 def load_json(path: str) -> Any:
@@ -14,6 +37,107 @@ def load_json(path: str) -> Any:
         return json.load(f)
 
 
+def iter_json_records(
+    path: str, chunk_size: int = JSON_CHUNK_SIZE
+) -> Iterator[Dict]:
+    """
+    Stream records from a JSON file without loading it whole.
+
+    - top-level JSON array: elements parsed incrementally
+    - otherwise NDJSON: one JSON value per non-empty line
+
+    Only one chunk plus the record being parsed is held at a time.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, "r") as f:
+        buf = f.read(chunk_size)
+        pos = _skip_whitespace(buf, 0)
+        while pos == len(buf):  # leading whitespace (or empty file)
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            buf, pos = chunk, _skip_whitespace(chunk, 0)
+
+        if not buf.startswith("[", pos):
+            # ----------------------------
+            # NDJSON
+            # ----------------------------
+            f.seek(0)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        pos += 1
+        eof = False
+        expect_value = True
+        after_comma = False
+
+        while True:
+            pos = _skip_whitespace(buf, pos)
+
+            # need at least one more character (or the full value)
+            if pos >= len(buf) and not eof:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+
+            if pos >= len(buf):
+                raise ValueError(f"{path}: unterminated JSON array")
+
+            if buf[pos] == "]":
+                if after_comma:
+                    raise ValueError(f"{path}: trailing ',' in JSON array")
+                return
+
+            if not expect_value:
+                if buf[pos] != ",":
+                    raise ValueError(
+                        f"{path}: expected ',' or ']' in JSON array"
+                    )
+                pos += 1
+                expect_value = after_comma = True
+                continue
+
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+
+            # a value that ends the buffer may be truncated, and so may
+            # a number followed only by what could continue it
+            # ("43." + "5", "1e" + "-3")
+            if end is None or (not eof and (
+                end == len(buf)
+                or _is_number(record) and not buf[end:].strip(_NUMBER_CHARS)
+            )):
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+
+            yield record
+            pos = end
+            expect_value = after_comma = False
+
+
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+def _is_number(value: Any) -> bool:
+    return type(value) in (int, float)
+
+
+def _skip_whitespace(buf: str, pos: int) -> int:
+    while pos < len(buf) and buf[pos] in " \t\n\r":
+        pos += 1
+    return pos
+
+
 def pretty_print(title: str, data: Any) -> None:
     """
     Pretty-print sections in console output.